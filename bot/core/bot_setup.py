@@ -5,7 +5,9 @@ from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 from aiogram.types import BotCommand
 
-from bot.core.config import TELEGRAM_BOT_TOKEN, LOGGING_CONFIG
+from bot.core.config import TELEGRAM_BOT_TOKEN
+from bot.core.storage import create_storage, on_storage_startup
+from bot.core.metrics import setup_metrics, start_metrics_server
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +29,7 @@ async def set_bot_commands(bot: Bot):
 async def on_startup(bot: Bot):
     """Действия при запуске бота"""
     await set_bot_commands(bot)
+    start_metrics_server()
     logger.info("Бот успешно запущен")
 
 
@@ -41,11 +44,21 @@ def setup_bot() -> tuple[Bot, Dispatcher]:
         default=DefaultBotProperties(parse_mode=ParseMode.HTML)
     )
 
-    dp = Dispatcher()
+    dp = Dispatcher(storage=create_storage())
     dp.startup.register(on_startup)
+    dp.startup.register(on_storage_startup)
+    setup_metrics(bot, dp)
+
+    from bot.handlers.start.membership import on_membership_startup
+    dp.startup.register(on_membership_startup)
+
+    # Проверка подписки один раз на обновление, до фильтров обработчиков
+    from bot.core.middlewares import SubscriptionMiddleware
+    dp.message.outer_middleware(SubscriptionMiddleware())
+    dp.callback_query.outer_middleware(SubscriptionMiddleware())
 
     # Импорт роутеров внутри функции
-    from bot.handlers.start import commands_router, callbacks_router, handlers_router
+    from bot.handlers.start import commands_router, callbacks_router, handlers_router, membership_router
     from bot.handlers.product import router as product_router
     from bot.handlers.cart import router as cart_router
     from bot.handlers.faq import faq_router
@@ -53,6 +66,7 @@ def setup_bot() -> tuple[Bot, Dispatcher]:
 
     # Регистрация роутеров
     dp.include_routers(
+        membership_router,
         commands_router,
         callbacks_router,
         handlers_router,
@@ -0,0 +1,62 @@
+# bot/core/cache.py
+import time
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, Optional, TypeVar
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class TTLCache(Generic[V]):
+    """
+    Кэш с ограничением размера (вытеснение LRU) и временем жизни записей.
+
+    Все операции O(1): записи хранятся в OrderedDict в порядке использования,
+    при переполнении удаляется самая давно использованная. Просроченные записи
+    удаляются при обращении к ним и с начала очереди при вставке.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, V]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Optional[V]:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: V, ttl: Optional[float] = None) -> None:
+        now = time.monotonic()
+        self._data[key] = (now + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        self._evict(now)
+
+    def pop(self, key: Hashable, default: Any = None) -> Optional[V]:
+        entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def _evict(self, now: float) -> None:
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        while self._data:
+            expires_at, _ = next(iter(self._data.values()))
+            if expires_at > now:
+                break
+            self._data.popitem(last=False)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
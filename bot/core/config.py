@@ -7,22 +7,85 @@ load_dotenv()
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 SUPPORT_TELEGRAM = os.getenv("SUPPORT_TELEGRAM", "@SupportBot")
 
+# Режим получения обновлений: "polling" (long polling) или "webhook"
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+
+# Настройки webhook (используются при BOT_MODE=webhook)
+WEBHOOK_BASE_URL = os.getenv("WEBHOOK_BASE_URL")  # Публичный адрес, например https://shop.example.com
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")  # Проверяется в заголовке X-Telegram-Bot-Api-Secret-Token
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40"))
+# False — не вызывать set_webhook (локальная отладка, дополнительные реплики)
+WEBHOOK_SET_ON_STARTUP = os.getenv("WEBHOOK_SET_ON_STARTUP", "True") == "True"
+
+# Масштабирование: процесс-приёмник (BOT_MODE=ingress) складывает обновления
+# в очередь, разбитую на партиции по from_user.id, воркеры (python -m bot.worker)
+# обрабатывают свои партиции
+INGRESS_SOURCE = os.getenv("INGRESS_SOURCE", "polling")  # polling или webhook
+UPDATE_QUEUE_BACKEND = os.getenv("UPDATE_QUEUE_BACKEND", "redis")  # redis или multiprocessing
+UPDATE_QUEUE_PARTITIONS = int(os.getenv("UPDATE_QUEUE_PARTITIONS", "16"))
+UPDATE_QUEUE_PREFIX = os.getenv("UPDATE_QUEUE_PREFIX", "tg_shop:updates")
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
+
+# Хранилище состояний FSM: "redis", "db" (таблица в PostgreSQL) или "memory".
+# По умолчанию Redis, если задан REDIS_URL, иначе таблица в базе данных
+FSM_STORAGE = os.getenv("FSM_STORAGE") or ("redis" if os.getenv("REDIS_URL") else "db")
+FSM_STATE_TTL = int(os.getenv("FSM_STATE_TTL", str(7 * 24 * 3600)))  # Время жизни состояния, сек.
+FSM_DATA_TTL = int(os.getenv("FSM_DATA_TTL", str(7 * 24 * 3600)))  # Время жизни данных, сек.
+FSM_PURGE_INTERVAL = int(os.getenv("FSM_PURGE_INTERVAL", "3600"))  # Период очистки просроченных записей FSM_STORAGE=db, сек.
+
+# Выбранное количество товара на карточке: "fsm" (общее хранилище FSM) или "memory"
+QUANTITY_STORE = os.getenv("QUANTITY_STORE") or ("memory" if FSM_STORAGE == "memory" else "fsm")
+QUANTITY_STORE_MAXSIZE = int(os.getenv("QUANTITY_STORE_MAXSIZE", "100000"))  # Максимум записей в памяти
+QUANTITY_STORE_TTL = int(os.getenv("QUANTITY_STORE_TTL", "3600"))  # Время жизни выбора в памяти, сек.
+QUANTITY_STORE_PER_USER = int(os.getenv("QUANTITY_STORE_PER_USER", "20"))  # Максимум товаров на пользователя в FSM
+
 # Настройки подписки
 SUBSCRIPTION_CHANNEL_ID = os.getenv("SUBSCRIPTION_CHANNEL_ID", None)
 SUBSCRIPTION_GROUP_ID = os.getenv("SUBSCRIPTION_GROUP_ID", None)
 FREE_ACCESS_COMMANDS = ['/faq', '/about']
+# Кэш результатов проверки подписки: подписанных проверяем реже, чем неподписанных,
+# чтобы после подписки доступ открывался быстро
+SUBSCRIPTION_CACHE_POSITIVE_TTL = int(os.getenv("SUBSCRIPTION_CACHE_POSITIVE_TTL", "600"))  # сек.
+SUBSCRIPTION_CACHE_NEGATIVE_TTL = int(os.getenv("SUBSCRIPTION_CACHE_NEGATIVE_TTL", "30"))  # сек.
+SUBSCRIPTION_CACHE_MAXSIZE = int(os.getenv("SUBSCRIPTION_CACHE_MAXSIZE", "100000"))
+SUBSCRIPTION_LINK_TTL = int(os.getenv("SUBSCRIPTION_LINK_TTL", "3600"))  # Кэш ссылок на каналы, сек.
+# Реестр подписчиков по событиям chat_member (бот должен быть администратором канала/группы)
+MEMBERSHIP_RECONCILE_INTERVAL = int(os.getenv("MEMBERSHIP_RECONCILE_INTERVAL", "300"))  # Период сверки, сек.
+MEMBERSHIP_VERIFY_AGE = int(os.getenv("MEMBERSHIP_VERIFY_AGE", str(24 * 3600)))  # Перепроверять записи старше, сек.
+MEMBERSHIP_VERIFY_BATCH = int(os.getenv("MEMBERSHIP_VERIFY_BATCH", "100"))  # Перепроверок за одну сверку
+
+# Метрики Prometheus: http://METRICS_HOST:METRICS_PORT/metrics (0 — не запускать)
+METRICS_HOST = os.getenv("METRICS_HOST", "0.0.0.0")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9100"))
 
 # Логирование
+# Применяется bot.core.logging_config.setup_logging при запуске бота и воркеров
 LOGGING_CONFIG = {
-    "level": "DEBUG",
+    "level": os.getenv("LOG_LEVEL", "INFO").upper(),
+    # Уровни отдельных модулей: LOG_LEVELS="bot.handlers.catalog=DEBUG,aiogram.event=WARNING"
+    "levels": {
+        name.strip(): level.strip().upper()
+        for name, _, level in (item.partition("=") for item in os.getenv("LOG_LEVELS", "").split(","))
+        if name.strip() and level.strip()
+    },
+    "json": os.getenv("LOG_FORMAT", "text") == "json",
     "format": "%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    "filename": "logs/bot.log",
-    "filemode": "a"
+    "filename": os.getenv("LOG_FILE", "logs/bot.log"),
+    "filemode": "a",
+    "debug_rate": int(os.getenv("LOG_DEBUG_RATE", "20")),  # DEBUG-записей в секунду на логгер (0 — без ограничения)
+    "debug_sample": int(os.getenv("LOG_DEBUG_SAMPLE", "1")),  # Писать каждую N-ю DEBUG-запись
 }
 
 # Настройки FAQ
 FAQ_PER_PAGE = 5  # Количество вопросов FAQ на одной странице
 FAQ_SEARCH_PER_PAGE = 5  # Количество результатов поиска FAQ на одной странице
+FAQ_SNAPSHOT_CHECK_INTERVAL = int(os.getenv("FAQ_SNAPSHOT_CHECK_INTERVAL", "30"))  # Проверка изменений FAQ для снимка в памяти, сек.
+FAQ_SEARCH_SESSION_TTL = int(os.getenv("FAQ_SEARCH_SESSION_TTL", "1800"))  # Время жизни результатов поиска для пагинации, сек.
+FAQ_SEARCH_SESSIONS_PER_USER = 5  # Сколько последних поисков пользователя хранится в FSM
+FAQ_SEARCH_MAX_RESULTS = 100  # Максимум результатов, сохраняемых в сессии поиска
 
 # Количество знаков после запятой для цен (0 - без дробной части, 2 - два знака и т.д.)
 PRICE_DECIMAL_PLACES = 0
@@ -35,6 +98,12 @@ PRODUCTS_PER_ROW = 1  # Количество товаров в одном ряд
 CART_ITEMS_PER_PAGE = 5  # Количество товаров на странице в корзине
 SHOW_PRODUCT_PRICE_IN_CATALOG = False  # Отображать цену товара в каталоге
 
+# Поиск товаров в inline-режиме (@bot запрос); inline-режим включается в @BotFather (/setinline)
+INLINE_RESULTS_PER_PAGE = 20  # Результатов в одном ответе (не больше 50)
+INLINE_CACHE_TIME = int(os.getenv("INLINE_CACHE_TIME", "300"))  # cache_time ответа на стороне Telegram, сек.
+INLINE_QUERY_CACHE_TTL = int(os.getenv("INLINE_QUERY_CACHE_TTL", "60"))  # Кэш результатов запроса в боте, сек.
+INLINE_QUERY_CACHE_MAXSIZE = int(os.getenv("INLINE_QUERY_CACHE_MAXSIZE", "5000"))
+
 # Текстовые сообщения
 CATALOG_MESSAGE = "🛍️ Выберите товар:"  # Текст при отображении товаров
 # Сообщение при отсутствии категорий
@@ -56,6 +125,7 @@ CART_EMPTY_TEXT = "пуста"  # Текст для пустой корзины
 # Показывать родительскую категорию товара (Категория > Товар)
 SHOW_PARENT_CATEGORY = True
 CATEGORY_SEPARATOR = " > "  # Разделитель между категорией и товаром
+CATEGORY_PATH_CACHE_TTL = int(os.getenv("CATEGORY_PATH_CACHE_TTL", "300"))  # Кэш пути категории товара, сек.
 
 # Настройки страницы продукта
 PRODUCT_CATEGORY_EMOJI = "🏷️"  # Эмодзи для категории
@@ -0,0 +1,91 @@
+# bot/core/ingress.py
+import asyncio
+import logging
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.dispatcher.dispatcher import DEFAULT_BACKOFF_CONFIG
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.utils.backoff import Backoff
+
+from bot.core.config import (
+    INGRESS_SOURCE, WEBHOOK_PATH, WEBHOOK_SECRET, WEBHOOK_HOST, WEBHOOK_PORT
+)
+from bot.core.queue import UpdateQueue
+from bot.core.webhook import on_webhook_startup
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+async def run_polling_ingress(bot: Bot, dp: Dispatcher, queue: UpdateQueue, polling_timeout: int = 30):
+    """Получение обновлений long polling и передача их в очередь без обработки"""
+    allowed_updates = dp.resolve_used_update_types()
+    offset = None
+    backoff = Backoff(DEFAULT_BACKOFF_CONFIG)
+    logger.info("Ingress (polling) запущен, allowed_updates=%s", allowed_updates)
+    while True:
+        try:
+            updates = await bot.get_updates(
+                offset=offset, timeout=polling_timeout, allowed_updates=allowed_updates
+            )
+        except TelegramRetryAfter as e:
+            logger.warning("Telegram ограничил запросы, пауза %s с", e.retry_after)
+            await asyncio.sleep(e.retry_after)
+            continue
+        except Exception as e:
+            # Как и polling aiogram: ошибки сети и сервера Telegram не останавливают приём
+            logger.error("Ошибка получения обновлений (%s: %s), повтор через %.1f с",
+                         type(e).__name__, e, backoff.next_delay)
+            await backoff.asleep()
+            continue
+
+        try:
+            for update in updates:
+                await queue.put(update.model_dump(mode="json", by_alias=True, exclude_none=True))
+                # Подтверждается только переданное в очередь: остальное Telegram вернёт повторно
+                offset = update.update_id + 1
+        except Exception as e:
+            logger.error("Ошибка передачи обновления в очередь (%s: %s), повтор через %.1f с",
+                         type(e).__name__, e, backoff.next_delay)
+            await backoff.asleep()
+            continue
+        backoff.reset()
+
+
+def build_ingress_webhook_app(bot: Bot, dp: Dispatcher, queue: UpdateQueue) -> web.Application:
+    """aiohttp-приложение webhook, которое только складывает обновления в очередь"""
+
+    async def handle(request: web.Request) -> web.Response:
+        if WEBHOOK_SECRET and request.headers.get(SECRET_HEADER) != WEBHOOK_SECRET:
+            return web.Response(status=401, text="Unauthorized")
+        await queue.put(await request.json())
+        return web.Response()
+
+    async def on_startup(app: web.Application):
+        await on_webhook_startup(bot, dp)
+
+    app = web.Application()
+    app.router.add_post(WEBHOOK_PATH, handle)
+    app.on_startup.append(on_startup)
+    return app
+
+
+async def run_ingress(bot: Bot, dp: Dispatcher, queue: UpdateQueue, source: str = INGRESS_SOURCE):
+    """Запуск процесса-приёмника обновлений"""
+    await dp.emit_startup(bot=bot, dispatcher=dp)
+    try:
+        if source == "webhook":
+            runner = web.AppRunner(build_ingress_webhook_app(bot, dp, queue))
+            await runner.setup()
+            await web.TCPSite(runner, host=WEBHOOK_HOST, port=WEBHOOK_PORT).start()
+            logger.info("Ingress (webhook) слушает http://%s:%s%s", WEBHOOK_HOST, WEBHOOK_PORT, WEBHOOK_PATH)
+            try:
+                await asyncio.Event().wait()
+            finally:
+                await runner.cleanup()
+        else:
+            await bot.delete_webhook()
+            await run_polling_ingress(bot, dp, queue)
+    finally:
+        await queue.close()
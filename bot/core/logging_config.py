@@ -0,0 +1,159 @@
+# bot/core/logging_config.py
+"""
+Настройка логирования бота.
+
+Записи из всех потоков попадают в очередь (QueueHandler), а форматирование и
+запись в stdout/файл выполняет отдельный поток QueueListener, поэтому
+цикл событий не ждёт ввода-вывода. Уровни задаются через окружение:
+
+    LOG_LEVEL=INFO
+    LOG_LEVELS=bot.handlers.catalog=DEBUG,aiogram.event=WARNING
+    LOG_FORMAT=json                  # или text
+    LOG_DEBUG_RATE=20                # DEBUG-записей в секунду на логгер, остальные отбрасываются
+    LOG_DEBUG_SAMPLE=10              # писать каждую 10-ю DEBUG-запись
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from bot.core.config import LOGGING_CONFIG
+
+_listener: Optional[QueueListener] = None
+_config: Optional[dict] = None
+
+# Стандартные атрибуты LogRecord, не попадающие в extra
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна запись — один JSON-объект в строке"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class DebugRateFilter(logging.Filter):
+    """
+    Ограничение DEBUG-записей: выборка каждой sample-й и не больше rate в секунду на логгер.
+
+    Записи уровня INFO и выше проходят без ограничений.
+    """
+
+    def __init__(self, rate: int = 0, sample: int = 1):
+        super().__init__()
+        self.rate = rate
+        self.sample = max(sample, 1)
+        self._counters: dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        now = int(time.monotonic())
+        with self._lock:
+            counter = self._counters.setdefault(record.name, [now, 0, 0])  # секунда, записано за неё, всего
+            counter[2] += 1
+            if counter[2] % self.sample:
+                return False
+            if not self.rate:
+                return True
+            if counter[0] != now:
+                counter[0], counter[1] = now, 0
+            counter[1] += 1
+            return counter[1] <= self.rate
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    QueueHandler без форматирования в вызывающем потоке.
+
+    Сообщение собирается из msg и args (это дёшево), а форматтер
+    вызывается уже в потоке QueueListener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def setup_logging(config: dict = LOGGING_CONFIG) -> None:
+    """Применение LOGGING_CONFIG: очередь, обработчики, уровни. Повторный вызов ничего не делает"""
+    global _listener, _config
+    if _listener is not None:
+        return
+    _config = config
+
+    if config.get("json"):
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(config["format"])
+
+    handlers = [logging.StreamHandler()]
+    if config.get("filename"):
+        os.makedirs(os.path.dirname(config["filename"]) or ".", exist_ok=True)
+        handlers.append(logging.FileHandler(config["filename"], mode=config.get("filemode", "a"), encoding="utf-8"))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = LazyQueueHandler(log_queue)
+    queue_handler.addFilter(DebugRateFilter(config.get("debug_rate", 0), config.get("debug_sample", 1)))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(config["level"])
+    for name, level in config.get("levels", {}).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Дописать оставшиеся записи и остановить поток логирования"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_after_fork() -> None:
+    """
+    Новая очередь и поток логирования в дочернем процессе после fork.
+
+    Дочерний процесс наследует _listener, но не его поток: без перезапуска
+    записи копились бы в очереди, которую никто не читает.
+    """
+    global _listener
+    if _listener is None:
+        return
+    _listener = None
+    setup_logging(_config)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
@@ -0,0 +1,233 @@
+# bot/core/metrics.py
+"""
+Метрики бота.
+
+MetricsMiddleware замеряет для каждого обработчика (и префикса callback_data)
+время выполнения, ожидание в sync_to_async, число SQL-запросов и вызовов
+Bot API; метрики отдаются в формате Prometheus на http://<host>:METRICS_PORT/metrics.
+"""
+import logging
+import re
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware, Bot, Dispatcher
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import TelegramMethod
+from aiogram.types import CallbackQuery, TelegramObject
+from asgiref.sync import SyncToAsync
+from prometheus_client import Counter, Histogram, start_http_server
+
+from bot.core.config import METRICS_HOST, METRICS_PORT
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyTracker:
+    """
+    Задержки операции за последние window замеров.
+
+    Каждые report_every замеров в лог пишутся p50/p95/max.
+    """
+
+    def __init__(self, name: str, window: int = 1000, report_every: int = 100):
+        self.name = name
+        self.samples: deque[float] = deque(maxlen=window)
+        self.report_every = report_every
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.samples.append(seconds)
+        self.count += 1
+        if self.count % self.report_every == 0:
+            stats = self.snapshot()
+            logger.info(
+                f"Задержка {self.name}: p50={stats['p50'] * 1000:.1f} мс, "
+                f"p95={stats['p95'] * 1000:.1f} мс, max={stats['max'] * 1000:.1f} мс "
+                f"(замеров {stats['count']})")
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "max": max(self.samples, default=0.0),
+        }
+
+
+latency_trackers: Dict[str, LatencyTracker] = {}
+
+
+def get_latency_tracker(name: str) -> LatencyTracker:
+    tracker = latency_trackers.get(name)
+    if tracker is None:
+        tracker = latency_trackers[name] = LatencyTracker(name)
+    return tracker
+
+
+@asynccontextmanager
+async def track_latency(name: str):
+    """Замер времени выполнения блока: async with track_latency("product_view"): ..."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        get_latency_tracker(name).observe(elapsed)
+        BLOCK_SECONDS.labels(name).observe(elapsed)
+
+
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 12, 20, 35, 50, 100)
+CALL_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 20)
+
+HANDLER_SECONDS = Histogram(
+    "bot_handler_seconds", "Время выполнения обработчика", ["handler", "prefix"])
+HANDLER_SYNC_SECONDS = Histogram(
+    "bot_handler_sync_to_async_seconds", "Время ожидания sync_to_async в обработчике", ["handler", "prefix"])
+HANDLER_DB_QUERIES = Histogram(
+    "bot_handler_db_queries", "SQL-запросов за вызов обработчика", ["handler", "prefix"], buckets=QUERY_BUCKETS)
+HANDLER_API_CALLS = Histogram(
+    "bot_handler_api_calls", "Вызовов Bot API за вызов обработчика", ["handler", "prefix"], buckets=CALL_BUCKETS)
+HANDLER_ERRORS = Counter(
+    "bot_handler_errors_total", "Исключения в обработчиках", ["handler", "prefix"])
+API_CALLS = Counter("bot_api_calls_total", "Вызовы Bot API", ["method"])
+API_SECONDS = Histogram("bot_api_seconds", "Время вызова Bot API", ["method"])
+BLOCK_SECONDS = Histogram("bot_block_seconds", "Время выполнения отмеченных блоков (track_latency)", ["block"])
+
+
+@dataclass
+class HandlerStats:
+    """Счётчики текущего обработчика"""
+    queries: int = 0
+    api_calls: int = 0
+    sync_seconds: float = 0.0
+
+
+# Копируется в потоки sync_to_async, поэтому счётчики видны и в синхронном коде
+current_stats: ContextVar[Optional[HandlerStats]] = ContextVar("current_stats", default=None)
+
+
+class InstrumentedSyncToAsync(SyncToAsync):
+    """SyncToAsync, учитывающий время ожидания в статистике текущего обработчика"""
+
+    async def __call__(self, *args, **kwargs):
+        stats = current_stats.get()
+        if stats is None:
+            return await super().__call__(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return await super().__call__(*args, **kwargs)
+        finally:
+            stats.sync_seconds += time.perf_counter() - started
+
+
+def sync_to_async(func=None, *, thread_sensitive: bool = True, executor=None):
+    """Замена asgiref.sync.sync_to_async с учётом времени в метриках обработчика"""
+    if func is None:
+        return lambda f: InstrumentedSyncToAsync(f, thread_sensitive=thread_sensitive, executor=executor)
+    return InstrumentedSyncToAsync(func, thread_sensitive=thread_sensitive, executor=executor)
+
+
+def count_query(execute, sql, params, many, context):
+    """execute_wrapper: подсчёт SQL-запросов текущего обработчика"""
+    stats = current_stats.get()
+    if stats is not None:
+        stats.queries += 1
+    return execute(sql, params, many, context)
+
+
+def install_query_counter(sender, connection, **kwargs):
+    """Обработчик сигнала connection_created: wrapper ставится на каждое новое соединение"""
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+class ApiCallsMiddleware(BaseRequestMiddleware):
+    """Подсчёт вызовов Bot API (middleware сессии бота)"""
+
+    async def __call__(self, make_request: NextRequestMiddlewareType, bot: Bot, method: TelegramMethod):
+        name = type(method).__name__
+        stats = current_stats.get()
+        if stats is not None:
+            stats.api_calls += 1
+        API_CALLS.labels(name).inc()
+        with API_SECONDS.labels(name).time():
+            return await make_request(bot, method)
+
+
+_PREFIX_RE = re.compile(r"[^\d:]*:?")
+
+
+def callback_prefix(event: TelegramObject) -> str:
+    """Префикс callback_data без идентификаторов: cat_page_12_1 -> cat_page_, inc:5 -> inc:"""
+    if isinstance(event, CallbackQuery) and event.data:
+        return _PREFIX_RE.match(event.data).group(0)[:64]
+    return ""
+
+
+class MetricsMiddleware(BaseMiddleware):
+    """Внутренний middleware: метрики вызова обработчика"""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        handler_object = data.get("handler")
+        callback = getattr(handler_object, "callback", None)
+        name = f"{callback.__module__}.{callback.__qualname__}" if callback else "unknown"
+        labels = (name, callback_prefix(event))
+
+        stats = HandlerStats()
+        token = current_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            HANDLER_ERRORS.labels(*labels).inc()
+            raise
+        finally:
+            current_stats.reset(token)
+            HANDLER_SECONDS.labels(*labels).observe(time.perf_counter() - started)
+            HANDLER_SYNC_SECONDS.labels(*labels).observe(stats.sync_seconds)
+            HANDLER_DB_QUERIES.labels(*labels).observe(stats.queries)
+            HANDLER_API_CALLS.labels(*labels).observe(stats.api_calls)
+
+
+def setup_metrics(bot: Bot, dp: Dispatcher) -> None:
+    """Подключение метрик к боту и диспетчеру"""
+    from django.db.backends.signals import connection_created
+
+    from django.db import connections
+
+    connection_created.connect(install_query_counter, dispatch_uid="bot_metrics_query_counter")
+    for connection in connections.all(initialized_only=True):
+        install_query_counter(None, connection)
+    bot.session.middleware(ApiCallsMiddleware())
+    for observer in dp.observers.values():
+        if observer.event_name not in ("update", "error"):
+            observer.middleware(MetricsMiddleware())
+
+
+def start_metrics_server(port: int = METRICS_PORT, host: str = METRICS_HOST) -> None:
+    """HTTP-эндпоинт /metrics для Prometheus"""
+    if not port:
+        return
+    try:
+        start_http_server(port, addr=host)
+    except OSError as e:
+        # Порт уже занят (например, другим воркером на этой машине)
+        logger.warning("Не удалось запустить сервер метрик на порту %s: %s", port, e)
+        return
+    logger.info("Метрики Prometheus: http://%s:%s/metrics", host, port)
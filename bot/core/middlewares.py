@@ -0,0 +1,92 @@
+# bot/core/middlewares.py
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+from aiogram import BaseMiddleware
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message, TelegramObject
+
+from bot.core.config import SUBSCRIPTION_CHANNEL_ID, SUBSCRIPTION_GROUP_ID, FREE_ACCESS_COMMANDS
+from bot.handlers.start.subscriptions import check_subscriptions, SubscriptionStatus, SUBSCRIBED
+
+logger = logging.getLogger(__name__)
+
+# Команды и callback-и, доступные только подписчикам
+PROTECTED_COMMANDS = {"/catalog", "/profile", "/cart"} - set(FREE_ACCESS_COMMANDS)
+PROTECTED_CALLBACKS = {"catalog", "profile", "checkout", "clear_cart"}
+PROTECTED_CALLBACK_PREFIXES = ("price_list_", "increase_item_", "decrease_item_", "remove_item_", "cart_page_")
+
+# Не закрыты подпиской, но показывают меню с учётом подписки
+STATUS_COMMANDS = {"/start"}
+STATUS_CALLBACKS = {"main_menu"}
+STATUS_CALLBACK_PREFIXES = ("locked_",)
+
+
+def classify_event(event: TelegramObject) -> tuple[Optional[str], bool, bool]:
+    """
+    Определение ключа события и того, что для него нужно.
+
+    Возвращает (ключ, закрыто подпиской, нужен статус подписки).
+    """
+    if isinstance(event, Message):
+        command = (event.text or "").split(maxsplit=1)[0] if event.text else None
+        if command in PROTECTED_COMMANDS:
+            return command, True, True
+        return command, False, command in STATUS_COMMANDS
+    if isinstance(event, CallbackQuery):
+        data = event.data or ""
+        if data in PROTECTED_CALLBACKS or data.startswith(PROTECTED_CALLBACK_PREFIXES):
+            return data, True, True
+        return data, False, data in STATUS_CALLBACKS or data.startswith(STATUS_CALLBACK_PREFIXES)
+    return None, False, False
+
+
+async def deny_access(event: TelegramObject, text: str) -> None:
+    """Сообщение о необходимости подписки вместо обработки события"""
+    markup = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="⬅️ В меню", callback_data="main_menu")]
+    ])
+    params = dict(disable_web_page_preview=True, parse_mode="Markdown", reply_markup=markup)
+    if isinstance(event, Message):
+        await event.answer(text, **params)
+        return
+    try:
+        await event.message.edit_text(text, **params)
+    except TelegramBadRequest:
+        await event.message.answer(text, **params)
+    await event.answer()
+
+
+class SubscriptionMiddleware(BaseMiddleware):
+    """
+    Проверка подписки один раз на обновление.
+
+    Закрытые команды и callback-и описаны в PROTECTED_*; для остальных событий
+    статус проверяется только там, где он нужен для меню (STATUS_*).
+    Результат передаётся обработчикам в data["subscription"].
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user = data.get("event_from_user")
+        if not (SUBSCRIPTION_CHANNEL_ID or SUBSCRIPTION_GROUP_ID) or user is None:
+            data["subscription"] = SUBSCRIBED
+            return await handler(event, data)
+
+        key, protected, needs_status = classify_event(event)
+        if not needs_status:
+            # Событию статус подписки не нужен, проверка не выполняется
+            data["subscription"] = None
+            return await handler(event, data)
+
+        is_subscribed, message_text = await check_subscriptions(event.bot, user.id, key)
+        if protected and not is_subscribed:
+            logger.info("Пользователю %s закрыт доступ к %s: нет подписки", user.id, key)
+            await deny_access(event, message_text)
+            return None
+
+        data["subscription"] = SubscriptionStatus(is_subscribed, message_text)
+        return await handler(event, data)
@@ -0,0 +1,130 @@
+# bot/core/queue.py
+import asyncio
+import json
+import logging
+import multiprocessing
+import queue as std_queue
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from bot.core.config import (
+    UPDATE_QUEUE_BACKEND, UPDATE_QUEUE_PARTITIONS, UPDATE_QUEUE_PREFIX, REDIS_URL
+)
+
+logger = logging.getLogger(__name__)
+
+
+def extract_user_id(update: Dict[str, Any]) -> Optional[int]:
+    """
+    Определение ID пользователя, от которого пришло обновление.
+
+    Для событий без отправителя используется ID чата, иначе None.
+    """
+    for key, event in update.items():
+        if key == "update_id" or not isinstance(event, dict):
+            continue
+        for field in ("from", "user"):
+            user = event.get(field)
+            if isinstance(user, dict) and "id" in user:
+                return user["id"]
+        chat = event.get("chat") or (event.get("message") or {}).get("chat")
+        if isinstance(chat, dict) and "id" in chat:
+            return chat["id"]
+    return None
+
+
+def partition_for(update: Dict[str, Any], partitions: int) -> int:
+    """Номер партиции обновления: все обновления одного пользователя попадают в одну партицию"""
+    user_id = extract_user_id(update)
+    if user_id is None:
+        return 0
+    return user_id % partitions
+
+
+class UpdateQueue(ABC):
+    """
+    Очередь сырых обновлений Telegram, разбитая на партиции.
+
+    Внутри партиции порядок сохраняется (FIFO), партиции обрабатываются независимо.
+    """
+
+    def __init__(self, partitions: int = UPDATE_QUEUE_PARTITIONS):
+        self.partitions = partitions
+
+    async def put(self, update: Dict[str, Any]) -> int:
+        """Добавление обновления в партицию его пользователя. Возвращает номер партиции"""
+        partition = partition_for(update, self.partitions)
+        await self._put(partition, json.dumps(update, ensure_ascii=False))
+        return partition
+
+    async def get(self, partition: int, timeout: float = 5.0) -> Optional[Dict[str, Any]]:
+        """Следующее обновление партиции или None, если за timeout ничего не пришло"""
+        payload = await self._get(partition, timeout)
+        return json.loads(payload) if payload is not None else None
+
+    @abstractmethod
+    async def _put(self, partition: int, payload: str) -> None:
+        ...
+
+    @abstractmethod
+    async def _get(self, partition: int, timeout: float) -> Optional[str]:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisUpdateQueue(UpdateQueue):
+    """Очередь на списках Redis: по одному списку на партицию"""
+
+    def __init__(self, url: str = REDIS_URL, partitions: int = UPDATE_QUEUE_PARTITIONS,
+                 prefix: str = UPDATE_QUEUE_PREFIX):
+        super().__init__(partitions)
+        from redis.asyncio import Redis
+
+        self.redis = Redis.from_url(url)
+        self.prefix = prefix
+
+    def _key(self, partition: int) -> str:
+        return f"{self.prefix}:{partition}"
+
+    async def _put(self, partition: int, payload: str) -> None:
+        await self.redis.rpush(self._key(partition), payload)
+
+    async def _get(self, partition: int, timeout: float) -> Optional[str]:
+        item = await self.redis.blpop([self._key(partition)], timeout=timeout)
+        return item[1] if item else None
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+
+class MultiprocessingUpdateQueue(UpdateQueue):
+    """
+    Очередь на multiprocessing.Queue для запуска на одной машине и тестов.
+
+    Должна создаваться до запуска дочерних процессов, которые её используют.
+    """
+
+    def __init__(self, partitions: int = UPDATE_QUEUE_PARTITIONS):
+        super().__init__(partitions)
+        self.queues = [multiprocessing.Queue() for _ in range(partitions)]
+
+    async def _put(self, partition: int, payload: str) -> None:
+        self.queues[partition].put_nowait(payload)
+
+    async def _get(self, partition: int, timeout: float) -> Optional[str]:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(None, self.queues[partition].get, True, timeout)
+        except std_queue.Empty:
+            return None
+
+
+def create_update_queue(backend: str = UPDATE_QUEUE_BACKEND) -> UpdateQueue:
+    """Создание очереди по настройке UPDATE_QUEUE_BACKEND"""
+    if backend == "redis":
+        return RedisUpdateQueue()
+    if backend == "multiprocessing":
+        return MultiprocessingUpdateQueue()
+    raise ValueError(f"Неизвестный UPDATE_QUEUE_BACKEND: {backend}")
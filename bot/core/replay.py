@@ -0,0 +1,51 @@
+# bot/core/replay.py
+"""
+Отправка записанных обновлений на локальный webhook.
+
+Пример:
+    BOT_MODE=webhook WEBHOOK_SET_ON_STARTUP=False python -m bot.main
+    python -m bot.core.replay updates.jsonl
+
+Файл содержит по одному JSON-объекту Update в строке либо JSON-массив обновлений.
+"""
+import argparse
+import asyncio
+import json
+import logging
+from aiohttp import ClientSession
+
+from bot.core.config import WEBHOOK_PATH, WEBHOOK_PORT, WEBHOOK_SECRET
+
+logger = logging.getLogger(__name__)
+
+
+def load_updates(path: str) -> list[dict]:
+    """Чтение обновлений из файла (JSON Lines или JSON-массив)"""
+    with open(path, encoding="utf-8") as f:
+        content = f.read().strip()
+    if content.startswith("["):
+        return json.loads(content)
+    return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+
+async def replay(path: str, url: str, delay: float = 0.0):
+    """Последовательная отправка обновлений на webhook"""
+    headers = {"X-Telegram-Bot-Api-Secret-Token": WEBHOOK_SECRET} if WEBHOOK_SECRET else {}
+    updates = load_updates(path)
+    async with ClientSession() as session:
+        for update in updates:
+            async with session.post(url, json=update, headers=headers) as response:
+                logger.info("update_id=%s: HTTP %s", update.get('update_id'), response.status)
+            if delay:
+                await asyncio.sleep(delay)
+    logger.info("Отправлено обновлений: %s", len(updates))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Отправка записанных обновлений на webhook")
+    parser.add_argument("path", help="Файл с обновлениями")
+    parser.add_argument("--url", default=f"http://127.0.0.1:{WEBHOOK_PORT}{WEBHOOK_PATH}")
+    parser.add_argument("--delay", type=float, default=0.0, help="Пауза между обновлениями, сек.")
+    args = parser.parse_args()
+    asyncio.run(replay(args.path, args.url, args.delay))
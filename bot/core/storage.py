@@ -0,0 +1,220 @@
+# bot/core/storage.py
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from aiogram import Dispatcher
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, KeyBuilder, StateType, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+from bot.core.metrics import sync_to_async
+
+from bot.core.config import FSM_STORAGE, FSM_STATE_TTL, FSM_DATA_TTL, FSM_PURGE_INTERVAL, REDIS_URL
+
+logger = logging.getLogger(__name__)
+
+
+def _state_name(state: StateType) -> Optional[str]:
+    return state.state if isinstance(state, State) else state
+
+
+class RedisHashStorage(BaseStorage):
+    """
+    Хранилище FSM в Redis.
+
+    Данные хранятся в хеше: каждое поле — отдельное значение в msgpack,
+    поэтому update_data записывает только изменившиеся поля, а не весь словарь.
+    Ключам назначается TTL, чтобы брошенные сессии не копились.
+    """
+
+    def __init__(self, url: str = REDIS_URL, state_ttl: int = FSM_STATE_TTL, data_ttl: int = FSM_DATA_TTL,
+                 key_builder: Optional[KeyBuilder] = None):
+        import msgpack
+        from redis.asyncio import Redis
+
+        self.redis = Redis.from_url(url)
+        self.state_ttl = state_ttl
+        self.data_ttl = data_ttl
+        self.key_builder = key_builder or DefaultKeyBuilder()
+        self._packb = msgpack.packb
+        self._unpackb = msgpack.unpackb
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        redis_key = self.key_builder.build(key, "state")
+        if state is None:
+            await self.redis.delete(redis_key)
+        else:
+            await self.redis.set(redis_key, _state_name(state), ex=self.state_ttl)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        value = await self.redis.get(self.key_builder.build(key, "state"))
+        return value.decode() if isinstance(value, bytes) else value
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        redis_key = self.key_builder.build(key, "data")
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(redis_key)
+            if data:
+                pipe.hset(redis_key, mapping={k: self._packb(v) for k, v in data.items()})
+                pipe.expire(redis_key, self.data_ttl)
+            await pipe.execute()
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        raw = await self.redis.hgetall(self.key_builder.build(key, "data"))
+        return {k.decode(): self._unpackb(v) for k, v in raw.items()}
+
+    async def get_value(self, storage_key: StorageKey, dict_key: str, default: Any = None) -> Any:
+        raw = await self.redis.hget(self.key_builder.build(storage_key, "data"), dict_key)
+        return default if raw is None else self._unpackb(raw)
+
+    async def update_data(self, key: StorageKey, data: Dict[str, Any]) -> Dict[str, Any]:
+        redis_key = self.key_builder.build(key, "data")
+        current = await self.get_data(key)
+        changed = {k: v for k, v in data.items() if k not in current or current[k] != v}
+        if changed:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.hset(redis_key, mapping={k: self._packb(v) for k, v in changed.items()})
+                pipe.expire(redis_key, self.data_ttl)
+                await pipe.execute()
+            current.update(changed)
+        return current
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+
+class DatabaseStorage(BaseStorage):
+    """
+    Хранилище FSM в таблице BotFSMState (запасной вариант без Redis).
+
+    update_data пишет в базу только при изменении данных; в PostgreSQL
+    изменившиеся ключи дописываются в jsonb оператором ||.
+    """
+
+    def __init__(self, ttl: int = max(FSM_STATE_TTL, FSM_DATA_TTL), key_builder: Optional[KeyBuilder] = None):
+        self.ttl = timedelta(seconds=ttl)
+        self.key_builder = key_builder or DefaultKeyBuilder()
+        self.purge_task: Optional[asyncio.Task] = None
+
+    def _expires_at(self):
+        from django.utils import timezone
+        return timezone.now() + self.ttl
+
+    @staticmethod
+    def _load(db_key: str):
+        from django.utils import timezone
+        from django_app.shop.models import BotFSMState
+
+        return BotFSMState.objects.filter(key=db_key, expires_at__gt=timezone.now()).first()
+
+    def _write(self, db_key: str, **fields) -> None:
+        """
+        Запись полей с продлением срока жизни.
+
+        Просроченная запись считается отсутствующей: непереданные поля
+        сбрасываются, а не воскрешают старые состояние или данные.
+        """
+        from django.db import transaction
+        from django.utils import timezone
+        from django_app.shop.models import BotFSMState
+
+        with transaction.atomic():
+            record = BotFSMState.objects.select_for_update().filter(key=db_key).first()
+            if record is None or record.expires_at <= timezone.now():
+                fields = {'state': None, 'data': {}, **fields}
+            BotFSMState.objects.update_or_create(
+                key=db_key, defaults={**fields, 'expires_at': self._expires_at()}
+            )
+
+    @sync_to_async
+    def _set_fields(self, db_key: str, **fields) -> None:
+        self._write(db_key, **fields)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        await self._set_fields(self.key_builder.build(key), state=_state_name(state))
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        record = await sync_to_async(self._load)(self.key_builder.build(key))
+        return record.state if record else None
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        await self._set_fields(self.key_builder.build(key), data=data)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        record = await sync_to_async(self._load)(self.key_builder.build(key))
+        return dict(record.data) if record else {}
+
+    @sync_to_async
+    def _update_data(self, db_key: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        from django.db import connection
+        from django.db.models import F, Value
+        from django.db.models.expressions import CombinedExpression
+        from django.db.models.fields.json import JSONField
+        from django_app.shop.models import BotFSMState
+
+        record = self._load(db_key)
+        current = dict(record.data) if record else {}
+        changed = {k: v for k, v in data.items() if k not in current or current[k] != v}
+        if not changed:
+            return current
+        current.update(changed)
+
+        if record and connection.vendor == 'postgresql':
+            BotFSMState.objects.filter(key=db_key).update(
+                data=CombinedExpression(
+                    F('data'), '||', Value(changed, output_field=JSONField())
+                ),
+                expires_at=self._expires_at(),
+            )
+        else:
+            self._write(db_key, data=current)
+        return current
+
+    async def update_data(self, key: StorageKey, data: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._update_data(self.key_builder.build(key), data)
+
+    @sync_to_async
+    def purge_expired(self) -> int:
+        """Удаление просроченных записей"""
+        from django.utils import timezone
+        from django_app.shop.models import BotFSMState
+
+        deleted, _ = BotFSMState.objects.filter(expires_at__lte=timezone.now()).delete()
+        return deleted
+
+    async def run_purge(self, interval: int = FSM_PURGE_INTERVAL) -> None:
+        """Периодическое удаление просроченных записей"""
+        while True:
+            try:
+                deleted = await self.purge_expired()
+                if deleted:
+                    logger.info("Удалено просроченных состояний FSM: %s", deleted)
+            except Exception as e:
+                logger.error("Ошибка очистки состояний FSM: %s", e, exc_info=True)
+            await asyncio.sleep(interval)
+
+    async def close(self) -> None:
+        pass
+
+
+async def on_storage_startup(dispatcher: Dispatcher) -> None:
+    """Запуск периодической очистки, если состояния хранятся в базе"""
+    storage = dispatcher.storage
+    if isinstance(storage, DatabaseStorage):
+        # Ссылка сохраняется, чтобы задачу не удалил сборщик мусора
+        storage.purge_task = asyncio.create_task(storage.run_purge())
+
+
+def create_storage(backend: str = FSM_STORAGE) -> BaseStorage:
+    """Создание хранилища FSM по настройке FSM_STORAGE"""
+    if backend == "redis":
+        storage = RedisHashStorage()
+    elif backend == "db":
+        storage = DatabaseStorage()
+    elif backend == "memory":
+        storage = MemoryStorage()
+    else:
+        raise ValueError(f"Неизвестный FSM_STORAGE: {backend}")
+    logger.info("Хранилище FSM: %s", type(storage).__name__)
+    return storage
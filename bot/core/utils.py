@@ -1,5 +1,5 @@
 import logging
-from asgiref.sync import sync_to_async
+from bot.core.metrics import sync_to_async
 from django_app.shop.models import TelegramUser
 
 logger = logging.getLogger(__name__)
@@ -27,7 +27,7 @@ def get_or_create_user(user_id: int, **kwargs) -> tuple[TelegramUser, bool]:
         }
     )
     if created:
-        logger.info(f"Создан новый пользователь: {user}")
+        logger.info("Создан новый пользователь: %s", user)
     else:
-        logger.debug(f"Пользователь найден: {user}")
+        logger.debug("Пользователь найден: %s", user)
     return user, created
@@ -0,0 +1,61 @@
+# bot/core/webhook.py
+import asyncio
+import logging
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+
+from bot.core.config import (
+    WEBHOOK_BASE_URL, WEBHOOK_PATH, WEBHOOK_SECRET, WEBHOOK_HOST, WEBHOOK_PORT,
+    WEBHOOK_MAX_CONNECTIONS, WEBHOOK_SET_ON_STARTUP
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def on_webhook_startup(bot: Bot, dispatcher: Dispatcher):
+    """Регистрация webhook в Telegram при запуске"""
+    if not WEBHOOK_SET_ON_STARTUP:
+        logger.info("WEBHOOK_SET_ON_STARTUP=False, set_webhook не вызывается")
+        return
+    if not WEBHOOK_BASE_URL:
+        raise ValueError("WEBHOOK_BASE_URL не задан для режима webhook")
+
+    allowed_updates = dispatcher.resolve_used_update_types()
+    await bot.set_webhook(
+        url=f"{WEBHOOK_BASE_URL.rstrip('/')}{WEBHOOK_PATH}",
+        secret_token=WEBHOOK_SECRET,
+        max_connections=WEBHOOK_MAX_CONNECTIONS,
+        allowed_updates=allowed_updates,
+    )
+    logger.info("Webhook установлен, allowed_updates=%s", allowed_updates)
+
+
+def build_webhook_app(bot: Bot, dp: Dispatcher) -> web.Application:
+    """Создание aiohttp-приложения, принимающего обновления от Telegram"""
+    if not WEBHOOK_SECRET:
+        logger.warning("WEBHOOK_SECRET не задан, запросы к webhook не проверяются")
+
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        secret_token=WEBHOOK_SECRET,
+    ).register(app, path=WEBHOOK_PATH)
+    dp.startup.register(on_webhook_startup)
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+async def run_webhook(bot: Bot, dp: Dispatcher):
+    """Запуск HTTP-сервера webhook до остановки процесса"""
+    app = build_webhook_app(bot, dp)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host=WEBHOOK_HOST, port=WEBHOOK_PORT)
+    await site.start()
+    logger.info("Webhook слушает http://%s:%s%s", WEBHOOK_HOST, WEBHOOK_PORT, WEBHOOK_PATH)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
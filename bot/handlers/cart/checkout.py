@@ -10,7 +10,7 @@ from .models import async_get_or_create_user, async_get_cart, async_get_cart_ite
 from .keyboards import generate_edit_choice_keyboard, generate_back_keyboard, generate_skip_keyboard, generate_confirmation_keyboard  # Обновлённый импорт
 from .states import OrderState
 from .utils import (
-    ensure_subscription, delete_previous_message, send_message_with_state,
+    delete_previous_message, send_message_with_state,
     generate_order_text, back_to_previous_state, show_cart
 )
 from bot.core.config import SUPPORT_TELEGRAM
@@ -25,11 +25,7 @@ router = Router()
 async def start_checkout(callback: CallbackQuery, state: FSMContext):
     """Начинает процесс оформления заказа."""
     user_id = callback.from_user.id
-    logger.info(f"Пользователь {user_id} начинает оформление заказа.")
-
-    # Проверка подписки
-    if not await ensure_subscription(callback, user_id, "checkout"):
-        return
+    logger.info("Пользователь %s начинает оформление заказа.", user_id)
 
     user, _ = await async_get_or_create_user(user_id)
     cart_items = await async_get_cart_items(user)
@@ -187,7 +183,7 @@ async def back_from_confirmation(callback: CallbackQuery, state: FSMContext):
 async def confirm_order(callback: CallbackQuery, state: FSMContext, bot: Bot):
     """Обрабатывает подтверждение заказа."""
     user_id = callback.from_user.id
-    logger.info(f"Пользователь {user_id} подтверждает заказ.")
+    logger.info("Пользователь %s подтверждает заказ.", user_id)
 
     data = await state.get_data()
     user, _ = await async_get_or_create_user(user_id)
@@ -243,20 +239,20 @@ async def confirm_order(callback: CallbackQuery, state: FSMContext, bot: Bot):
                     parse_mode=ParseMode.HTML
                 )
                 logger.info(
-                    f"Уведомление о заказе #{order.id} успешно отправлено администратору в чат {admin_chat_id}")
+                    "Уведомление о заказе #%s успешно отправлено администратору в чат %s", order.id, admin_chat_id)
             except ValueError:
                 logger.error(
-                    f"Некорректный формат SUPPORT_TELEGRAM: {SUPPORT_TELEGRAM}. Ожидается числовой ID чата.")
+                    "Некорректный формат SUPPORT_TELEGRAM: %s. Ожидается числовой ID чата.", SUPPORT_TELEGRAM)
             except Exception as e:
                 logger.error(
-                    f"Ошибка отправки уведомления администратору: {e}")
+                    "Ошибка отправки уведомления администратору: %s", e)
         else:
             logger.warning(
                 "SUPPORT_TELEGRAM не указан в .env, уведомление администратору не отправлено.")
 
     except Exception as e:
         logger.error(
-            f"Ошибка создания заказа для пользователя {user_id}: {e}", exc_info=True)
+            "Ошибка создания заказа для пользователя %s: %s", user_id, e, exc_info=True)
         await callback.message.answer(
             f"❌ Ошибка при оформлении заказа: {str(e)}. Пожалуйста, попробуйте снова или обратитесь в поддержку: {SUPPORT_TELEGRAM}",
             reply_markup=InlineKeyboardMarkup(inline_keyboard=[
@@ -6,7 +6,7 @@ from aiogram.fsm.context import FSMContext
 from .models import (
     async_get_or_create_user, async_update_cart_item_quantity, async_remove_item_from_cart, async_clear_cart
 )
-from .utils import ensure_subscription, show_cart
+from .utils import show_cart
 
 # Настройка логирования
 logger = logging.getLogger(__name__)
@@ -19,12 +19,7 @@ router = Router()
 async def handle_cart(request: Message | CallbackQuery, state: FSMContext) -> None:
     """Обработчик кнопки/команды 'Корзина'."""
     user_id = request.from_user.id
-    logger.info(f"Пользователь {user_id} запросил корзину.")
-
-    # Проверка подписки
-    if isinstance(request, Message):
-        if not await ensure_subscription(request, user_id, "/cart"):
-            return
+    logger.info("Пользователь %s запросил корзину.", user_id)
 
     user, _ = await async_get_or_create_user(tg_id=user_id)
     await state.update_data(cart_page=1)
@@ -35,11 +30,7 @@ async def handle_cart(request: Message | CallbackQuery, state: FSMContext) -> No
 async def increase_item(callback: CallbackQuery, state: FSMContext):
     """Увеличивает количество товара в корзине."""
     user_id = callback.from_user.id
-    logger.info(f"Пользователь {user_id} увеличивает количество товара.")
-
-    # Проверка подписки
-    if not await ensure_subscription(callback, user_id, "increase_item"):
-        return
+    logger.info("Пользователь %s увеличивает количество товара.", user_id)
 
     user, _ = await async_get_or_create_user(tg_id=user_id)
     product_id = int(callback.data.split("_")[-1])
@@ -47,7 +38,7 @@ async def increase_item(callback: CallbackQuery, state: FSMContext):
     await async_update_cart_item_quantity(user, product_id, 1)
     await callback.answer("Количество увеличено")
     logger.info(
-        f"Пользователь {user_id} увеличил количество товара {product_id}.")
+        "Пользователь %s увеличил количество товара %s.", user_id, product_id)
 
     data = await state.get_data()
     page = data.get("cart_page", 1)
@@ -58,11 +49,7 @@ async def increase_item(callback: CallbackQuery, state: FSMContext):
 async def decrease_item(callback: CallbackQuery, state: FSMContext):
     """Уменьшает количество товара в корзине."""
     user_id = callback.from_user.id
-    logger.info(f"Пользователь {user_id} уменьшает количество товара.")
-
-    # Проверка подписки
-    if not await ensure_subscription(callback, user_id, "decrease_item"):
-        return
+    logger.info("Пользователь %s уменьшает количество товара.", user_id)
 
     user, _ = await async_get_or_create_user(tg_id=user_id)
     product_id = int(callback.data.split("_")[-1])
@@ -70,7 +57,7 @@ async def decrease_item(callback: CallbackQuery, state: FSMContext):
     await async_update_cart_item_quantity(user, product_id, -1)
     await callback.answer("Количество уменьшено")
     logger.info(
-        f"Пользователь {user_id} уменьшил количество товара {product_id}.")
+        "Пользователь %s уменьшил количество товара %s.", user_id, product_id)
 
     data = await state.get_data()
     page = data.get("cart_page", 1)
@@ -81,11 +68,7 @@ async def decrease_item(callback: CallbackQuery, state: FSMContext):
 async def remove_item(callback: CallbackQuery, state: FSMContext):
     """Удаляет товар из корзины."""
     user_id = callback.from_user.id
-    logger.info(f"Пользователь {user_id} удаляет товар из корзины.")
-
-    # Проверка подписки
-    if not await ensure_subscription(callback, user_id, "remove_item"):
-        return
+    logger.info("Пользователь %s удаляет товар из корзины.", user_id)
 
     user, _ = await async_get_or_create_user(tg_id=user_id)
     product_id = int(callback.data.split("_")[-1])
@@ -93,7 +76,7 @@ async def remove_item(callback: CallbackQuery, state: FSMContext):
     await async_remove_item_from_cart(user, product_id)
     await callback.answer("Товар удалён из корзины")
     logger.info(
-        f"Пользователь {user_id} удалил товар {product_id} из корзины.")
+        "Пользователь %s удалил товар %s из корзины.", user_id, product_id)
 
     data = await state.get_data()
     page = data.get("cart_page", 1)
@@ -104,11 +87,7 @@ async def remove_item(callback: CallbackQuery, state: FSMContext):
 async def handle_cart_pagination(callback: CallbackQuery, state: FSMContext):
     """Обрабатывает пагинацию в корзине."""
     user_id = callback.from_user.id
-    logger.info(f"Пользователь {user_id} переключает страницу корзины.")
-
-    # Проверка подписки
-    if not await ensure_subscription(callback, user_id, "cart_page"):
-        return
+    logger.info("Пользователь %s переключает страницу корзины.", user_id)
 
     user, _ = await async_get_or_create_user(tg_id=user_id)
     page = int(callback.data.split("_")[-1])
@@ -122,16 +101,12 @@ async def handle_cart_pagination(callback: CallbackQuery, state: FSMContext):
 async def clear_cart_handler(callback: CallbackQuery, state: FSMContext):
     """Очищает корзину."""
     user_id = callback.from_user.id
-    logger.info(f"Пользователь {user_id} очищает корзину.")
-
-    # Проверка подписки
-    if not await ensure_subscription(callback, user_id, "clear_cart"):
-        return
+    logger.info("Пользователь %s очищает корзину.", user_id)
 
     user, _ = await async_get_or_create_user(tg_id=user_id)
     await async_clear_cart(user)
     await callback.answer("Корзина очищена")
-    logger.info(f"Пользователь {user_id} очистил корзину.")
+    logger.info("Пользователь %s очистил корзину.", user_id)
 
     await state.update_data(cart_page=1)
     await show_cart(user, callback, page=1)
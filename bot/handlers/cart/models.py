@@ -1,6 +1,6 @@
 import os
 import django
-from asgiref.sync import sync_to_async
+from bot.core.metrics import sync_to_async
 import logging
 from django.core.exceptions import ObjectDoesNotExist
 from django.db.models import Sum, F
@@ -48,14 +48,14 @@ def get_or_create_user(tg_id: int, first_name: str = None, last_name: str = None
                     setattr(user, field, value)
                 user.save(update_fields=list(update_fields.keys()))
                 logger.info(
-                    f"Обновлены данные пользователя {tg_id}: {update_fields}")
+                    "Обновлены данные пользователя %s: %s", tg_id, update_fields)
 
         logger.info(
-            f"Пользователь {tg_id} {'создан' if created else 'найден'} в базе данных.")
+            "Пользователь %s %s в базе данных.", tg_id, 'создан' if created else 'найден')
         return user, created
     except Exception as e:
         logger.error(
-            f"Ошибка при получении/создании пользователя {tg_id}: {e}")
+            "Ошибка при получении/создании пользователя %s: %s", tg_id, e)
         raise
 
 
@@ -66,11 +66,11 @@ def get_cart(user):
     try:
         cart, _ = Cart.objects.get_or_create(user=user, is_active=True)
         logger.info(
-            f"Корзина ID {cart.id} найдена/создана для пользователя {user.telegram_id}.")
+            "Корзина ID %s найдена/создана для пользователя %s.", cart.id, user.telegram_id)
         return cart
     except Exception as e:
         logger.error(
-            f"Ошибка при получении корзины для пользователя {user.telegram_id}: {e}")
+            "Ошибка при получении корзины для пользователя %s: %s", user.telegram_id, e)
         raise
 
 
@@ -85,11 +85,11 @@ def get_cart_items(user):
             is_active=True
         ).select_related("product").select_related("product__category").order_by('id'))
         logger.info(
-            f"Найдено {len(items)} активных элементов в корзине пользователя {user.telegram_id}.")
+            "Найдено %s активных элементов в корзине пользователя %s.", len(items), user.telegram_id)
         return items
     except Exception as e:
         logger.error(
-            f"Ошибка при получении элементов корзины для пользователя {user.telegram_id}: {e}")
+            "Ошибка при получении элементов корзины для пользователя %s: %s", user.telegram_id, e)
         raise
 
 
@@ -111,7 +111,7 @@ def add_to_cart(user, product_id, quantity: int = 1):
             cart_item.quantity += quantity
             cart_item.save()
             logger.info(
-                f"Количество товара {product_id} в корзине ID {cart.id} увеличено до {cart_item.quantity}.")
+                "Количество товара %s в корзине ID %s увеличено до %s.", product_id, cart.id, cart_item.quantity)
         else:
             # Если товара нет, создаём новую запись
             cart_item = CartItem.objects.create(
@@ -121,12 +121,12 @@ def add_to_cart(user, product_id, quantity: int = 1):
                 is_active=True
             )
             logger.info(
-                f"Товар {product_id} добавлен в корзину ID {cart.id} с количеством {quantity}.")
+                "Товар %s добавлен в корзину ID %s с количеством %s.", product_id, cart.id, quantity)
 
         return cart_item
     except Exception as e:
         logger.error(
-            f"Ошибка при добавлении товара {product_id} в корзину пользователя {user.telegram_id}: {e}")
+            "Ошибка при добавлении товара %s в корзину пользователя %s: %s", product_id, user.telegram_id, e)
         raise
 
 
@@ -144,23 +144,23 @@ def update_cart_item_quantity(user, product_id, delta):
                 item.is_active = False
                 item.save()
                 logger.info(
-                    f"Товар {product_id} удалён из корзины ID {cart.id} (количество стало 0).")
+                    "Товар %s удалён из корзины ID %s (количество стало 0).", product_id, cart.id)
             else:
                 item.quantity = new_quantity
                 item.save()
                 logger.info(
-                    f"Количество товара {product_id} в корзине ID {cart.id} обновлено до {new_quantity}.")
+                    "Количество товара %s в корзине ID %s обновлено до %s.", product_id, cart.id, new_quantity)
             if not CartItem.objects.filter(cart=cart, is_active=True).exists():
                 cart.is_active = False
                 cart.save()
                 logger.info(
-                    f"Корзина ID {cart.id} стала неактивной, так как все элементы удалены.")
+                    "Корзина ID %s стала неактивной, так как все элементы удалены.", cart.id)
     except ObjectDoesNotExist:
         logger.warning(
-            f"Корзина или товар {product_id} не найдены для пользователя {user.telegram_id}.")
+            "Корзина или товар %s не найдены для пользователя %s.", product_id, user.telegram_id)
     except Exception as e:
         logger.error(
-            f"Ошибка при обновлении количества товара {product_id} для пользователя {user.telegram_id}: {e}")
+            "Ошибка при обновлении количества товара %s для пользователя %s: %s", product_id, user.telegram_id, e)
         raise
 
 
@@ -175,18 +175,18 @@ def remove_item_from_cart(user, product_id):
         for item in items:
             item.is_active = False
             item.save()
-        logger.info(f"Товар {product_id} удалён из корзины ID {cart.id}.")
+        logger.info("Товар %s удалён из корзины ID %s.", product_id, cart.id)
         if not CartItem.objects.filter(cart=cart, is_active=True).exists():
             cart.is_active = False
             cart.save()
             logger.info(
-                f"Корзина ID {cart.id} стала неактивной, так как все элементы удалены.")
+                "Корзина ID %s стала неактивной, так как все элементы удалены.", cart.id)
     except ObjectDoesNotExist:
         logger.warning(
-            f"Корзина или товар {product_id} не найдены для пользователя {user.telegram_id}.")
+            "Корзина или товар %s не найдены для пользователя %s.", product_id, user.telegram_id)
     except Exception as e:
         logger.error(
-            f"Ошибка при удалении товара {product_id} из корзины пользователя {user.telegram_id}: {e}")
+            "Ошибка при удалении товара %s из корзины пользователя %s: %s", product_id, user.telegram_id, e)
         raise
 
 
@@ -201,13 +201,13 @@ def clear_cart(user):
         cart.is_active = False
         cart.save()
         logger.info(
-            f"Корзина ID {cart.id} очищена для пользователя {user.telegram_id}.")
+            "Корзина ID %s очищена для пользователя %s.", cart.id, user.telegram_id)
     except ObjectDoesNotExist:
         logger.warning(
-            f"Активная корзина не найдена для пользователя {user.telegram_id}.")
+            "Активная корзина не найдена для пользователя %s.", user.telegram_id)
     except Exception as e:
         logger.error(
-            f"Ошибка при очистке корзины пользователя {user.telegram_id}: {e}")
+            "Ошибка при очистке корзины пользователя %s: %s", user.telegram_id, e)
         raise
 
 
@@ -241,15 +241,15 @@ def create_order(user_id, address, phone, wishes=None, desired_delivery_time=Non
         cart.save()
 
         logger.info(
-            f"Заказ #{order.id} создан для пользователя {user_id} на сумму {total} ₽.")
+            "Заказ #%s создан для пользователя %s на сумму %s ₽.", order.id, user_id, total)
         return order
     except ObjectDoesNotExist as e:
         logger.error(
-            f"Ошибка при создании заказа: пользователь {user_id} или корзина не найдены: {e}")
+            "Ошибка при создании заказа: пользователь %s или корзина не найдены: %s", user_id, e)
         raise
     except Exception as e:
         logger.error(
-            f"Ошибка при создании заказа для пользователя {user_id}: {e}")
+            "Ошибка при создании заказа для пользователя %s: %s", user_id, e)
         raise
 
 
@@ -261,11 +261,11 @@ def get_cart_quantity(user):
         cart = get_cart(user)
         quantity = cart.items.filter(is_active=True).aggregate(
             total=Sum('quantity'))['total'] or 0
-        logger.info(f"Количество товаров в корзине ID {cart.id}: {quantity}.")
+        logger.info("Количество товаров в корзине ID %s: %s.", cart.id, quantity)
         return quantity
     except Exception as e:
         logger.error(
-            f"Ошибка при подсчёте количества товаров для пользователя {user.telegram_id}: {e}")
+            "Ошибка при подсчёте количества товаров для пользователя %s: %s", user.telegram_id, e)
         return 0
 
 
@@ -278,11 +278,11 @@ def get_cart_total(user):
         total = cart.items.filter(is_active=True).aggregate(
             total=Sum(F('product__price') * F('quantity'))
         )['total'] or 0
-        logger.info(f"Общая сумма корзины ID {cart.id}: {total} ₽.")
+        logger.info("Общая сумма корзины ID %s: %s ₽.", cart.id, total)
         return total
     except Exception as e:
         logger.error(
-            f"Ошибка при подсчёте суммы корзины для пользователя {user.telegram_id}: {e}")
+            "Ошибка при подсчёте суммы корзины для пользователя %s: %s", user.telegram_id, e)
         return 0
 
 
@@ -311,13 +311,13 @@ def get_cart_details(cart_id):
         formatted_total = f"{total:.{PRICE_DECIMAL_PLACES}f}"
         first_item_photo = items[0].product.photo.url if items and items[0].product.photo else None
         logger.info(
-            f"Детали корзины ID {cart_id}: {len(items)} товаров, итого {formatted_total} ₽.")
+            "Детали корзины ID %s: %s товаров, итого %s ₽.", cart_id, len(items), formatted_total)
         return items_text, total, first_item_photo
     except ObjectDoesNotExist:
-        logger.error(f"Корзина ID {cart_id} не найдена.")
+        logger.error("Корзина ID %s не найдена.", cart_id)
         raise
     except Exception as e:
-        logger.error(f"Ошибка при получении деталей корзины ID {cart_id}: {e}")
+        logger.error("Ошибка при получении деталей корзины ID %s: %s", cart_id, e)
         raise
 
 
@@ -343,10 +343,10 @@ def get_order_details(order_id):
         total = sum(float(item.product.price) *
                     item.quantity for item in items)  # Приводим к float
         logger.info(
-            f"Детали заказа #{order_id}: {len(items)} товаров, итого {total} ₽.")
+            "Детали заказа #%s: %s товаров, итого %s ₽.", order_id, len(items), total)
         return items_text, total
     except Exception as e:
-        logger.error(f"Ошибка при получении деталей заказа #{order_id}: {e}")
+        logger.error("Ошибка при получении деталей заказа #%s: %s", order_id, e)
         raise
 
 # Асинхронные обёртки
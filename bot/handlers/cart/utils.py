@@ -7,27 +7,12 @@ from aiogram.exceptions import TelegramBadRequest
 
 from .models import async_get_cart, async_get_cart_items, async_get_cart_quantity, async_get_cart_total, async_get_cart_details, async_get_order_details
 from .keyboards import generate_cart_keyboard, generate_back_keyboard, generate_skip_keyboard, generate_confirmation_keyboard, generate_empty_cart_keyboard
-from bot.core.config import SUBSCRIPTION_CHANNEL_ID, SUBSCRIPTION_GROUP_ID, CART_ITEMS_PER_PAGE, PRICE_DECIMAL_PLACES, CART_EMOJI, CART_LABEL, CART_CURRENCY, CART_EMPTY_TEXT
-from bot.handlers.start.subscriptions import check_subscriptions
+from bot.core.config import CART_ITEMS_PER_PAGE, PRICE_DECIMAL_PLACES, CART_EMOJI, CART_LABEL, CART_CURRENCY, CART_EMPTY_TEXT
 
 # Настройка логирования
 logger = logging.getLogger(__name__)
 
 
-async def ensure_subscription(request: Message | CallbackQuery, user_id: int, command: str) -> bool:
-    """Проверяет подписку пользователя и возвращает True, если доступ разрешён."""
-    if SUBSCRIPTION_CHANNEL_ID or SUBSCRIPTION_GROUP_ID:
-        subscription_result, message_text = await check_subscriptions(request.bot, user_id, command)
-        if not subscription_result:
-            await request.answer(
-                message_text,
-                disable_web_page_preview=True,
-                parse_mode="Markdown"
-            )
-            return False
-    return True
-
-
 async def delete_previous_message(request: Message | CallbackQuery, state: FSMContext) -> None:
     """Удаляет предыдущее сообщение, если его ID сохранён в состоянии."""
     data = await state.get_data()
@@ -40,7 +25,7 @@ async def delete_previous_message(request: Message | CallbackQuery, state: FSMCo
                 await request.message.delete()
         except Exception as e:
             logger.warning(
-                f"Не удалось удалить сообщение (message_id={message_id}): {e}")
+                "Не удалось удалить сообщение (message_id=%s): %s", message_id, e)
 
 
 async def send_message_with_state(
@@ -150,7 +135,7 @@ async def _send_cart_message(
             await message.answer()
     except TelegramBadRequest as e:
         logger.error(
-            f"Ошибка при отображении корзины для пользователя {message.from_user.id}: {e}")
+            "Ошибка при отображении корзины для пользователя %s: %s", message.from_user.id, e)
         if isinstance(message, Message):
             await message.answer(text, reply_markup=kb, parse_mode=ParseMode.HTML)
         else:
@@ -180,7 +165,7 @@ async def show_cart(user, message: Message | CallbackQuery, page: int = 1) -> No
 
     # Логируем для проверки
     logger.info(
-        f"Количество элементов (CartItem): {len(items)}, общее количество товаров: {cart_quantity}")
+        "Количество элементов (CartItem): %s, общее количество товаров: %s", len(items), cart_quantity)
 
     # Форматируем сумму
     formatted_total = f"{float(cart_total):.{PRICE_DECIMAL_PLACES}f}"
@@ -212,8 +197,8 @@ def format_cart_button_text(cart_total: float, cart_quantity: int) -> str:
             text = f"{CART_EMOJI} {CART_LABEL}: {cart_total_str} ({cart_quantity} шт.)"
         else:
             text = f"{CART_EMOJI} {CART_LABEL}: {CART_EMPTY_TEXT}"
-        logger.debug(f"Сгенерирован текст кнопки корзины: {text}")
+        logger.debug("Сгенерирован текст кнопки корзины: %s", text)
         return text
     except Exception as e:
-        logger.error(f"Ошибка при форматировании текста кнопки корзины: {e}")
+        logger.error("Ошибка при форматировании текста кнопки корзины: %s", e)
         return f"{CART_EMOJI} {CART_LABEL}: ошибка"
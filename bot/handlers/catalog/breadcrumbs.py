@@ -2,7 +2,6 @@ import logging
 from django_app.shop.models import Category
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
 logger.info("Загружен breadcrumbs.py версии 2025-04-22 без sync_to_async")
 
 
@@ -12,7 +11,7 @@ def get_category_path(category_id: str) -> str:
     :param category_id: ID категории или "root".
     :return: Строка с путём категорий (например, "Каталог > Электроника > Смартфоны").
     """
-    logger.debug(f"Формирование пути для категории: category_id={category_id}")
+    logger.debug("Формирование пути для категории: category_id=%s", category_id)
     if category_id == "root":
         return "🛍️ Каталог"
 
@@ -24,12 +23,12 @@ def get_category_path(category_id: str) -> str:
             current_category = current_category.parent
         path.reverse()
         result = "🛍️ " + " > ".join(path)
-        logger.debug(f"Путь категории сформирован: {result}")
+        logger.debug("Путь категории сформирован: %s", result)
         return result
     except Category.DoesNotExist:
-        logger.warning(f"Категория с ID {category_id} не найдена.")
+        logger.warning("Категория с ID %s не найдена.", category_id)
         return "🛍️ Каталог"
     except Exception as e:
         logger.error(
-            f"Ошибка при формировании пути категории {category_id}: {e}")
+            "Ошибка при формировании пути категории %s: %s", category_id, e)
         return "🛍️ Каталог"
@@ -1,12 +1,8 @@
 import logging
 from aiogram import Router, F
 from aiogram.types import CallbackQuery
-from asgiref.sync import sync_to_async
-from bot.core.config import (
-    SUBSCRIPTION_CHANNEL_ID, SUBSCRIPTION_GROUP_ID,
-    PRODUCT_NOT_FOUND, CATALOG_MESSAGE, CATALOG_ERROR
-)
-from bot.handlers.start.subscriptions import check_subscriptions
+from bot.core.metrics import sync_to_async
+from bot.core.config import PRODUCT_NOT_FOUND, CATALOG_MESSAGE, CATALOG_ERROR
 from .breadcrumbs import get_category_path
 from .data import get_categories, get_products_page
 from .keyboards import build_categories_keyboard, build_products_keyboard
@@ -15,7 +11,6 @@ from .utils import safe_edit_message, get_user_from_callback
 router = Router()
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
 logger.info("Загружен callbacks.py версии 2025-04-22")
 
 
@@ -34,21 +29,21 @@ async def categories_pagination(callback: CallbackQuery) -> None:
         page = int(parts[3])
         user_id = callback.from_user.id
         logger.info(
-            f"Пользователь {user_id} запросил категории, parent_id={parent_id}, страница {page}.")
+            "Пользователь %s запросил категории, parent_id=%s, страница %s.", user_id, parent_id, page)
 
         # Получаем текст, категории и общее количество страниц
-        logger.debug(f"Вызов get_categories('{parent_id}', {page}) в cat_page")
+        logger.debug("Вызов get_categories('%s', %s) в cat_page", parent_id, page)
         result = await get_categories(parent_id, page)
-        logger.info(f"Результат get_categories в cat_page: {result}")
         if not isinstance(result, tuple):
             logger.error(
-                f"get_categories вернул не кортеж: {type(result)}: {result}")
+                "get_categories вернул не кортеж: %s", type(result))
             raise ValueError(
                 f"get_categories вернул не кортеж: {type(result)}")
         text, categories, total_pages = result
+        logger.debug("get_categories в cat_page: категорий %s, страниц %s", len(categories), total_pages)
         if not isinstance(text, str):
             logger.error(
-                f"get_categories вернул не строку в text: {type(text)}: {text}")
+                "get_categories вернул не строку в text: %s: %s", type(text), text)
             text = CATALOG_ERROR
 
         # Получаем данные пользователя
@@ -64,7 +59,7 @@ async def categories_pagination(callback: CallbackQuery) -> None:
                     breadcrumb = await sync_to_async(get_category_path)(parent_id)
                     if not isinstance(breadcrumb, str):
                         logger.error(
-                            f"get_category_path вернул не строку: {type(breadcrumb)}: {breadcrumb}")
+                            "get_category_path вернул не строку: %s: %s", type(breadcrumb), breadcrumb)
                         breadcrumb = "🛍️ Каталог"
                     kb = await build_products_keyboard(int(parent_id), page, products, total_count, user)
                     await safe_edit_message(callback, f"{breadcrumb}\n\n{CATALOG_MESSAGE}", kb)
@@ -74,7 +69,7 @@ async def categories_pagination(callback: CallbackQuery) -> None:
                     breadcrumb = await sync_to_async(get_category_path)(parent_id)
                     if not isinstance(breadcrumb, str):
                         logger.error(
-                            f"get_category_path вернул не строку: {type(breadcrumb)}: {breadcrumb}")
+                            "get_category_path вернул не строку: %s: %s", type(breadcrumb), breadcrumb)
                         breadcrumb = "🛍️ Каталог"
                     text = f"{breadcrumb}\n\n{PRODUCT_NOT_FOUND}"
 
@@ -85,10 +80,10 @@ async def categories_pagination(callback: CallbackQuery) -> None:
         await safe_edit_message(callback, text, keyboard)
 
     except ValueError as e:
-        logger.error(f"Ошибка формата данных: {e}")
+        logger.error("Ошибка формата данных: %s", e)
         await callback.answer("❌ Неверный формат данных", show_alert=True)
     except Exception as e:
-        logger.error(f"Ошибка при отображении категорий: {str(e)}")
+        logger.error("Ошибка при отображении категорий: %s", str(e))
         await callback.answer("❌ Произошла ошибка при отображении категорий", show_alert=True)
     finally:
         await callback.answer()
@@ -107,7 +102,7 @@ async def products_pagination(callback: CallbackQuery) -> None:
         category_id = int(parts[2])
         page = int(parts[3])
         logger.info(
-            f"Пагинация товаров для category_id {category_id}, страница {page}.")
+            "Пагинация товаров для category_id %s, страница %s.", category_id, page)
 
         # Получаем данные пользователя
         user = await get_user_from_callback(callback)
@@ -117,11 +112,11 @@ async def products_pagination(callback: CallbackQuery) -> None:
 
         if not products:
             logger.warning(
-                f"Товары не найдены для категории ID {category_id}, страница {page}.")
+                "Товары не найдены для категории ID %s, страница %s.", category_id, page)
             breadcrumb = await sync_to_async(get_category_path)(str(category_id))
             if not isinstance(breadcrumb, str):
                 logger.error(
-                    f"get_category_path вернул не строку: {type(breadcrumb)}: {breadcrumb}")
+                    "get_category_path вернул не строку: %s: %s", type(breadcrumb), breadcrumb)
                 breadcrumb = "🛍️ Каталог"
             await safe_edit_message(callback, f"{breadcrumb}\n\n{PRODUCT_NOT_FOUND}", None)
             await callback.answer()
@@ -131,16 +126,16 @@ async def products_pagination(callback: CallbackQuery) -> None:
         breadcrumb = await sync_to_async(get_category_path)(str(category_id))
         if not isinstance(breadcrumb, str):
             logger.error(
-                f"get_category_path вернул не строку: {type(breadcrumb)}: {breadcrumb}")
+                "get_category_path вернул не строку: %s: %s", type(breadcrumb), breadcrumb)
             breadcrumb = "🛍️ Каталог"
         kb = await build_products_keyboard(category_id, page, products, total_count, user)
         await safe_edit_message(callback, f"{breadcrumb}\n\n{CATALOG_MESSAGE}", kb)
 
     except ValueError as e:
-        logger.error(f"Ошибка формата данных: {e}")
+        logger.error("Ошибка формата данных: %s", e)
         await callback.answer("❌ Неверный формат данных", show_alert=True)
     except Exception as e:
-        logger.error(f"Ошибка при пагинации товаров: {str(e)}")
+        logger.error("Ошибка при пагинации товаров: %s", str(e))
         await callback.answer("❌ Произошла ошибка при отображении товаров", show_alert=True)
     finally:
         await callback.answer()
@@ -153,40 +148,21 @@ async def catalog_callback(callback: CallbackQuery) -> None:
     """
     try:
         user_id = callback.from_user.id
-        logger.info(f"Пользователь {user_id} нажал кнопку 'Каталог'.")
-
-        # Проверка подписки
-        if SUBSCRIPTION_CHANNEL_ID or SUBSCRIPTION_GROUP_ID:
-            subscription_result, message_text = await check_subscriptions(callback.bot, user_id, "catalog")
-            if not subscription_result:
-                try:
-                    await callback.message.edit_text(
-                        message_text,
-                        disable_web_page_preview=True,
-                        parse_mode="HTML"
-                    )
-                except TelegramBadRequest:
-                    await callback.message.answer(
-                        message_text,
-                        disable_web_page_preview=True,
-                        parse_mode="HTML"
-                    )
-                await callback.answer()
-                return
+        logger.info("Пользователь %s нажал кнопку 'Каталог'.", user_id)
 
         # Получаем текст, категории и общее количество страниц
-        logger.debug(f"Вызов get_categories('root', 1) в catalog_callback")
+        logger.debug("Вызов get_categories('root', 1) в catalog_callback")
         result = await get_categories("root", 1)
-        logger.info(f"Результат get_categories в catalog_callback: {result}")
         if not isinstance(result, tuple):
             logger.error(
-                f"get_categories вернул не кортеж: {type(result)}: {result}")
+                "get_categories вернул не кортеж: %s", type(result))
             raise ValueError(
                 f"get_categories вернул не кортеж: {type(result)}")
         text, categories, total_pages = result
+        logger.debug("get_categories в catalog_callback: категорий %s, страниц %s", len(categories), total_pages)
         if not isinstance(text, str):
             logger.error(
-                f"get_categories вернул не строку в text: {type(text)}: {text}")
+                "get_categories вернул не строку в text: %s: %s", type(text), text)
             text = CATALOG_ERROR
 
         # Получаем данные пользователя
@@ -199,7 +175,7 @@ async def catalog_callback(callback: CallbackQuery) -> None:
         await safe_edit_message(callback, text, keyboard)
 
     except Exception as e:
-        logger.error(f"Ошибка при выполнении callback 'catalog': {e}")
+        logger.error("Ошибка при выполнении callback 'catalog': %s", e)
         await callback.answer("❌ Произошла ошибка при открытии каталога", show_alert=True)
     finally:
         await callback.answer()
@@ -1,8 +1,7 @@
 import logging
 from aiogram import Router
 from aiogram.types import Message
-from bot.core.config import SUBSCRIPTION_CHANNEL_ID, SUBSCRIPTION_GROUP_ID, CATALOG_ERROR
-from bot.handlers.start.subscriptions import check_subscriptions
+from bot.core.config import CATALOG_ERROR
 from .data import get_categories
 from .keyboards import build_categories_keyboard
 from .utils import get_user_from_callback
@@ -10,7 +9,6 @@ from .utils import get_user_from_callback
 router = Router()
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
 logger.info("Загружен commands.py версии 2025-04-22")
 
 
@@ -21,32 +19,21 @@ async def catalog_command(message: Message) -> None:
     """
     try:
         user_id = message.from_user.id
-        logger.info(f"Пользователь {user_id} вызвал команду /catalog.")
-
-        # Проверка подписки
-        if SUBSCRIPTION_CHANNEL_ID or SUBSCRIPTION_GROUP_ID:
-            subscription_result, message_text = await check_subscriptions(message.bot, user_id, "/catalog")
-            if not subscription_result:
-                await message.answer(
-                    message_text,
-                    disable_web_page_preview=True,
-                    parse_mode="HTML"
-                )
-                return
+        logger.info("Пользователь %s вызвал команду /catalog.", user_id)
 
         # Получаем текст, категории и общее количество страниц
-        logger.debug(f"Вызов get_categories('root', 1) в /catalog")
+        logger.debug("Вызов get_categories('root', 1) в /catalog")
         result = await get_categories("root", 1)
-        logger.info(f"Результат get_categories в /catalog: {result}")
         if not isinstance(result, tuple):
             logger.error(
-                f"get_categories вернул не кортеж: {type(result)}: {result}")
+                "get_categories вернул не кортеж: %s", type(result))
             raise ValueError(
                 f"get_categories вернул не кортеж: {type(result)}")
         text, categories, total_pages = result
+        logger.debug("get_categories в /catalog: категорий %s, страниц %s", len(categories), total_pages)
         if not isinstance(text, str):
             logger.error(
-                f"get_categories вернул не строку в text: {type(text)}: {text}")
+                "get_categories вернул не строку в text: %s: %s", type(text), text)
             text = CATALOG_ERROR
 
         # Получаем данные пользователя
@@ -63,5 +50,5 @@ async def catalog_command(message: Message) -> None:
         )
 
     except Exception as e:
-        logger.error(f"Ошибка при выполнении команды /catalog: {e}")
+        logger.error("Ошибка при выполнении команды /catalog: %s", e)
         await message.answer("❌ Произошла ошибка при открытии каталога", parse_mode="HTML")
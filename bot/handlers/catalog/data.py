@@ -1,12 +1,11 @@
 import logging
 from typing import Tuple, List
-from asgiref.sync import sync_to_async
+from bot.core.metrics import sync_to_async
 from django_app.shop.models import Category, Product
 from bot.core.config import CATEGORIES_PER_PAGE, PRODUCTS_PER_PAGE
 from .breadcrumbs import get_category_path
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
 logger.info("Загружен data.py версии 2025-04-22 с синхронным get_category_path")
 
 
@@ -15,7 +14,7 @@ def get_categories(parent_id: str, page: int) -> Tuple[str, List[Category], int]
     """
     Получает категории для отображения с пагинацией.
     """
-    logger.debug(f"Начало get_categories: parent_id={parent_id}, page={page}")
+    logger.debug("Начало get_categories: parent_id=%s, page=%s", parent_id, page)
 
     try:
         if parent_id == "root":
@@ -36,25 +35,23 @@ def get_categories(parent_id: str, page: int) -> Tuple[str, List[Category], int]
         breadcrumb = get_category_path(parent_id)  # Синхронный вызов
         if not isinstance(breadcrumb, str):
             logger.error(
-                f"get_category_path вернул не строку: {type(breadcrumb)}: {breadcrumb}")
+                "get_category_path вернул не строку: %s: %s", type(breadcrumb), breadcrumb)
             breadcrumb = "🛍️ Каталог"
 
         if not categories_on_page:
-            logger.debug(f"Категории не найдены, breadcrumb: {breadcrumb}")
+            logger.debug("Категории не найдены, breadcrumb: %s", breadcrumb)
             result = (f"{breadcrumb}\n\nКатегории не найдены.", [], 0)
-            logger.info(f"Возвращён результат (нет категорий): {result}")
             return result
 
         text = f"{breadcrumb}\n\nВыберите {'категорию' if parent_id == 'root' else 'подкатегорию'}:"
         result = (text, categories_on_page, total_pages)
-        logger.info(f"Возвращён результат: {result}")
+        logger.debug("Категорий на странице %s: %s из %s", page, len(categories_on_page), len(categories))
         return result
 
     except Exception as e:
         logger.error(
-            f"Ошибка при получении категорий для parent_id={parent_id}, page={page}: {e}")
+            "Ошибка при получении категорий для parent_id=%s, page=%s: %s", parent_id, page, e)
         result = ("❌ Ошибка загрузки категорий", [], 0)
-        logger.info(f"Возвращён результат при ошибке: {result}")
         return result
 
 
@@ -63,7 +60,7 @@ def get_products_page(category_id: int, page: int, per_page: int = PRODUCTS_PER_
     """
     Получение страницы товаров с пагинацией.
     """
-    logger.debug(f"Получение товаров: category_id={category_id}, page={page}")
+    logger.debug("Получение товаров: category_id=%s, page=%s", category_id, page)
 
     try:
         qs = Product.objects.filter(category_id=category_id, is_active=True)
@@ -72,9 +69,9 @@ def get_products_page(category_id: int, page: int, per_page: int = PRODUCTS_PER_
         end = start + per_page
         products = list(qs[start:end])
         logger.debug(
-            f"Найдено {total_count} товаров, возвращено {len(products)} на странице {page}")
+            "Найдено %s товаров, возвращено %s на странице %s", total_count, len(products), page)
         return products, total_count
     except Exception as e:
         logger.error(
-            f"Ошибка при получении товаров для category_id={category_id}, page={page}: {e}")
+            "Ошибка при получении товаров для category_id=%s, page=%s: %s", category_id, page, e)
         return [], 0
@@ -1,7 +1,7 @@
 import logging
 from typing import List
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-from asgiref.sync import sync_to_async
+from bot.core.metrics import sync_to_async
 from django_app.shop.models import Category, Product
 from bot.handlers.cart.models import async_get_cart_quantity, async_get_cart_total
 from bot.handlers.cart.utils import format_cart_button_text
@@ -15,7 +15,6 @@ from bot.core.config import (
 )
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
 logger.info(
     "Загружен keyboards.py версии 2025-04-23-3 с поддержкой SHOW_PRODUCT_PRICE_IN_CATALOG")
 
@@ -31,7 +30,7 @@ def get_parent_category(category_id: str) -> Category:
         category = Category.objects.get(id=category_id)
         return category.parent
     except Category.DoesNotExist:
-        logger.warning(f"Категория с ID {category_id} не найдена.")
+        logger.warning("Категория с ID %s не найдена.", category_id)
         return None
 
 
@@ -46,7 +45,7 @@ async def build_categories_keyboard(categories: List[Category], parent_id: str,
     :return: InlineKeyboardMarkup с клавиатурой.
     """
     logger.debug(
-        f"Генерация клавиатуры для категорий: parent_id={parent_id}, page={page}, total_pages={total_pages}")
+        "Генерация клавиатуры для категорий: parent_id=%s, page=%s, total_pages=%s", parent_id, page, total_pages)
     buttons = []
 
     # Группируем категории по CATEGORIES_PER_ROW в ряд
@@ -100,7 +99,7 @@ async def build_categories_keyboard(categories: List[Category], parent_id: str,
         cart_text = format_cart_button_text(cart_total, cart_quantity)
     except Exception as e:
         logger.error(
-            f"Ошибка при получении данных корзины для пользователя {user.telegram_id}: {e}")
+            "Ошибка при получении данных корзины для пользователя %s: %s", user.telegram_id, e)
         cart_text = "🛒 Корзина: ошибка"
     buttons.append([InlineKeyboardButton(
         text=cart_text,
@@ -117,7 +116,7 @@ async def build_categories_keyboard(categories: List[Category], parent_id: str,
             back_callback = f"cat_page_{grandparent_id}_1"
         except Exception as e:
             logger.error(
-                f"Ошибка при получении родительской категории для {parent_id}: {e}")
+                "Ошибка при получении родительской категории для %s: %s", parent_id, e)
             back_callback = "main_menu"
     buttons.append([
         InlineKeyboardButton(
@@ -144,7 +143,7 @@ async def build_products_keyboard(category_id: int, page: int, products: List[Pr
     :return: InlineKeyboardMarkup с клавиатурой.
     """
     logger.debug(
-        f"Генерация клавиатуры для товаров: category_id={category_id}, page={page}, total_count={total_count}")
+        "Генерация клавиатуры для товаров: category_id=%s, page=%s, total_count=%s", category_id, page, total_count)
     buttons = []
 
     # Группируем товары по PRODUCTS_PER_ROW в ряд
@@ -197,7 +196,7 @@ async def build_products_keyboard(category_id: int, page: int, products: List[Pr
         cart_text = format_cart_button_text(cart_total, cart_quantity)
     except Exception as e:
         logger.error(
-            f"Ошибка при получении данных корзины для пользователя {user.telegram_id}: {e}")
+            "Ошибка при получении данных корзины для пользователя %s: %s", user.telegram_id, e)
         cart_text = "🛒 Корзина: ошибка"
     buttons.append([InlineKeyboardButton(
         text=f"{PRICE_LIST_EMOJI} {PRICE_LIST_LABEL}",
@@ -215,7 +214,7 @@ async def build_products_keyboard(category_id: int, page: int, products: List[Pr
         back_callback = f"cat_page_{parent_id}_1"
     except Exception as e:
         logger.error(
-            f"Ошибка при получении родительской категории для {category_id}: {e}")
+            "Ошибка при получении родительской категории для %s: %s", category_id, e)
         back_callback = "main_menu"
     buttons.append([
         InlineKeyboardButton(
@@ -4,7 +4,6 @@ from aiogram.exceptions import TelegramBadRequest
 from bot.handlers.cart.models import async_get_or_create_user
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
 logger.info("Загружен utils.py версии 2025-04-22")
 
 
@@ -12,10 +11,10 @@ async def safe_edit_message(callback: CallbackQuery, text: str, reply_markup=Non
     """
     Безопасное редактирование сообщения.
     """
-    logger.debug(f"Вызов safe_edit_message с text типа {type(text)}")
+    logger.debug("Вызов safe_edit_message с text типа %s", type(text))
     if not isinstance(text, str):
         logger.error(
-            f"Ожидалась строка для текста сообщения, получен {type(text)}: {text}")
+            "Ожидалась строка для текста сообщения, получен %s: %s", type(text), text)
         text = "❌ Ошибка отображения каталога. Пожалуйста, попробуйте снова."
 
     try:
@@ -24,13 +23,13 @@ async def safe_edit_message(callback: CallbackQuery, text: str, reply_markup=Non
             reply_markup=reply_markup,
             parse_mode="HTML"
         )
-        logger.debug(f"Сообщение успешно отредактировано: {text[:50]}...")
+        logger.debug("Сообщение успешно отредактировано: %s...", text[:50])
     except TelegramBadRequest as e:
         if "message is not modified" in str(e).lower():
             logger.debug(
-                f"Сообщение не изменено (уже актуально): {text[:50]}...")
+                "Сообщение не изменено (уже актуально): %s...", text[:50])
         else:
-            logger.error(f"Ошибка при редактировании сообщения: {e}")
+            logger.error("Ошибка при редактировании сообщения: %s", e)
             try:
                 await callback.message.delete()
                 await callback.message.answer(
@@ -40,14 +39,14 @@ async def safe_edit_message(callback: CallbackQuery, text: str, reply_markup=Non
                 )
             except Exception as delete_error:
                 logger.error(
-                    f"Ошибка при удалении и отправке нового сообщения: {delete_error}")
+                    "Ошибка при удалении и отправке нового сообщения: %s", delete_error)
                 await callback.message.answer(
                     text,
                     reply_markup=reply_markup,
                     parse_mode="HTML"
                 )
     except Exception as e:
-        logger.error(f"Неизвестная ошибка при редактировании сообщения: {e}")
+        logger.error("Неизвестная ошибка при редактировании сообщения: %s", e)
         try:
             await callback.message.delete()
             await callback.message.answer(
@@ -57,7 +56,7 @@ async def safe_edit_message(callback: CallbackQuery, text: str, reply_markup=Non
             )
         except Exception as delete_error:
             logger.error(
-                f"Ошибка при удалении и отправке нового сообщения: {delete_error}")
+                "Ошибка при удалении и отправке нового сообщения: %s", delete_error)
             await callback.message.answer(
                 text,
                 reply_markup=reply_markup,
@@ -77,5 +76,5 @@ async def get_user_from_callback(callback: CallbackQuery):
         username=callback.from_user.username,
         language_code=callback.from_user.language_code
     )
-    logger.debug(f"Пользователь {user_id} получен/создан")
+    logger.debug("Пользователь %s получен/создан", user_id)
     return user
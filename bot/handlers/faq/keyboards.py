@@ -7,7 +7,7 @@ logger = logging.getLogger(__name__)
 
 def build_faq_keyboard(faq_items, page: int, total_pages: int):
     """Построение инлайн-клавиатуры для списка FAQ с пагинацией."""
-    logger.debug(f"Построение клавиатуры для FAQ страницы {page} из {total_pages}.")
+    logger.debug("Построение клавиатуры для FAQ страницы %s из %s.", page, total_pages)
     buttons = []
 
     # Вычисляем начальный индекс для номеров кнопок
@@ -39,9 +39,9 @@ def build_faq_keyboard(faq_items, page: int, total_pages: int):
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
-def build_search_keyboard(results, indices, page: int, total_pages: int, query: str):
-    """Построение инлайн-клавиатуры для результатов поиска FAQ с пагинацией."""
-    logger.debug(f"Построение клавиатуры для поиска FAQ по запросу '{query}', страница {page} из {total_pages}.")
+def build_search_keyboard(results, indices, page: int, total_pages: int, token: str):
+    """Построение инлайн-клавиатуры для результатов поиска FAQ с пагинацией (token — сессия поиска)."""
+    logger.debug("Построение клавиатуры для поиска FAQ (сессия %s), страница %s из %s.", token, page, total_pages)
     buttons = []
 
     # Используем глобальные индексы для нумерации кнопок
@@ -53,17 +53,16 @@ def build_search_keyboard(results, indices, page: int, total_pages: int, query:
         buttons.append(number_buttons)
         logger.debug("Добавлены кнопки номеров найденных FAQ.")
 
-    encoded_query = query.replace("_", "##")
     pagination_buttons = []
     if total_pages > 1:
         if page > 1:
             pagination_buttons.append(
-                InlineKeyboardButton(text="←", callback_data=f"search_page_{page - 1}_{encoded_query}")
+                InlineKeyboardButton(text="←", callback_data=f"search_page_{page - 1}_{token}")
             )
         pagination_buttons.append(InlineKeyboardButton(text=f"{page}/{total_pages}", callback_data="noop"))
         if page < total_pages:
             pagination_buttons.append(
-                InlineKeyboardButton(text="→", callback_data=f"search_page_{page + 1}_{encoded_query}")
+                InlineKeyboardButton(text="→", callback_data=f"search_page_{page + 1}_{token}")
             )
         buttons.append(pagination_buttons)
         logger.debug("Добавлены кнопки пагинации для поиска FAQ.")
@@ -75,7 +74,7 @@ def build_search_keyboard(results, indices, page: int, total_pages: int, query:
 
 def back_to_list_keyboard(page: int):
     """Клавиатура для возврата к списку FAQ."""
-    logger.debug(f"Построение клавиатуры для возврата к списку FAQ, страница {page}.")
+    logger.debug("Построение клавиатуры для возврата к списку FAQ, страница %s.", page)
     return InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text="🔙 Назад к списку", callback_data=f"faq_page_{page}")],
         [InlineKeyboardButton(text="🔙 Главное меню", callback_data="main_menu")]
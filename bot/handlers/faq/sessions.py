@@ -0,0 +1,81 @@
+# bot/handlers/faq/sessions.py
+"""
+Сессии поиска FAQ.
+
+Поиск выполняется один раз на (пользователь, запрос): ранжированный список id
+сохраняется в данных FSM под коротким токеном, а кнопки пагинации передают
+только номер страницы и токен (search_page_<страница>_<токен>). Листание
+результатов берёт вопросы из снимка FAQ и не выполняет поиск повторно.
+"""
+import logging
+import secrets
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from aiogram.fsm.context import FSMContext
+
+from bot.core.config import FAQ_SEARCH_PER_PAGE, FAQ_SEARCH_SESSION_TTL, FAQ_SEARCH_SESSIONS_PER_USER
+from .db import find_faq_ids
+from .snapshot import FAQEntry, faq_snapshot
+
+logger = logging.getLogger(__name__)
+
+SESSIONS_KEY = "faq_search_sessions"
+
+
+@dataclass(frozen=True)
+class SearchSession:
+    """Результаты одного поиска пользователя"""
+    token: str
+    query: str
+    ids: tuple[int, ...]
+    created: float
+
+    @property
+    def total_pages(self) -> int:
+        return max(1, (len(self.ids) - 1) // FAQ_SEARCH_PER_PAGE + 1)
+
+    def expired(self, now: float) -> bool:
+        return now - self.created > FAQ_SEARCH_SESSION_TTL
+
+
+def _load(data: dict, now: float) -> dict[str, SearchSession]:
+    sessions = {}
+    for token, (query, ids, created) in (data.get(SESSIONS_KEY) or {}).items():
+        session = SearchSession(token, query, tuple(ids), created)
+        if not session.expired(now):
+            sessions[token] = session
+    return sessions
+
+
+async def open_session(state: FSMContext, query: str) -> SearchSession:
+    """Сессия поиска по запросу: действующая для того же запроса или новая"""
+    now = time.time()
+    sessions = _load(await state.get_data(), now)
+    for session in sessions.values():
+        if session.query == query:
+            logger.debug("Используется сессия поиска %s для запроса '%s'.", session.token, query)
+            return session
+
+    ids = await find_faq_ids(query)
+    session = SearchSession(secrets.token_hex(4), query, tuple(ids), now)
+    sessions[session.token] = session
+    newest = sorted(sessions.values(), key=lambda item: item.created)[-FAQ_SEARCH_SESSIONS_PER_USER:]
+    await state.update_data({SESSIONS_KEY: {item.token: [item.query, list(item.ids), item.created] for item in newest}})
+    logger.debug("Создана сессия поиска %s: запрос '%s', результатов %s.", session.token, query, len(ids))
+    return session
+
+
+async def get_session(state: FSMContext, token: str) -> Optional[SearchSession]:
+    """Сохранённая сессия поиска по токену (None, если истекла)"""
+    return _load(await state.get_data(), time.time()).get(token)
+
+
+async def session_page(session: SearchSession, page: int) -> tuple[list[FAQEntry], int]:
+    """Вопросы страницы результатов из снимка FAQ и номер страницы в допустимых пределах"""
+    page = max(1, min(page, session.total_pages))
+    snapshot = await faq_snapshot.get()
+    start = (page - 1) * FAQ_SEARCH_PER_PAGE
+    entries = [snapshot.item(faq_id) for faq_id in session.ids[start:start + FAQ_SEARCH_PER_PAGE]]
+    return [entry for entry in entries if entry is not None], page
@@ -0,0 +1,152 @@
+# bot/handlers/faq/snapshot.py
+"""
+Снимок FAQ в памяти.
+
+Активные вопросы загружаются одним запросом в неизменяемый снимок с готовыми
+текстами и клавиатурами страниц, так что листание списка и просмотр вопроса
+не обращаются к базе. Снимок сбрасывается сигналами post_save/post_delete FAQ
+в этом процессе; изменения из админки (другой процесс) замечаются по отпечатку
+таблицы, который проверяется не чаще раза в FAQ_SNAPSHOT_CHECK_INTERVAL секунд.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from aiogram.utils.markdown import hunderline
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_save
+
+from bot.core.config import FAQ_PER_PAGE, FAQ_SNAPSHOT_CHECK_INTERVAL
+from bot.core.metrics import sync_to_async
+from django_app.shop.models import FAQ
+from .keyboards import back_to_list_keyboard, build_faq_keyboard
+
+logger = logging.getLogger(__name__)
+
+EMPTY_FAQ_TEXT = "❌ В базе пока нет вопросов\n"
+
+
+@dataclass(frozen=True)
+class FAQEntry:
+    """Вопрос FAQ и его номер в списке"""
+    id: int
+    question: str
+    answer: str
+    position: int
+    page: int
+    text: str  # Готовый текст карточки вопроса
+
+
+@dataclass(frozen=True)
+class FAQPage:
+    """Готовая страница списка FAQ"""
+    number: int
+    text: str
+    markup: InlineKeyboardMarkup
+    back_markup: InlineKeyboardMarkup  # «Назад к списку» из карточки вопроса этой страницы
+
+
+@dataclass(frozen=True)
+class FAQSnapshot:
+    """Неизменяемый снимок активных FAQ"""
+    version: int
+    entries: tuple[FAQEntry, ...]
+    by_id: Mapping[int, FAQEntry]
+    pages: tuple[FAQPage, ...]
+
+    @property
+    def total_pages(self) -> int:
+        return len(self.pages)
+
+    def page(self, number: int) -> FAQPage:
+        """Страница списка; номер приводится к допустимому диапазону"""
+        return self.pages[max(1, min(number, len(self.pages))) - 1]
+
+    def item(self, item_id: int) -> Optional[FAQEntry]:
+        return self.by_id.get(item_id)
+
+
+def _fingerprint():
+    stats = FAQ.objects.filter(is_active=True).aggregate(count=Count("id"), updated=Max("updated_at"), last=Max("id"))
+    return stats["count"], stats["updated"], stats["last"]
+
+
+def build_snapshot(version: int) -> FAQSnapshot:
+    """Загрузка активных FAQ и подготовка страниц (синхронно)"""
+    rows = list(FAQ.objects.filter(is_active=True).order_by("id").values_list("id", "question", "answer"))
+    entries = tuple(
+        FAQEntry(
+            id=faq_id,
+            question=question,
+            answer=answer,
+            position=index + 1,
+            page=index // FAQ_PER_PAGE + 1,
+            text=f"{hunderline('Вопрос:')}\n{question}\n\n{hunderline('Ответ:')}\n{answer}",
+        )
+        for index, (faq_id, question, answer) in enumerate(rows)
+    )
+
+    pages = []
+    total_pages = max(1, (len(entries) - 1) // FAQ_PER_PAGE + 1)
+    for number in range(1, total_pages + 1):
+        items = entries[(number - 1) * FAQ_PER_PAGE: number * FAQ_PER_PAGE]
+        if items:
+            text = "❓ Часто задаваемые вопросы:\n\n" + "\n".join(f"{item.position}. {item.question}" for item in items)
+            markup = build_faq_keyboard(items, number, total_pages)
+        else:
+            text = EMPTY_FAQ_TEXT
+            markup = InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text="🔙 Главное меню", callback_data="main_menu")]
+            ])
+        pages.append(FAQPage(number, text, markup, back_to_list_keyboard(number)))
+
+    return FAQSnapshot(
+        version=version,
+        entries=entries,
+        by_id=MappingProxyType({entry.id: entry for entry in entries}),
+        pages=tuple(pages),
+    )
+
+
+class FAQSnapshotStore:
+    """Текущий снимок FAQ с пересборкой при изменениях"""
+
+    def __init__(self, check_interval: int = FAQ_SNAPSHOT_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._snapshot: Optional[FAQSnapshot] = None
+        self._fingerprint = None
+        self._checked_at = 0.0
+        self._version = 0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self, **kwargs) -> None:
+        """Обработчик сигналов post_save/post_delete модели FAQ"""
+        self._fingerprint = None
+        self._checked_at = 0.0
+
+    async def get(self) -> FAQSnapshot:
+        if self._snapshot is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return self._snapshot
+        async with self._lock:
+            if self._snapshot is not None and time.monotonic() - self._checked_at < self.check_interval:
+                return self._snapshot
+            fingerprint = await sync_to_async(_fingerprint)()
+            if self._snapshot is None or fingerprint != self._fingerprint:
+                self._version += 1
+                self._snapshot = await sync_to_async(build_snapshot)(self._version)
+                self._fingerprint = fingerprint
+                logger.info(
+                    "Снимок FAQ v%s: %s вопросов, %s страниц.",
+                    self._version, len(self._snapshot.entries), self._snapshot.total_pages)
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+
+faq_snapshot = FAQSnapshotStore()
+
+post_save.connect(faq_snapshot.invalidate, sender=FAQ, weak=False, dispatch_uid="bot_faq_snapshot_save")
+post_delete.connect(faq_snapshot.invalidate, sender=FAQ, weak=False, dispatch_uid="bot_faq_snapshot_delete")
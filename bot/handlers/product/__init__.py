@@ -1,7 +1,9 @@
 from aiogram import Router
 from .handlers import router as handlers_router
+from .inline import router as inline_router
 
 router = Router()
 router.include_router(handlers_router)
+router.include_router(inline_router)
 
 __all__ = ["router"]
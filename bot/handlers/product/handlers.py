@@ -1,34 +1,24 @@
 import logging
-from typing import Dict, Tuple
 from aiogram import F, Router
 from aiogram.types import CallbackQuery
 from aiogram.fsm.context import FSMContext
 
-from .models import get_product_by_id, get_or_create_cart, update_cart_item
-from .utils import generate_back_data, generate_product_text, handle_photo_message, handle_text_message
+from .models import get_product_by_id, get_or_create_cart, update_cart_item, load_product_view, ProductView
+from .utils import format_product_text, handle_photo_message, handle_text_message
 from .keyboards import product_detail_keyboard
+from .selection import quantity_store
 from bot.core.utils import get_or_create_user
-from bot.handlers.cart.models import async_get_cart_quantity, async_get_cart_total, async_get_cart_items
 
 logger = logging.getLogger(__name__)
 logger.info("Загружен product/handlers.py версии 2025-04-23-7")
 
 router = Router()
-quantity_storage: Dict[Tuple[int, int], int] = {}
 
 
-async def get_cart_quantity_for_product(user, product_id: int) -> int:
-    """Получает текущее количество товара в корзине."""
-    try:
-        items = await async_get_cart_items(user)
-        for item in items:
-            if item.product.id == product_id and item.is_active:
-                return item.quantity
-        return 0
-    except Exception as e:
-        logger.error(
-            f"Ошибка при получении количества товара ID {product_id} из корзины: {e}")
-        return 0
+def product_view_text(view: ProductView) -> str:
+    """Текст карточки товара с количеством в корзине."""
+    text = format_product_text(view.product, view.category_path)
+    return text + f"\n\n🛒 В корзине: {view.line_quantity} шт."
 
 
 @router.callback_query(F.data.startswith("product_"))
@@ -37,41 +27,24 @@ async def show_product_detail(callback: CallbackQuery, state: FSMContext):
     product_id = int(callback.data.split("_")[1])
     user_id = callback.from_user.id
     logger.info(
-        f"Пользователь {user_id} запросил детали продукта ID {product_id}.")
+        "Пользователь %s запросил детали продукта ID %s.", user_id, product_id)
 
     try:
-        product = await get_product_by_id(product_id)
-        user, _ = await get_or_create_user(user_id=user_id)
-
-        # Получаем текущее количество в корзине
-        cart_quantity_for_product = await get_cart_quantity_for_product(user, product_id)
+        # Товар, категория и сводка корзины загружаются параллельно
+        view = await load_product_view(user_id, product_id)
 
-        # Инициализируем quantity_storage с 1 (по умолчанию для добавления)
-        key = (user_id, product_id)
-        if key not in quantity_storage:
-            quantity_storage[key] = 1
+        # Карточка открывается с количеством 1, сбрасываем прежний выбор
+        await quantity_store.reset(state, user_id, product_id)
 
-        try:
-            cart_quantity = await async_get_cart_quantity(user)
-            cart_total = await async_get_cart_total(user)
-        except Exception as e:
-            logger.error(
-                f"Ошибка при получении данных корзины для пользователя {user.telegram_id}: {e}")
-            cart_quantity = 0
-            cart_total = 0
-
-        back_data = await generate_back_data(product)
-        text = await generate_product_text(product)
-        # Добавляем информацию о количестве в корзине в текст
-        text += f"\n\n🛒 В корзине: {cart_quantity_for_product} шт."
-
-        if product.photo:
-            await handle_photo_message(callback, product, text, back_data, cart_total, cart_quantity)
+        text = product_view_text(view)
+        if view.product.photo:
+            await handle_photo_message(callback, view.product, text, view.back_data, view.cart_total, view.cart_quantity)
         else:
-            await handle_text_message(callback, product, text, back_data, quantity=1, cart_total=cart_total, cart_quantity=cart_quantity)
+            await handle_text_message(callback, view.product, text, view.back_data, quantity=1,
+                                      cart_total=view.cart_total, cart_quantity=view.cart_quantity)
 
     except Exception as e:
-        logger.error(f"Ошибка при отображении продукта ID {product_id}: {e}")
+        logger.error("Ошибка при отображении продукта ID %s: %s", product_id, e)
         await callback.answer("Ошибка при отображении товара.", show_alert=True)
     finally:
         await callback.answer()
@@ -82,12 +55,11 @@ async def increase_quantity(callback: CallbackQuery, state: FSMContext):
     """Обработчик увеличения количества."""
     product_id = int(callback.data.split(":")[1])
     user_id = callback.from_user.id
-    key = (user_id, product_id)
-    current = quantity_storage.get(key, 1)
-    quantity_storage[key] = current + 1
+    quantity = await quantity_store.get(state, user_id, product_id) + 1
+    await quantity_store.set(state, user_id, product_id, quantity)
     logger.debug(
-        f"Увеличено количество для продукта ID {product_id} до {quantity_storage[key]}.")
-    await update_product_message(callback, product_id)
+        "Увеличено количество для продукта ID %s до %s.", product_id, quantity)
+    await update_product_message(callback, state, product_id)
 
 
 @router.callback_query(F.data.startswith("dec:"))
@@ -95,13 +67,12 @@ async def decrease_quantity(callback: CallbackQuery, state: FSMContext):
     """Обработчик уменьшения количества."""
     product_id = int(callback.data.split(":")[1])
     user_id = callback.from_user.id
-    key = (user_id, product_id)
-    current = quantity_storage.get(key, 1)
+    current = await quantity_store.get(state, user_id, product_id)
     if current > 1:  # Не допускаем количество меньше 1
-        quantity_storage[key] = current - 1
+        await quantity_store.set(state, user_id, product_id, current - 1)
         logger.debug(
-            f"Уменьшено количество для продукта ID {product_id} до {quantity_storage[key]}.")
-    await update_product_message(callback, product_id)
+            "Уменьшено количество для продукта ID %s до %s.", product_id, current - 1)
+    await update_product_message(callback, state, product_id)
 
 
 @router.callback_query(F.data.startswith("add:"))
@@ -112,7 +83,7 @@ async def add_to_cart_handler(callback: CallbackQuery, state: FSMContext):
     quantity = int(quantity)
     user_id = callback.from_user.id
     logger.info(
-        f"Пользователь {user_id} добавляет продукт ID {product_id} с количеством {quantity}.")
+        "Пользователь %s добавляет продукт ID %s с количеством %s.", user_id, product_id, quantity)
 
     try:
         product = await get_product_by_id(product_id)
@@ -121,80 +92,44 @@ async def add_to_cart_handler(callback: CallbackQuery, state: FSMContext):
         item = await update_cart_item(cart, product, quantity)
 
         # Сбрасываем выбранное количество
-        key = (user_id, product_id)
-        quantity_storage[key] = 1  # Возвращаем к 1 после добавления
+        await quantity_store.reset(state, user_id, product_id)
 
         await callback.answer(f"✅ Добавлено: {product.name} × {quantity}", show_alert=True)
-        try:
-            cart_quantity = await async_get_cart_quantity(user)
-            cart_total = await async_get_cart_total(user)
-        except Exception as e:
-            logger.error(
-                f"Ошибка при получении данных корзины для пользователя {user.telegram_id}: {e}")
-            cart_quantity = 0
-            cart_total = 0
-
-        await update_product_message(
-            callback,
-            product_id,
-            reset_quantity=False,
-            cart_total=cart_total,
-            cart_quantity=cart_quantity
-        )
+        await update_product_message(callback, state, product_id)
 
     except Exception as e:
-        logger.error(f"Ошибка при добавлении товара ID {product_id}: {e}")
+        logger.error("Ошибка при добавлении товара ID %s: %s", product_id, e)
         await callback.answer("Ошибка при добавлении товара", show_alert=True)
 
 
 async def update_product_message(
     callback: CallbackQuery,
+    state: FSMContext,
     product_id: int,
-    reset_quantity: bool = False,
-    cart_total: float = 0,
-    cart_quantity: int = 0
+    reset_quantity: bool = False
 ):
     """Обновляет сообщение с деталями продукта."""
     user_id = callback.from_user.id
     try:
-        product = await get_product_by_id(product_id)
-        back_data = await generate_back_data(product)
-        key = (user_id, product_id)
-
-        # Получаем количество из корзины
-        user, _ = await get_or_create_user(user_id=user_id)
-        cart_quantity_for_product = await get_cart_quantity_for_product(user, product_id)
+        view = await load_product_view(user_id, product_id)
 
         if reset_quantity:
             quantity = 1
-            quantity_storage[key] = 1
+            await quantity_store.reset(state, user_id, product_id)
         else:
-            quantity = quantity_storage.get(key, 1)
-
-        if not cart_total and not cart_quantity:
-            try:
-                cart_quantity = await async_get_cart_quantity(user)
-                cart_total = await async_get_cart_total(user)
-            except Exception as e:
-                logger.error(
-                    f"Ошибка при получении данных корзины для пользователя {user.telegram_id}: {e}")
-                cart_quantity = 0
-                cart_total = 0
-
-        text = await generate_product_text(product)
-        # Добавляем информацию о количестве в корзине в текст
-        text += f"\n\n🛒 В корзине: {cart_quantity_for_product} шт."
+            quantity = await quantity_store.get(state, user_id, product_id)
 
+        text = product_view_text(view)
         markup = product_detail_keyboard(
-            product_id=product.id,
+            product_id=view.product.id,
             quantity=quantity,  # Передаём только выбранное количество
-            cart_total=cart_total,
-            cart_quantity=cart_quantity,
-            back_data=back_data
+            cart_total=view.cart_total,
+            cart_quantity=view.cart_quantity,
+            back_data=view.back_data
         )
 
         try:
-            if product.photo:
+            if view.product.photo:
                 await callback.message.edit_caption(caption=text, reply_markup=markup)
             else:
                 await callback.message.edit_text(text=text, reply_markup=markup)
@@ -204,5 +139,5 @@ async def update_product_message(
 
     except Exception as e:
         logger.error(
-            f"Ошибка при обновлении сообщения для продукта ID {product_id}: {e}")
+            "Ошибка при обновлении сообщения для продукта ID %s: %s", product_id, e)
         await callback.answer("Ошибка при обновлении сообщения.", show_alert=True)
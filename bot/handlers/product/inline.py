@@ -0,0 +1,150 @@
+# bot/handlers/product/inline.py
+"""
+Поиск товаров в inline-режиме: @bot <запрос> в любом чате.
+
+Результаты берутся из поиска по товарам (django_app/shop/search.py) и
+кэшируются в боте на INLINE_QUERY_CACHE_TTL секунд по нормализованному
+запросу и смещению; Telegram дополнительно кэширует ответ на INLINE_CACHE_TIME.
+Товары с сохранённым file_id фото показываются фотографией, остальные — статьёй.
+Кнопка под результатом открывает карточку товара в боте (/start product_<id>).
+"""
+import logging
+from aiogram import Bot, F, Router
+from aiogram.filters import CommandObject, CommandStart
+from aiogram.fsm.context import FSMContext
+from aiogram.types import (
+    InlineKeyboardButton,
+    InlineKeyboardMarkup,
+    InlineQuery,
+    InlineQueryResultArticle,
+    InlineQueryResultCachedPhoto,
+    InputTextMessageContent,
+    Message,
+)
+
+from django_app.shop.models import Product
+from bot.core.cache import TTLCache
+from bot.core.config import (
+    INLINE_CACHE_TIME,
+    INLINE_QUERY_CACHE_MAXSIZE,
+    INLINE_QUERY_CACHE_TTL,
+    INLINE_RESULTS_PER_PAGE,
+    PRICE_DECIMAL_PLACES,
+)
+from .handlers import product_view_text
+from .keyboards import product_detail_keyboard
+from .models import category_path_cache, find_products, load_product_view
+from .selection import quantity_store
+from .utils import format_product_text, send_product_photo
+
+logger = logging.getLogger(__name__)
+
+router = Router()
+
+DEEP_LINK_PREFIX = "product_"
+CAPTION_DESCRIPTION_LIMIT = 700  # Подпись к фото ограничена 1024 символами
+
+# (запрос, смещение) -> (результаты, next_offset)
+inline_results_cache: TTLCache[tuple[list, str]] = TTLCache(
+    maxsize=INLINE_QUERY_CACHE_MAXSIZE, ttl=INLINE_QUERY_CACHE_TTL)
+
+
+def normalize_query(query: str) -> str:
+    """Запрос без регистра и лишних пробелов: одинаковые запросы делят запись кэша."""
+    return " ".join(query.lower().replace("ё", "е").split())
+
+
+def open_product_markup(bot_username: str, product_id: int) -> InlineKeyboardMarkup:
+    """Кнопка открытия карточки товара в боте."""
+    url = f"https://t.me/{bot_username}?start={DEEP_LINK_PREFIX}{product_id}"
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="🛒 Открыть в магазине", url=url)]
+    ])
+
+
+def build_inline_result(product: Product, bot_username: str):
+    """Результат inline-запроса для товара."""
+    category_path = category_path_cache.get(product.category_id) or [product.category.name]
+    text = format_product_text(product, category_path, description_limit=CAPTION_DESCRIPTION_LIMIT)
+    price = f"{float(product.price):.{PRICE_DECIMAL_PLACES}f} ₽"
+    description = f"{price} · {product.category.name}"
+    markup = open_product_markup(bot_username, product.id)
+
+    if product.photo_file_id:
+        return InlineQueryResultCachedPhoto(
+            id=str(product.id),
+            photo_file_id=product.photo_file_id,
+            title=product.name,
+            description=description,
+            caption=text,
+            parse_mode="HTML",
+            reply_markup=markup,
+        )
+    return InlineQueryResultArticle(
+        id=str(product.id),
+        title=product.name,
+        description=description,
+        input_message_content=InputTextMessageContent(message_text=text, parse_mode="HTML"),
+        reply_markup=markup,
+    )
+
+
+@router.inline_query()
+async def inline_product_search(inline_query: InlineQuery, bot: Bot):
+    """Поиск товаров по inline-запросу с постраничной подгрузкой (next_offset)."""
+    query = normalize_query(inline_query.query)
+    if not query:
+        await inline_query.answer([], cache_time=INLINE_CACHE_TIME)
+        return
+    try:
+        offset = int(inline_query.offset or 0)
+    except ValueError:
+        offset = 0
+
+    key = (query, offset)
+    cached = inline_results_cache.get(key)
+    if cached is None:
+        products, total = await find_products(query, INLINE_RESULTS_PER_PAGE, offset)
+        me = await bot.me()
+        results = [build_inline_result(product, me.username) for product in products]
+        next_offset = str(offset + len(products)) if products and offset + len(products) < total else ""
+        cached = (results, next_offset)
+        inline_results_cache.set(key, cached)
+        logger.info(
+            "Inline-поиск '%s' (смещение %s) от пользователя %s: найдено %s.",
+            query, offset, inline_query.from_user.id, total)
+
+    results, next_offset = cached
+    await inline_query.answer(results, cache_time=INLINE_CACHE_TIME, next_offset=next_offset)
+
+
+@router.message(CommandStart(deep_link=True, magic=F.args.startswith(DEEP_LINK_PREFIX)))
+async def open_product_from_link(message: Message, command: CommandObject, state: FSMContext):
+    """Карточка товара по ссылке из результата inline-поиска."""
+    try:
+        product_id = int(command.args.removeprefix(DEEP_LINK_PREFIX))
+    except ValueError:
+        logger.warning("Некорректная ссылка на товар: %s", command.args)
+        return
+    user_id = message.from_user.id
+    logger.info("Пользователь %s открыл товар ID %s по ссылке.", user_id, product_id)
+
+    try:
+        view = await load_product_view(user_id, product_id)
+    except Product.DoesNotExist:
+        await message.answer("⚠️ Товар не найден или больше не продаётся.")
+        return
+
+    await quantity_store.reset(state, user_id, product_id)
+    text = product_view_text(view)
+    markup = product_detail_keyboard(
+        product_id=view.product.id,
+        quantity=1,
+        cart_total=view.cart_total,
+        cart_quantity=view.cart_quantity,
+        back_data=view.back_data
+    )
+    if view.product.photo:
+        await send_product_photo(message, view.product, text, markup)
+    else:
+        await message.answer(text, reply_markup=markup, parse_mode="HTML")
@@ -46,9 +46,9 @@ def product_detail_keyboard(
         ]
         markup = InlineKeyboardMarkup(inline_keyboard=buttons)
         logger.debug(
-            f"Сгенерирована клавиатура для продукта ID {product_id} с back_data={back_data}")
+            "Сгенерирована клавиатура для продукта ID %s с back_data=%s", product_id, back_data)
         return markup
     except Exception as e:
         logger.error(
-            f"Ошибка при генерации клавиатуры для продукта ID {product_id}: {e}")
+            "Ошибка при генерации клавиатуры для продукта ID %s: %s", product_id, e)
         raise
@@ -1,6 +1,14 @@
+import asyncio
 import logging
+from dataclasses import dataclass
+from decimal import Decimal
+from django.db.models import F, Q, Sum
 from django_app.shop.models import Product, Cart, CartItem
-from asgiref.sync import sync_to_async
+from django_app.shop.search import search_products
+from bot.core.metrics import sync_to_async
+from bot.core.cache import TTLCache
+from bot.core.config import CATEGORY_PATH_CACHE_TTL
+from bot.core.metrics import track_latency
 
 logger = logging.getLogger(__name__)
 logger.info("Загружен product/models.py версии 2025-04-23-3")
@@ -10,13 +18,13 @@ async def get_product_by_id(product_id: int):
     """Получает продукт по ID."""
     try:
         product = await sync_to_async(Product.objects.get)(id=product_id, is_active=True)
-        logger.info(f"Получен продукт: {product.name} (ID: {product.id})")
+        logger.info("Получен продукт: %s (ID: %s)", product.name, product.id)
         return product
     except Product.DoesNotExist:
-        logger.error(f"Продукт с ID {product_id} не найден")
+        logger.error("Продукт с ID %s не найден", product_id)
         raise
     except Exception as e:
-        logger.error(f"Ошибка при получении продукта ID {product_id}: {e}")
+        logger.error("Ошибка при получении продукта ID %s: %s", product_id, e)
         raise
 
 
@@ -25,11 +33,11 @@ async def get_or_create_cart(user):
     try:
         cart, created = await sync_to_async(Cart.objects.get_or_create)(user=user, is_active=True)
         logger.info(
-            f"Корзина ID {cart.id} {'создана' if created else 'найдена'} для пользователя {user.telegram_id}")
+            "Корзина ID %s %s для пользователя %s", cart.id, 'создана' if created else 'найдена', user.telegram_id)
         return cart, created
     except Exception as e:
         logger.error(
-            f"Ошибка при получении/создании корзины для пользователя {user.telegram_id}: {e}")
+            "Ошибка при получении/создании корзины для пользователя %s: %s", user.telegram_id, e)
         raise
 
 
@@ -49,17 +57,88 @@ def sync_update_cart_item(cart, product, quantity):
             item.quantity += quantity
             item.save()
             logger.info(
-                f"Элемент корзины ID {item.id} обновлён для продукта ID {product.id}, количество увеличено с {old_quantity} до {item.quantity}")
+                "Элемент корзины ID %s обновлён для продукта ID %s, количество увеличено с %s до %s", item.id, product.id, old_quantity, item.quantity)
         else:
             logger.info(
-                f"Элемент корзины ID {item.id} создан для продукта ID {product.id} с количеством {quantity}")
+                "Элемент корзины ID %s создан для продукта ID %s с количеством %s", item.id, product.id, quantity)
         return item
     except Exception as e:
         logger.error(
-            f"Ошибка при обновлении элемента корзины для продукта ID {product.id}: {e}")
+            "Ошибка при обновлении элемента корзины для продукта ID %s: %s", product.id, e)
         raise
 
 
 async def update_cart_item(cart, product, quantity):
     """Обновляет элемент корзины."""
     return await sync_update_cart_item(cart, product, quantity)
+
+
+@dataclass
+class ProductView:
+    """Данные для карточки товара"""
+    product: Product
+    category_path: list[str]
+    back_data: str
+    line_quantity: int
+    cart_quantity: int
+    cart_total: Decimal
+
+
+# ID категории -> названия от корня до категории; дерево меняется редко
+category_path_cache: TTLCache[list[str]] = TTLCache(maxsize=10000, ttl=CATEGORY_PATH_CACHE_TTL)
+
+
+def _load_product(product_id: int) -> tuple[Product, list[str]]:
+    """Товар с категорией одним запросом, путь категории из кэша (запрос только при промахе)"""
+    product = Product.objects.select_related('category').get(id=product_id, is_active=True)
+    path = category_path_cache.get(product.category_id)
+    if path is None:
+        path = list(product.category.get_ancestors(include_self=True).values_list('name', flat=True))
+        category_path_cache.set(product.category_id, path)
+    return product, path
+
+
+def _load_cart_summary(telegram_id: int, product_id: int) -> dict:
+    """Количество товара в корзине, общее количество и сумма корзины одним запросом"""
+    return CartItem.objects.filter(
+        cart__user__telegram_id=telegram_id, cart__is_active=True, is_active=True
+    ).aggregate(
+        line_quantity=Sum('quantity', filter=Q(product_id=product_id)),
+        cart_quantity=Sum('quantity'),
+        cart_total=Sum(F('product__price') * F('quantity')),
+    )
+
+
+async def load_product_view(telegram_id: int, product_id: int) -> ProductView:
+    """
+    Загрузка карточки товара: товар и сводка корзины запрашиваются параллельно
+    в разных потоках (у каждого своё соединение с БД).
+    """
+    async with track_latency("product_view"):
+        (product, path), summary = await asyncio.gather(
+            sync_to_async(_load_product, thread_sensitive=False)(product_id),
+            sync_to_async(_load_cart_summary, thread_sensitive=False)(telegram_id, product_id),
+        )
+    parent_id = product.category.parent_id
+    return ProductView(
+        product=product,
+        category_path=path,
+        back_data=f"cat_page_{parent_id}_1" if parent_id else "main_menu",
+        line_quantity=summary['line_quantity'] or 0,
+        cart_quantity=summary['cart_quantity'] or 0,
+        cart_total=summary['cart_total'] or Decimal(0),
+    )
+
+
+@sync_to_async
+def save_photo_file_id(product_id: int, file_id: str) -> None:
+    """Запоминает file_id фото товара после первой загрузки файла в Telegram."""
+    Product.objects.filter(id=product_id).update(photo_file_id=file_id)
+
+
+@sync_to_async
+def find_products(query: str, limit: int, offset: int = 0) -> tuple[list[Product], int]:
+    """Поиск активных товаров: страница товаров с категориями в порядке релевантности и общее количество."""
+    hits, total = search_products(query, limit, offset)
+    products = Product.objects.select_related('category').in_bulk([hit.id for hit in hits])
+    return [products[hit.id] for hit in hits if hit.id in products], total
@@ -0,0 +1,102 @@
+import logging
+from abc import ABC, abstractmethod
+from aiogram.fsm.context import FSMContext
+
+from bot.core.cache import TTLCache
+from bot.core.config import (
+    QUANTITY_STORE, QUANTITY_STORE_MAXSIZE, QUANTITY_STORE_TTL, QUANTITY_STORE_PER_USER
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUANTITY = 1
+
+
+def pack_key(user_id: int, product_id: int) -> int:
+    """Упаковка пары (пользователь, товар) в одно целое: ID товара занимает младшие 32 бита"""
+    return (user_id << 32) | (product_id & 0xFFFFFFFF)
+
+
+class QuantityStore(ABC):
+    """
+    Выбранное на карточке товара количество (ещё не добавленное в корзину).
+
+    Отсутствие записи означает количество по умолчанию, поэтому сброс удаляет запись.
+    """
+
+    @abstractmethod
+    async def get(self, state: FSMContext, user_id: int, product_id: int) -> int:
+        ...
+
+    @abstractmethod
+    async def set(self, state: FSMContext, user_id: int, product_id: int, quantity: int) -> None:
+        ...
+
+    @abstractmethod
+    async def reset(self, state: FSMContext, user_id: int, product_id: int) -> None:
+        ...
+
+
+class MemoryQuantityStore(QuantityStore):
+    """Хранение в памяти процесса с ограничением размера и временем жизни"""
+
+    def __init__(self, maxsize: int = QUANTITY_STORE_MAXSIZE, ttl: int = QUANTITY_STORE_TTL):
+        self.cache: TTLCache[int] = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, state: FSMContext, user_id: int, product_id: int) -> int:
+        return self.cache.get(pack_key(user_id, product_id), DEFAULT_QUANTITY)
+
+    async def set(self, state: FSMContext, user_id: int, product_id: int, quantity: int) -> None:
+        if quantity == DEFAULT_QUANTITY:
+            self.cache.pop(pack_key(user_id, product_id))
+        else:
+            self.cache.set(pack_key(user_id, product_id), quantity)
+
+    async def reset(self, state: FSMContext, user_id: int, product_id: int) -> None:
+        self.cache.pop(pack_key(user_id, product_id))
+
+
+class FSMQuantityStore(QuantityStore):
+    """
+    Хранение в данных FSM пользователя, доступное всем процессам бота.
+
+    На пользователя хранится не больше per_user последних товаров,
+    время жизни определяется хранилищем FSM.
+    """
+
+    data_key = "quantities"
+
+    def __init__(self, per_user: int = QUANTITY_STORE_PER_USER):
+        self.per_user = per_user
+
+    async def _load(self, state: FSMContext) -> dict:
+        return dict(await state.get_value(self.data_key) or {})
+
+    async def get(self, state: FSMContext, user_id: int, product_id: int) -> int:
+        return (await self._load(state)).get(str(product_id), DEFAULT_QUANTITY)
+
+    async def set(self, state: FSMContext, user_id: int, product_id: int, quantity: int) -> None:
+        quantities = await self._load(state)
+        quantities.pop(str(product_id), None)
+        if quantity != DEFAULT_QUANTITY:
+            quantities[str(product_id)] = quantity
+            while len(quantities) > self.per_user:
+                quantities.pop(next(iter(quantities)))
+        await state.update_data({self.data_key: quantities})
+
+    async def reset(self, state: FSMContext, user_id: int, product_id: int) -> None:
+        quantities = await self._load(state)
+        if quantities.pop(str(product_id), None) is not None:
+            await state.update_data({self.data_key: quantities})
+
+
+def create_quantity_store(backend: str = QUANTITY_STORE) -> QuantityStore:
+    """Создание хранилища выбранного количества по настройке QUANTITY_STORE"""
+    if backend == "fsm":
+        return FSMQuantityStore()
+    if backend == "memory":
+        return MemoryQuantityStore()
+    raise ValueError(f"Неизвестный QUANTITY_STORE: {backend}")
+
+
+quantity_store = create_quantity_store()
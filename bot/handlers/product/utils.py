@@ -1,93 +1,50 @@
 import logging
-from aiogram.types import CallbackQuery, InlineKeyboardMarkup, FSInputFile
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import CallbackQuery, InlineKeyboardMarkup, FSInputFile, Message
 from aiogram.utils.markdown import hbold, hitalic
 from django_app.shop.models import Product
-from asgiref.sync import sync_to_async
 from bot.core.config import PRICE_DECIMAL_PLACES
 
 logger = logging.getLogger(__name__)
 logger.info("Загружен product/utils.py версии 2025-04-23-10")
 
 
-@sync_to_async
-def get_product_category(product):
-    """Синхронная функция для получения категории продукта."""
-    logger.debug(f"Получение категории для продукта ID {product.id}")
-    return product.category
-
-
-@sync_to_async
-def get_category_parent_id(category):
-    """Синхронная функция для получения ID родительской категории."""
-    if category:
-        logger.debug(f"Получение родителя для категории ID {category.id}")
-        return category.parent.id if category.parent else None
-    logger.debug("Категория отсутствует")
-    return None
-
-
-@sync_to_async
-def get_category_path(category):
-    """Синхронная функция для построения пути категории."""
-    path = []
-    current = category
-    while current:
-        logger.debug(f"Добавление категории {current.name} в путь")
-        path.append(current.name)
-        current = current.parent
-    return path
-
-
-async def generate_back_data(product: Product) -> str:
-    """Генерирует callback_data для кнопки 'Назад'."""
-    try:
-        logger.debug(f"Генерация back_data для продукта ID {product.id}")
-        category = await get_product_category(product)
-        if category:
-            parent_id = await get_category_parent_id(category)
-            if parent_id:
-                callback_data = f"cat_page_{parent_id}_1"
-                logger.debug(
-                    f"Сгенерированы данные для кнопки 'Назад': {callback_data}")
-                return callback_data
-            else:
-                logger.debug(
-                    "У категории нет родителя, возврат к главному меню")
-                return "main_menu"
-        else:
-            logger.warning(f"У продукта ID {product.id} нет категории")
-            return "main_menu"
-    except Exception as e:
-        logger.error(
-            f"Ошибка при генерации back_data для продукта ID {product.id}: {e}")
-        return "main_menu"
-
-
-async def generate_product_text(product: Product) -> str:
-    """Генерирует текст для отображения продукта."""
-    try:
-        logger.debug(f"Генерация текста для продукта ID {product.id}")
-        category = await get_product_category(product)
-        category_path = await get_category_path(category) if category else []
-        category_path = " > ".join(
-            reversed(category_path)) if category_path else "Без категории"
-
-        # Форматирование цены с учётом PRICE_DECIMAL_PLACES
-        price = float(product.price)
-        price_str = f"{price:.{PRICE_DECIMAL_PLACES}f} ₽"
-
-        text = (
-            f"🏷️ {hitalic(category_path)}\n\n"
-            f"{hbold(product.name)}\n"
-            f"💰 {price_str}\n\n"
-            f"📝 {product.description or 'Нет описания'}"
-        )
-        logger.debug(f"Сгенерирован текст для продукта ID {product.id}")
-        return text
-    except Exception as e:
-        logger.error(
-            f"Ошибка при генерации текста для продукта ID {product.id}: {e}")
-        return f"{product.name}\nОшибка при загрузке данных"
+def format_product_text(product: Product, category_path: list[str], description_limit: int | None = None) -> str:
+    """Формирует текст карточки товара по уже загруженным данным."""
+    description = product.description or 'Нет описания'
+    if description_limit and len(description) > description_limit:
+        description = description[:description_limit - 1].rstrip() + "…"
+    category_text = " > ".join(category_path) if category_path else "Без категории"
+
+    # Форматирование цены с учётом PRICE_DECIMAL_PLACES
+    price = float(product.price)
+    price_str = f"{price:.{PRICE_DECIMAL_PLACES}f} ₽"
+
+    return (
+        f"🏷️ {hitalic(category_text)}\n\n"
+        f"{hbold(product.name)}\n"
+        f"💰 {price_str}\n\n"
+        f"📝 {description}"
+    )
+
+
+async def send_product_photo(message: Message, product: Product, caption: str, markup: InlineKeyboardMarkup):
+    """
+    Отправляет фото товара: по сохранённому file_id, а при его отсутствии
+    загружает файл и запоминает полученный file_id.
+    """
+    from .models import save_photo_file_id
+    if product.photo_file_id:
+        try:
+            return await message.answer_photo(
+                photo=product.photo_file_id, caption=caption, reply_markup=markup, parse_mode="HTML")
+        except TelegramBadRequest as e:
+            logger.warning("file_id фото продукта ID %s недействителен, загружаем файл: %s", product.id, e)
+    sent = await message.answer_photo(
+        photo=FSInputFile(product.photo.path), caption=caption, reply_markup=markup, parse_mode="HTML")
+    product.photo_file_id = sent.photo[-1].file_id
+    await save_photo_file_id(product.id, product.photo_file_id)
+    return sent
 
 
 async def handle_photo_message(
@@ -110,23 +67,18 @@ async def handle_photo_message(
         )
         if product.photo:
             logger.debug(
-                f"Отправка фото для продукта ID {product.id}: {product.photo.path}")
+                "Отправка фото для продукта ID %s: %s", product.id, product.photo_file_id or product.photo.path)
             await callback.message.delete()  # Удаляем старое сообщение
-            await callback.message.answer_photo(
-                photo=FSInputFile(product.photo.path),
-                caption=text,
-                reply_markup=markup,
-                parse_mode="HTML"
-            )
+            await send_product_photo(callback.message, product, text, markup)
             logger.debug(
-                f"Отправлено сообщение с фото продукта ID {product.id}")
+                "Отправлено сообщение с фото продукта ID %s", product.id)
         else:
             logger.debug(
-                f"Фото отсутствует для продукта ID {product.id}, отправка текста")
+                "Фото отсутствует для продукта ID %s, отправка текста", product.id)
             await handle_text_message(callback, product, text, back_data, 1, cart_total, cart_quantity)
     except Exception as e:
         logger.error(
-            f"Ошибка при отправке фото для продукта ID {product.id}: {e}")
+            "Ошибка при отправке фото для продукта ID %s: %s", product.id, e)
         await callback.answer("Ошибка при отображении фото.", show_alert=True)
 
 
@@ -155,8 +107,8 @@ async def handle_text_message(
             parse_mode="HTML"
         )
         logger.debug(
-            f"Отправлено текстовое сообщение для продукта ID {product.id}")
+            "Отправлено текстовое сообщение для продукта ID %s", product.id)
     except Exception as e:
         logger.error(
-            f"Ошибка при отправке текста для продукта ID {product.id}: {e}")
+            "Ошибка при отправке текста для продукта ID %s: %s", product.id, e)
         await callback.answer("Ошибка при отображении товара.", show_alert=True)
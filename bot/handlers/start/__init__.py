@@ -2,5 +2,6 @@
 from .commands import router as commands_router
 from .callbacks import router as callbacks_router
 from .handlers import router as handlers_router
+from .membership import router as membership_router
 
-__all__ = ['commands_router', 'callbacks_router', 'handlers_router']
+__all__ = ['commands_router', 'callbacks_router', 'handlers_router', 'membership_router']
@@ -2,24 +2,23 @@ import logging
 from aiogram import Router, F
 from aiogram.types import CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.exceptions import TelegramBadRequest
-from bot.handlers.start.subscriptions import check_subscriptions
-from bot.core.config import SUBSCRIPTION_CHANNEL_ID, SUBSCRIPTION_GROUP_ID, SUPPORT_TELEGRAM
+from bot.handlers.start.subscriptions import SubscriptionStatus
+from bot.core.config import SUPPORT_TELEGRAM
 from bot.handlers.start.messages import welcome_message, format_user_profile
 from bot.handlers.start.keyboards import main_menu_keyboard, profile_keyboard, price_list_keyboard
 from bot.handlers.cart.models import async_get_or_create_user, async_get_cart_quantity
 
 router = Router()
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
 logger.info(
     "Загружен start/callbacks.py версии 2025-04-27 с async_get_or_create_user")
 
 
 @router.callback_query(F.data == "main_menu")
-async def back_to_main_menu(callback: CallbackQuery):
+async def back_to_main_menu(callback: CallbackQuery, subscription: SubscriptionStatus):
     """Возврат в главное меню."""
     user_id = callback.from_user.id
-    logger.info(f"Пользователь {user_id} возвращается в главное меню.")
+    logger.info("Пользователь %s возвращается в главное меню.", user_id)
 
     user, _ = await async_get_or_create_user(
         tg_id=user_id,
@@ -34,16 +33,16 @@ async def back_to_main_menu(callback: CallbackQuery):
     try:
         await callback.message.edit_text(
             welcome_text,
-            reply_markup=await main_menu_keyboard(callback.bot, user_id),
+            reply_markup=await main_menu_keyboard(user_id, subscription.is_subscribed),
             disable_web_page_preview=True,
             parse_mode="Markdown"
         )
     except TelegramBadRequest as e:
-        logger.error(f"Ошибка при возврате в главное меню: {e}")
+        logger.error("Ошибка при возврате в главное меню: %s", e)
         await callback.message.delete()
         await callback.message.answer(
             welcome_text,
-            reply_markup=await main_menu_keyboard(callback.bot, user_id),
+            reply_markup=await main_menu_keyboard(user_id, subscription.is_subscribed),
             disable_web_page_preview=True,
             parse_mode="Markdown"
         )
@@ -51,13 +50,13 @@ async def back_to_main_menu(callback: CallbackQuery):
 
 
 @router.callback_query(F.data.startswith("locked_"))
-async def handle_locked_button(callback: CallbackQuery):
+async def handle_locked_button(callback: CallbackQuery, subscription: SubscriptionStatus):
     """Обработка нажатия на заблокированные кнопки."""
     user_id = callback.from_user.id
     logger.info(
-        f"Пользователь {user_id} нажал на заблокированную кнопку: {callback.data}")
+        "Пользователь %s нажал на заблокированную кнопку: %s", user_id, callback.data)
 
-    _, message_text = await check_subscriptions(callback.bot, user_id)
+    message_text = subscription.message
     if not message_text:
         message_text = "📢 Пожалуйста, подпишитесь на канал/группу, чтобы разблокировать эту функцию."
 
@@ -84,30 +83,7 @@ async def handle_locked_button(callback: CallbackQuery):
 async def show_profile(callback: CallbackQuery):
     """Показ профиля."""
     user_id = callback.from_user.id
-    logger.info(f"Пользователь {user_id} запросил профиль.")
-
-    # Проверка подписки
-    if SUBSCRIPTION_CHANNEL_ID or SUBSCRIPTION_GROUP_ID:
-        subscription_result, message_text = await check_subscriptions(callback.bot, user_id, "profile")
-        if not subscription_result:
-            try:
-                await callback.message.edit_text(
-                    message_text,
-                    disable_web_page_preview=True,
-                    parse_mode="Markdown",
-                    reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-                                                      [InlineKeyboardButton(text="⬅️ В меню", callback_data="main_menu")]])
-                )
-            except TelegramBadRequest:
-                await callback.message.answer(
-                    message_text,
-                    disable_web_page_preview=True,
-                    parse_mode="Markdown",
-                    reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-                                                      [InlineKeyboardButton(text="⬅️ В меню", callback_data="main_menu")]])
-                )
-            await callback.answer()
-            return
+    logger.info("Пользователь %s запросил профиль.", user_id)
 
     user, _ = await async_get_or_create_user(
         tg_id=user_id,
@@ -130,30 +106,7 @@ async def show_profile(callback: CallbackQuery):
 async def show_price_list(callback: CallbackQuery):
     """Показ прайс-листа."""
     user_id = callback.from_user.id
-    logger.info(f"Пользователь {user_id} запросил прайс-лист.")
-
-    # Проверка подписки
-    if SUBSCRIPTION_CHANNEL_ID or SUBSCRIPTION_GROUP_ID:
-        subscription_result, message_text = await check_subscriptions(callback.bot, user_id, "price_list")
-        if not subscription_result:
-            try:
-                await callback.message.edit_text(
-                    message_text,
-                    disable_web_page_preview=True,
-                    parse_mode="Markdown",
-                    reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-                                                      [InlineKeyboardButton(text="⬅️ В меню", callback_data="main_menu")]])
-                )
-            except TelegramBadRequest:
-                await callback.message.answer(
-                    message_text,
-                    disable_web_page_preview=True,
-                    parse_mode="Markdown",
-                    reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-                                                      [InlineKeyboardButton(text="⬅️ В меню", callback_data="main_menu")]])
-                )
-            await callback.answer()
-            return
+    logger.info("Пользователь %s запросил прайс-лист.", user_id)
 
     page = int(callback.data.split("_")[-1])
     user, _ = await async_get_or_create_user(
@@ -186,7 +139,7 @@ async def show_about(callback: CallbackQuery):
     """Показ информации 'О боте' через callback."""
     user_id = callback.from_user.id
     logger.info(
-        f"Пользователь {user_id} запросил информацию 'О боте' через callback.")
+        "Пользователь %s запросил информацию 'О боте' через callback.", user_id)
 
     text = (
         "ℹ️ О нас\n\n"
@@ -206,7 +159,7 @@ async def show_about(callback: CallbackQuery):
             parse_mode="HTML"
         )
     except TelegramBadRequest as e:
-        logger.error(f"Ошибка при отправке информации 'О боте': {e}")
+        logger.error("Ошибка при отправке информации 'О боте': %s", e)
         await callback.message.answer(
             text,
             reply_markup=keyboard,
@@ -2,12 +2,11 @@ import logging
 from aiogram import Router, F
 from aiogram.types import Message
 from aiogram.exceptions import TelegramBadRequest
-from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
 from bot.handlers.start.messages import welcome_message, format_user_profile
 from bot.handlers.start.keyboards import main_menu_keyboard, profile_keyboard
-from bot.handlers.start.subscriptions import check_subscriptions
-from bot.core.config import SUBSCRIPTION_CHANNEL_ID, SUBSCRIPTION_GROUP_ID, SUPPORT_TELEGRAM
+from bot.handlers.start.subscriptions import SubscriptionStatus
+from bot.core.config import SUPPORT_TELEGRAM
 from bot.handlers.cart.models import async_get_or_create_user, async_get_cart_quantity
 
 router = Router()
@@ -15,10 +14,10 @@ logger = logging.getLogger(__name__)
 
 
 @router.message(F.text == "/start")
-async def start_command(message: Message):
+async def start_command(message: Message, subscription: SubscriptionStatus):
     """Обработчик команды /start."""
     user_id = message.from_user.id
-    logger.info(f"Получена команда /start от пользователя {user_id}")
+    logger.info("Получена команда /start от пользователя %s", user_id)
 
     user_data = message.from_user
     user, _ = await async_get_or_create_user(
@@ -34,7 +33,7 @@ async def start_command(message: Message):
         has_cart = (await async_get_cart_quantity(user)) > 0
     except Exception as e:
         logger.error(
-            f"Ошибка при проверке корзины для пользователя {user_id}: {e}")
+            "Ошибка при проверке корзины для пользователя %s: %s", user_id, e)
         has_cart = False
 
     welcome_text = welcome_message(user_data.first_name, has_cart)
@@ -42,40 +41,27 @@ async def start_command(message: Message):
     try:
         await message.answer(
             welcome_text,
-            reply_markup=await main_menu_keyboard(message.bot, user_id),
+            reply_markup=await main_menu_keyboard(user_id, subscription.is_subscribed),
             disable_web_page_preview=True,
             parse_mode="Markdown"
         )
     except TelegramBadRequest as e:
         logger.error(
-            f"Ошибка при отправке приветственного сообщения пользователю {user_id}: {e}")
+            "Ошибка при отправке приветственного сообщения пользователю %s: %s", user_id, e)
         await message.answer(
             welcome_text,
-            reply_markup=await main_menu_keyboard(message.bot, user_id),
+            reply_markup=await main_menu_keyboard(user_id, subscription.is_subscribed),
             disable_web_page_preview=True,
             parse_mode="Markdown"
         )
-    logger.info(f"Приветственное сообщение отправлено пользователю {user_id}.")
+    logger.info("Приветственное сообщение отправлено пользователю %s.", user_id)
 
 
 @router.message(F.text == "/profile")
 async def profile_command(message: Message):
-    """Обработчик команды /profile с проверкой подписки."""
+    """Обработчик команды /profile (доступ проверяет SubscriptionMiddleware)."""
     user_id = message.from_user.id
-    logger.info(f"Получена команда /profile от пользователя {user_id}")
-
-    # Проверка подписки
-    if SUBSCRIPTION_CHANNEL_ID or SUBSCRIPTION_GROUP_ID:
-        subscription_result, message_text = await check_subscriptions(message.bot, user_id, "/profile")
-        if not subscription_result:
-            await message.answer(
-                message_text,
-                disable_web_page_preview=True,
-                parse_mode="Markdown",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-                                                  [InlineKeyboardButton(text="⬅️ В меню", callback_data="main_menu")]])
-            )
-            return
+    logger.info("Получена команда /profile от пользователя %s", user_id)
 
     user, _ = await async_get_or_create_user(
         tg_id=user_id,
@@ -89,5 +75,5 @@ async def profile_command(message: Message):
         await message.answer(text, reply_markup=keyboard, parse_mode="HTML")
     except TelegramBadRequest as e:
         logger.error(
-            f"Ошибка при отправке профиля пользователю {user_id}: {e}")
+            "Ошибка при отправке профиля пользователю %s: %s", user_id, e)
         await message.answer(text, reply_markup=keyboard, parse_mode="HTML")
@@ -3,8 +3,7 @@ from aiogram import Router, F
 from aiogram.types import CallbackQuery
 from bot.handlers.start.messages import welcome_message
 from bot.handlers.start.keyboards import main_menu_keyboard
-from bot.handlers.start.subscriptions import check_subscriptions
-from bot.core.config import SUBSCRIPTION_CHANNEL_ID, SUBSCRIPTION_GROUP_ID
+from bot.handlers.start.subscriptions import SubscriptionStatus
 from bot.handlers.cart.models import async_get_or_create_user, async_get_cart_quantity
 
 router = Router()
@@ -12,10 +11,10 @@ logger = logging.getLogger(__name__)
 
 
 @router.callback_query(F.data == "main_menu")
-async def back_to_main_menu(callback: CallbackQuery):
+async def back_to_main_menu(callback: CallbackQuery, subscription: SubscriptionStatus):
     """Возвращает пользователя в главное меню."""
     user_id = callback.from_user.id
-    logger.info(f"Пользователь {user_id} возвращается в главное меню.")
+    logger.info("Пользователь %s возвращается в главное меню.", user_id)
 
     user, _ = await async_get_or_create_user(
         tg_id=user_id,
@@ -30,16 +29,16 @@ async def back_to_main_menu(callback: CallbackQuery):
     try:
         await callback.message.edit_text(
             welcome_text,
-            reply_markup=await main_menu_keyboard(callback.bot, user_id),
+            reply_markup=await main_menu_keyboard(user_id, subscription.is_subscribed),
             disable_web_page_preview=True,
             parse_mode="Markdown"
         )
     except Exception as e:
-        logger.error(f"Ошибка при возврате в главное меню: {e}")
+        logger.error("Ошибка при возврате в главное меню: %s", e)
         await callback.message.delete()
         await callback.message.answer(
             welcome_text,
-            reply_markup=await main_menu_keyboard(callback.bot, user_id),
+            reply_markup=await main_menu_keyboard(user_id, subscription.is_subscribed),
             disable_web_page_preview=True,
             parse_mode="Markdown"
         )
@@ -1,19 +1,11 @@
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-from bot.handlers.start.subscriptions import check_subscriptions
-from bot.core.config import SUBSCRIPTION_CHANNEL_ID, SUBSCRIPTION_GROUP_ID
 from bot.handlers.cart.models import async_get_or_create_user, async_get_cart_quantity
 
 
-async def main_menu_keyboard(bot, user_id):
-    """Формирует клавиатуру главного меню с учётом подписки."""
+async def main_menu_keyboard(user_id, has_subscription: bool = True):
+    """Формирует клавиатуру главного меню с учётом подписки (статус определяет SubscriptionMiddleware)."""
     keyboard = InlineKeyboardMarkup(inline_keyboard=[])
 
-    # Проверяем подписку
-    has_subscription = True
-    if SUBSCRIPTION_CHANNEL_ID or SUBSCRIPTION_GROUP_ID:
-        subscription_result, _ = await check_subscriptions(bot, user_id)
-        has_subscription = subscription_result
-
     # Получаем объект пользователя
     user, _ = await async_get_or_create_user(tg_id=user_id)
 
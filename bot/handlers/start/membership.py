@@ -0,0 +1,199 @@
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Optional
+from aiogram import Bot, Router
+from aiogram.exceptions import TelegramAPIError
+from aiogram.types import ChatMemberUpdated
+from bot.core.metrics import sync_to_async
+from django.db import transaction
+from django.utils import timezone
+
+from bot.core.config import (
+    SUBSCRIPTION_CHANNEL_ID, SUBSCRIPTION_GROUP_ID,
+    MEMBERSHIP_RECONCILE_INTERVAL, MEMBERSHIP_VERIFY_AGE, MEMBERSHIP_VERIFY_BATCH
+)
+from django_app.shop.models import ChannelMembership
+
+router = Router()
+logger = logging.getLogger(__name__)
+
+# Статусы, при которых бот получает события chat_member
+ADMIN_STATUSES = ("creator", "administrator")
+
+
+def is_member_status(member) -> bool:
+    """Является ли участник чата подписчиком"""
+    if member.status in ("left", "kicked"):
+        return False
+    # restricted-участник может уже не состоять в чате
+    return getattr(member, "is_member", True) is not False
+
+
+class MembershipRegistry:
+    """
+    Локальный реестр подписчиков обязательных каналов/групп.
+
+    Заполняется событиями chat_member и результатами запросов к API, хранится
+    в таблице ChannelMembership и в памяти процесса (множества ID по чатам),
+    поэтому проверка подписки — O(1) без обращения к Bot API.
+
+    Доверие только положительным записям: отписка без события chat_member
+    обнаруживается перепроверкой в reconcile, а отсутствие в реестре (в том числе
+    is_member=False) проверяется через кэш с коротким TTL и Bot API, поэтому
+    подписавшийся пользователь не остаётся заблокированным из-за старой записи.
+    """
+
+    def __init__(self):
+        self.chat_ids: dict[str, int] = {}  # значение из настроек -> числовой ID чата
+        self.members: dict[int, set[int]] = {}
+        self.synced_at = None
+        self.reconcile_task: Optional[asyncio.Task] = None
+
+    def chat_id_for(self, chat_ref) -> Optional[int]:
+        """Числовой ID отслеживаемого чата или None"""
+        return self.chat_ids.get(str(chat_ref))
+
+    def is_tracked(self, chat_id: int) -> bool:
+        return chat_id in self.members
+
+    def lookup(self, chat_ref, user_id: int) -> Optional[bool]:
+        """True — пользователь подписан по реестру, None — нужно проверить кэш или Bot API"""
+        chat_id = self.chat_id_for(chat_ref)
+        if chat_id is None:
+            return None
+        return True if user_id in self.members[chat_id] else None
+
+    def apply(self, chat_id: int, user_id: int, is_member: bool) -> None:
+        if not self.is_tracked(chat_id):
+            return
+        if is_member:
+            self.members[chat_id].add(user_id)
+        else:
+            self.members[chat_id].discard(user_id)
+
+    def untrack(self, chat_id: int) -> None:
+        """Прекращение отслеживания чата: проверки уходят в Bot API"""
+        self.members.pop(chat_id, None)
+        self.chat_ids = {ref: cid for ref, cid in self.chat_ids.items() if cid != chat_id}
+
+    async def record(self, chat_id: int, user_id: int, status: str, is_member: bool) -> None:
+        """Сохранение статуса в базе и в памяти"""
+        if not self.is_tracked(chat_id):
+            return
+        await sync_to_async(ChannelMembership.objects.update_or_create)(
+            chat_id=chat_id, user_id=user_id,
+            defaults={'status': status, 'is_member': is_member},
+        )
+        self.apply(chat_id, user_id, is_member)
+
+    async def resolve_chats(self, bot: Bot) -> None:
+        """Определение числовых ID обязательных чатов (в настройках может быть @username)"""
+        for chat_ref in (SUBSCRIPTION_CHANNEL_ID, SUBSCRIPTION_GROUP_ID):
+            if not chat_ref or str(chat_ref) in self.chat_ids:
+                continue
+            try:
+                chat_id = int(chat_ref)
+            except ValueError:
+                try:
+                    chat_id = (await bot.get_chat(chat_ref)).id
+                except TelegramAPIError as e:
+                    logger.error("Не удалось определить ID чата %s, реестр для него отключён: %s", chat_ref, e)
+                    continue
+            self.chat_ids[str(chat_ref)] = chat_id
+            self.members.setdefault(chat_id, set())
+
+    async def refresh(self) -> int:
+        """Загрузка изменений из базы с момента прошлой синхронизации (все записи при первом вызове)"""
+        started = timezone.now()
+        queryset = ChannelMembership.objects.filter(chat_id__in=list(self.members))
+        if self.synced_at is not None:
+            # Небольшой запас на записи, сохранённые во время прошлой синхронизации
+            queryset = queryset.filter(updated_at__gte=self.synced_at - timedelta(seconds=5))
+        rows = await sync_to_async(list)(queryset.values_list('chat_id', 'user_id', 'is_member'))
+        for chat_id, user_id, is_member in rows:
+            self.apply(chat_id, user_id, is_member)
+        self.synced_at = started
+        return len(rows)
+
+    @sync_to_async
+    def _claim_stale(self, limit: int) -> list[tuple[int, int, int]]:
+        """Выбор давно не проверявшихся подписчиков; updated_at обновляется, чтобы их не взял другой процесс"""
+        threshold = timezone.now() - timedelta(seconds=MEMBERSHIP_VERIFY_AGE)
+        with transaction.atomic():
+            rows = list(
+                ChannelMembership.objects
+                .select_for_update(skip_locked=True)
+                .filter(chat_id__in=list(self.members), is_member=True, updated_at__lt=threshold)
+                .order_by('updated_at')
+                .values_list('id', 'chat_id', 'user_id')[:limit]
+            )
+            ChannelMembership.objects.filter(id__in=[row[0] for row in rows]).update(updated_at=timezone.now())
+        return rows
+
+    async def verify_stale(self, bot: Bot, limit: int = MEMBERSHIP_VERIFY_BATCH) -> int:
+        """Перепроверка через API подписчиков, по которым давно не было событий"""
+        changed = 0
+        for _, chat_id, user_id in await self._claim_stale(limit):
+            try:
+                member = await bot.get_chat_member(chat_id, user_id)
+            except TelegramAPIError as e:
+                logger.warning("Ошибка перепроверки подписки %s в %s: %s", user_id, chat_id, e)
+                continue
+            if not is_member_status(member):
+                await self.record(chat_id, user_id, member.status, False)
+                changed += 1
+        return changed
+
+    async def reconcile(self, bot: Bot) -> None:
+        """Сверка реестра: изменения из базы (от других процессов) и перепроверка устаревших записей"""
+        loaded = await self.refresh()
+        unsubscribed = await self.verify_stale(bot)
+        logger.debug("Сверка подписок: загружено %s, отписались %s", loaded, unsubscribed)
+
+
+membership_registry = MembershipRegistry()
+
+
+async def run_membership_reconcile(bot: Bot, interval: int = MEMBERSHIP_RECONCILE_INTERVAL):
+    """Периодическая сверка реестра подписчиков"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await membership_registry.reconcile(bot)
+        except Exception as e:
+            logger.error("Ошибка сверки реестра подписчиков: %s", e, exc_info=True)
+
+
+async def on_membership_startup(bot: Bot):
+    """Загрузка реестра при запуске и старт периодической сверки"""
+    await membership_registry.resolve_chats(bot)
+    if not membership_registry.members:
+        return
+    loaded = await membership_registry.refresh()
+    logger.info("Реестр подписчиков загружен: %s записей", loaded)
+    # Ссылка сохраняется, чтобы задачу не удалил сборщик мусора
+    membership_registry.reconcile_task = asyncio.create_task(run_membership_reconcile(bot))
+
+
+@router.chat_member()
+async def on_chat_member(event: ChatMemberUpdated):
+    """Вступление/выход пользователя из обязательного канала или группы"""
+    if not membership_registry.is_tracked(event.chat.id):
+        return
+    member = event.new_chat_member
+    is_member = is_member_status(member)
+    await membership_registry.record(event.chat.id, member.user.id, member.status, is_member)
+    logger.info(
+        "Пользователь %s %s чат %s", member.user.id, 'подписался на' if is_member else 'покинул', event.chat.id)
+
+
+@router.my_chat_member()
+async def on_my_chat_member(event: ChatMemberUpdated):
+    """Изменение прав бота в обязательном канале или группе"""
+    if not membership_registry.is_tracked(event.chat.id):
+        return
+    if event.new_chat_member.status not in ADMIN_STATUSES:
+        logger.warning(
+            "Бот больше не администратор чата %s: события chat_member не приходят, проверка подписки переключена на Bot API", event.chat.id)
+        membership_registry.untrack(event.chat.id)
@@ -1,4 +1,4 @@
-from asgiref.sync import sync_to_async
+from bot.core.metrics import sync_to_async
 from django_app.shop.models import TelegramUser, Order, Product, Category
 
 ITEMS_PER_PAGE = 10
@@ -1,11 +1,110 @@
+import asyncio
 import logging
+from typing import NamedTuple, Optional
 from aiogram import Bot
 from aiogram.exceptions import TelegramAPIError
-from bot.core.config import SUBSCRIPTION_CHANNEL_ID, SUBSCRIPTION_GROUP_ID, FREE_ACCESS_COMMANDS
+from bot.core.cache import TTLCache
+from bot.handlers.start.membership import membership_registry, is_member_status
+from bot.core.config import (
+    SUBSCRIPTION_CHANNEL_ID, SUBSCRIPTION_GROUP_ID, FREE_ACCESS_COMMANDS,
+    SUBSCRIPTION_CACHE_POSITIVE_TTL, SUBSCRIPTION_CACHE_NEGATIVE_TTL,
+    SUBSCRIPTION_CACHE_MAXSIZE, SUBSCRIPTION_LINK_TTL
+)
 
 logger = logging.getLogger(__name__)
 
 
+class SubscriptionStatus(NamedTuple):
+    """Результат проверки подписки, передаётся обработчикам как subscription"""
+    is_subscribed: bool
+    message: Optional[str] = None
+
+
+SUBSCRIBED = SubscriptionStatus(True)
+
+# (chat_id, user_id) -> подписан ли пользователь
+membership_cache: TTLCache[bool] = TTLCache(
+    maxsize=SUBSCRIPTION_CACHE_MAXSIZE, ttl=SUBSCRIPTION_CACHE_POSITIVE_TTL)
+# chat_id -> ссылка на канал/группу
+chat_link_cache: TTLCache[str] = TTLCache(maxsize=16, ttl=SUBSCRIPTION_LINK_TTL)
+
+
+def required_subscriptions() -> list[tuple[str, str]]:
+    """Список обязательных подписок: (тип, ID чата)"""
+    required = []
+    if SUBSCRIPTION_CHANNEL_ID:
+        required.append(("канал", SUBSCRIPTION_CHANNEL_ID))
+    if SUBSCRIPTION_GROUP_ID and SUBSCRIPTION_GROUP_ID != SUBSCRIPTION_CHANNEL_ID:
+        required.append(("группу", SUBSCRIPTION_GROUP_ID))
+    return required
+
+
+def remember_membership(chat_id, user_id: int, is_member: bool) -> None:
+    """Сохранение статуса подписки в кэш с TTL для подписанных/неподписанных"""
+    ttl = SUBSCRIPTION_CACHE_POSITIVE_TTL if is_member else SUBSCRIPTION_CACHE_NEGATIVE_TTL
+    membership_cache.set((str(chat_id), user_id), is_member, ttl=ttl)
+
+
+async def is_chat_member(bot: Bot, sub_type: str, chat_id, user_id: int) -> Optional[bool]:
+    """
+    Подписан ли пользователь на чат. None, если проверить не удалось.
+
+    Сначала используется реестр подписчиков (события chat_member), затем кэш,
+    Bot API вызывается только для пользователей, не подписанных по реестру.
+    """
+    known = membership_registry.lookup(chat_id, user_id)
+    if known is not None:
+        return known
+    cached = membership_cache.get((str(chat_id), user_id))
+    if cached is not None:
+        return cached
+    try:
+        member = await bot.get_chat_member(chat_id, user_id)
+    except TelegramAPIError as e:
+        logger.error(
+            "Ошибка проверки %s %s для пользователя %s: %s", sub_type, chat_id, user_id, e)
+        return None
+    is_member = is_member_status(member)
+    remember_membership(chat_id, user_id, is_member)
+    registry_chat_id = membership_registry.chat_id_for(chat_id)
+    if registry_chat_id is not None:
+        await membership_registry.record(registry_chat_id, user_id, member.status, is_member)
+    return is_member
+
+
+async def get_chat_link(bot: Bot, sub_type: str, chat_id) -> str:
+    """Ссылка на канал/группу (кэшируется)"""
+    cached = chat_link_cache.get(str(chat_id))
+    if cached is not None:
+        return cached
+    try:
+        chat = await bot.get_chat(chat_id)
+    except TelegramAPIError as e:
+        logger.error(
+            "Ошибка получения информации о %s %s: %s", sub_type, chat_id, e)
+        # В случае ошибки формируем ссылку по ID (хотя она может не работать), не кэшируем
+        chat_id_clean = str(chat_id).lstrip('-100')
+        return f"https://t.me/c/{chat_id_clean}"
+
+    if chat.username:  # Если у канала есть публичное имя
+        chat_link = f"https://t.me/{chat.username}"
+    elif chat.invite_link:  # Если есть инвайт-линк
+        chat_link = chat.invite_link
+    else:
+        # Если канал приватный и нет инвайт-линка
+        chat_link = f"приватный {sub_type} (попросите ссылку у администратора)"
+    chat_link_cache.set(str(chat_id), chat_link)
+    return chat_link
+
+
+async def _missing_subscription(bot: Bot, sub_type: str, chat_id, user_id: int) -> Optional[str]:
+    """Строка с требованием подписки или None, если подписка есть или проверка не удалась"""
+    if await is_chat_member(bot, sub_type, chat_id, user_id) is not False:
+        return None
+    chat_link = await get_chat_link(bot, sub_type, chat_id)
+    return f"- [{sub_type.capitalize()}]({chat_link})"
+
+
 async def check_subscriptions(bot: Bot, user_id: int, command: str = None) -> tuple[bool, str | None]:
     """
     Проверяет подписки пользователя.
@@ -23,66 +122,33 @@ async def check_subscriptions(bot: Bot, user_id: int, command: str = None) -> tu
     # Если команда в списке свободного доступа, пропускаем проверку
     if command in FREE_ACCESS_COMMANDS:
         logger.debug(
-            f"Команда {command} не требует подписки для пользователя {user_id}")
+            "Команда %s не требует подписки для пользователя %s", command, user_id)
         return True, None
 
     try:
-        required_subscriptions = []
-
-        if SUBSCRIPTION_CHANNEL_ID:
-            required_subscriptions.append(("канал", SUBSCRIPTION_CHANNEL_ID))
-
-        if SUBSCRIPTION_GROUP_ID and SUBSCRIPTION_GROUP_ID != SUBSCRIPTION_CHANNEL_ID:
-            required_subscriptions.append(("группу", SUBSCRIPTION_GROUP_ID))
-
-        if not required_subscriptions:
-            logger.debug(f"Подписки не требуются для пользователя {user_id}")
+        required = required_subscriptions()
+        if not required:
+            logger.debug("Подписки не требуются для пользователя %s", user_id)
             return True, None
 
-        missing_subs = []
-
-        for sub_type, chat_id in required_subscriptions:
-            try:
-                # Проверяем, подписан ли пользователь
-                member = await bot.get_chat_member(chat_id, user_id)
-                if member.status in ["left", "kicked"]:
-                    # Пытаемся получить информацию о чате
-                    try:
-                        chat = await bot.get_chat(chat_id)
-                        if chat.username:  # Если у канала есть публичное имя
-                            chat_link = f"https://t.me/{chat.username}"
-                        elif chat.invite_link:  # Если есть инвайт-линк
-                            chat_link = chat.invite_link
-                        else:
-                            # Если канал приватный и нет инвайт-линка
-                            chat_link = f"приватный {sub_type} (попросите ссылку у администратора)"
-                    except TelegramAPIError as e:
-                        logger.error(
-                            f"Ошибка получения информации о {sub_type} {chat_id}: {e}")
-                        # В случае ошибки формируем ссылку по ID (хотя она может не работать)
-                        chat_id_clean = str(chat_id).lstrip('-100')
-                        chat_link = f"https://t.me/c/{chat_id_clean}"
-
-                    missing_subs.append(
-                        f"- [{sub_type.capitalize()}]({chat_link})"
-                    )
-            except TelegramAPIError as e:
-                logger.error(
-                    f"Ошибка проверки {sub_type} {chat_id} для пользователя {user_id}: {e}")
-                continue
+        # Канал и группа проверяются параллельно, результаты берутся из кэша, если есть
+        results = await asyncio.gather(
+            *(_missing_subscription(bot, sub_type, chat_id, user_id) for sub_type, chat_id in required)
+        )
+        missing_subs = [line for line in results if line]
 
         if missing_subs:
             message = "📢 Для доступа необходимо подписаться на:\n" + \
                 "\n".join(missing_subs)
             logger.info(
-                f"Пользователь {user_id} не подписан на: {', '.join(missing_subs)}")
+                "Пользователь %s не подписан на: %s", user_id, ', '.join(missing_subs))
             return False, message
 
         logger.debug(
-            f"Пользователь {user_id} подписан на все необходимые каналы/группы")
+            "Пользователь %s подписан на все необходимые каналы/группы", user_id)
         return True, None
 
     except Exception as e:
         logger.error(
-            f"Ошибка проверки подписок для пользователя {user_id}: {e}", exc_info=True)
+            "Ошибка проверки подписок для пользователя %s: %s", user_id, e, exc_info=True)
         return True, None
@@ -4,10 +4,11 @@ import os
 import sys
 import django
 
-from bot.core.config import TELEGRAM_BOT_TOKEN, LOGGING_CONFIG
-from bot.core.bot_setup import setup_bot  
+from bot.core.config import TELEGRAM_BOT_TOKEN, BOT_MODE
+from bot.core.logging_config import setup_logging
+from bot.core.bot_setup import setup_bot
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+setup_logging()
 logger = logging.getLogger(__name__)
 logger.info("Запуск bot/main.py")
 
@@ -20,12 +21,22 @@ logger.info("Django инициализирован")
 async def main():
     logger.info("Вход в функцию main()")
     try:
-        logger.info(f"TELEGRAM_BOT_TOKEN: {'установлен' if TELEGRAM_BOT_TOKEN else 'не установлен'}")
+        logger.info("TELEGRAM_BOT_TOKEN: %s", 'установлен' if TELEGRAM_BOT_TOKEN else 'не установлен')
         bot, dp = setup_bot()
-        logger.info("Запуск polling")
-        await dp.start_polling(bot)
+        if BOT_MODE == "webhook":
+            from bot.core.webhook import run_webhook
+            logger.info("Запуск в режиме webhook")
+            await run_webhook(bot, dp)
+        elif BOT_MODE == "ingress":
+            from bot.core.ingress import run_ingress
+            from bot.core.queue import create_update_queue
+            logger.info("Запуск приёмника обновлений (обработка в bot.worker)")
+            await run_ingress(bot, dp, create_update_queue())
+        else:
+            logger.info("Запуск polling")
+            await dp.start_polling(bot)
     except Exception as e:
-        logger.exception(f"Ошибка при запуске бота: {e}")
+        logger.exception("Ошибка при запуске бота: %s", e)
         raise
     finally:
         if 'bot' in locals():
@@ -39,5 +50,5 @@ if __name__ == "__main__":
     except (KeyboardInterrupt, SystemExit):
         logger.info("Бот остановлен вручную")
     except Exception as e:
-        logger.exception(f"Необработанная ошибка: {e}")
+        logger.exception("Необработанная ошибка: %s", e)
         sys.exit(1)
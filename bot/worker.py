@@ -0,0 +1,128 @@
+# bot/worker.py
+"""
+Воркер, обрабатывающий обновления из очереди (см. bot/core/queue.py).
+
+Примеры:
+    python -m bot.worker --partitions 0-7         # партиции 0..7 из Redis
+    python -m bot.worker --local --processes 4    # приёмник и 4 воркера на multiprocessing.Queue
+
+Обновления одного пользователя всегда попадают в одну партицию, а партиция
+обрабатывается строго последовательно, поэтому порядок для пользователя сохраняется.
+Разные партиции обрабатываются параллельно в разных процессах.
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import django
+
+from bot.core.logging_config import setup_logging, stop_logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "django_app.config.settings")
+django.setup()
+
+from bot.core.bot_setup import setup_bot  # noqa: E402
+from bot.core.config import UPDATE_QUEUE_PARTITIONS  # noqa: E402
+from bot.core.ingress import run_ingress  # noqa: E402
+from bot.core.queue import UpdateQueue, MultiprocessingUpdateQueue, create_update_queue  # noqa: E402
+
+
+def parse_partitions(value: str) -> list[int]:
+    """Разбор списка партиций вида "0-3,7" """
+    partitions = []
+    for part in value.split(","):
+        part = part.strip()
+        if "-" in part:
+            start, end = part.split("-", 1)
+            partitions.extend(range(int(start), int(end) + 1))
+        elif part:
+            partitions.append(int(part))
+    return partitions
+
+
+async def consume_partition(bot, dp, queue: UpdateQueue, partition: int):
+    """Последовательная обработка обновлений одной партиции"""
+    logger.info("Обработка партиции %s", partition)
+    while True:
+        update = await queue.get(partition)
+        if update is None:
+            continue
+        try:
+            await dp.feed_raw_update(bot, update)
+        except Exception as e:
+            logger.exception("Ошибка обработки update_id=%s в партиции %s: %s", update.get('update_id'), partition, e)
+
+
+async def run_worker(queue: UpdateQueue, partitions: list[int]):
+    """Обработка указанных партиций: по одной задаче на партицию"""
+    bot, dp = setup_bot()
+    await dp.emit_startup(bot=bot, dispatcher=dp)
+    try:
+        await asyncio.gather(*(consume_partition(bot, dp, queue, p) for p in partitions))
+    finally:
+        await dp.emit_shutdown(bot=bot, dispatcher=dp)
+        await queue.close()
+        await bot.session.close()
+
+
+def worker_process(queue: UpdateQueue, partitions: list[int]):
+    """Точка входа дочернего процесса"""
+    # При запуске через spawn модуль импортируется заново; после fork поток уже перезапущен
+    setup_logging()
+    try:
+        asyncio.run(run_worker(queue, partitions))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Дочерние процессы multiprocessing завершаются без atexit: оставшиеся записи дописываются здесь
+        stop_logging()
+
+
+def run_local(processes: int):
+    """Приёмник в текущем процессе и воркеры в дочерних, очередь — multiprocessing.Queue"""
+    from django.db import connections
+
+    queue = MultiprocessingUpdateQueue(UPDATE_QUEUE_PARTITIONS)
+    # Соединения с БД не должны наследоваться дочерними процессами
+    connections.close_all()
+    children = []
+    for index in range(processes):
+        partitions = [p for p in range(queue.partitions) if p % processes == index]
+        child = multiprocessing.Process(target=worker_process, args=(queue, partitions), daemon=True)
+        child.start()
+        children.append(child)
+        logger.info("Воркер %s (pid %s) обрабатывает партиции %s", index, child.pid, partitions)
+
+    bot, dp = setup_bot()
+    try:
+        asyncio.run(run_ingress(bot, dp, queue))
+    finally:
+        for child in children:
+            child.terminate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Обработка обновлений из очереди")
+    parser.add_argument("--partitions", default=f"0-{UPDATE_QUEUE_PARTITIONS - 1}",
+                        help="Обрабатываемые партиции, например 0-7 или 0,2,4")
+    parser.add_argument("--local", action="store_true",
+                        help="Запустить приёмник и воркеры на одной машине без Redis")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1,
+                        help="Количество процессов-воркеров для --local")
+    args = parser.parse_args()
+
+    if args.local:
+        run_local(args.processes)
+    else:
+        worker_process(create_update_queue(), parse_partitions(args.partitions))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        logger.info("Воркер остановлен вручную")
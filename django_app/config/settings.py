@@ -104,3 +104,24 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Токен бота
 BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
+
+# Ограничения отправки сообщений через Telegram Bot API (рассылки, уведомления)
+TELEGRAM_MESSAGES_PER_SECOND = float(os.getenv("TELEGRAM_MESSAGES_PER_SECOND", "25"))
+TELEGRAM_SEND_CONCURRENCY = int(os.getenv("TELEGRAM_SEND_CONCURRENCY", "20"))
+BROADCAST_CHUNK_SIZE = int(os.getenv("BROADCAST_CHUNK_SIZE", "200"))
+
+# Поиск по FAQ и товарам (django_app/shop/search.py)
+# "auto" — полнотекстовый поиск PostgreSQL, на других СУБД — индекс в памяти процесса
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto")
+SEARCH_INDEX_CHECK_INTERVAL = int(os.getenv("SEARCH_INDEX_CHECK_INTERVAL", "30"))  # Проверка изменений для индекса в памяти, сек.
+
+# Импорт товаров (django_app/shop/importers.py)
+PRODUCT_IMPORT_BATCH_SIZE = int(os.getenv("PRODUCT_IMPORT_BATCH_SIZE", "1000"))  # Товаров в одной пачке/транзакции
+PRODUCT_EXPORT_CHUNK_SIZE = int(os.getenv("PRODUCT_EXPORT_CHUNK_SIZE", "2000"))  # Товаров за одно чтение курсора
+ORDER_EXPORT_CHUNK_SIZE = int(os.getenv("ORDER_EXPORT_CHUNK_SIZE", "1000"))  # Заказов за одно чтение курсора
+EXPORT_RETENTION_HOURS = int(os.getenv("EXPORT_RETENTION_HOURS", "72"))  # Срок хранения файлов фоновых отчётов
+
+# Фоновые задания импорта и экспорта (django_app/shop/jobs.py) и рассылки (django_app/shop/broadcast.py)
+JOB_HEARTBEAT_INTERVAL = int(os.getenv("JOB_HEARTBEAT_INTERVAL", "30"))  # Как часто обработчик отмечает задание, сек.
+JOB_STALE_TIMEOUT = int(os.getenv("JOB_STALE_TIMEOUT", "300"))  # Задание без отметки дольше этого считается брошенным, сек.
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))  # Запусков брошенного отчёта, после которых он помечается ошибкой
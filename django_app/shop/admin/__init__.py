@@ -5,6 +5,9 @@ from .faq_admin import FAQAdmin
 from .cart_admin import CartAdmin
 from .order_admin import OrderAdmin
 from .telegram_user_admin import TelegramUserAdmin
+from .broadcast_admin import BroadcastAdmin
+from .import_job_admin import ImportJobAdmin
+from .export_job_admin import ExportJobAdmin
 
 __all__ = [
     'CategoryAdmin',
@@ -13,4 +16,7 @@ __all__ = [
     'CartAdmin',
     'OrderAdmin',
     'TelegramUserAdmin',
+    'BroadcastAdmin',
+    'ImportJobAdmin',
+    'ExportJobAdmin',
 ]
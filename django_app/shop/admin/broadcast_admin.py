@@ -0,0 +1,31 @@
+import logging
+from django.contrib import admin
+from ..models import Broadcast
+
+logger = logging.getLogger(__name__)
+
+@admin.register(Broadcast)
+class BroadcastAdmin(admin.ModelAdmin):
+    list_display = ('id', 'status', 'sent_count', 'failed_count', 'blocked_count', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    readonly_fields = (
+        'status', 'last_user_id', 'sent_count', 'failed_count', 'blocked_count',
+        'created_at', 'started_at', 'heartbeat_at', 'finished_at'
+    )
+    actions = ['start_selected', 'pause_selected']
+
+    def start_selected(self, request, queryset):
+        updated = queryset.filter(
+            status__in=[Broadcast.STATUS_DRAFT, Broadcast.STATUS_PAUSED]
+        ).update(status=Broadcast.STATUS_QUEUED)
+        logger.info(f'В очередь поставлено рассылок: {updated}')
+        self.message_user(request, f"Поставлено в очередь рассылок: {updated}.")
+    start_selected.short_description = "Запустить (продолжить) выбранные рассылки"
+
+    def pause_selected(self, request, queryset):
+        updated = queryset.filter(
+            status__in=[Broadcast.STATUS_QUEUED, Broadcast.STATUS_RUNNING]
+        ).update(status=Broadcast.STATUS_PAUSED)
+        logger.info(f'Приостановлено рассылок: {updated}')
+        self.message_user(request, f"Приостановлено рассылок: {updated}.")
+    pause_selected.short_description = "Приостановить выбранные рассылки"
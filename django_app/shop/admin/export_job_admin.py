@@ -0,0 +1,62 @@
+import logging
+from django.contrib import admin, messages
+from django.http import FileResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.urls import path, reverse
+from django.utils.html import format_html
+
+from ..models import ExportJob
+
+logger = logging.getLogger(__name__)
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'id', 'kind', 'file_format', 'status', 'row_count', 'created_by', 'created_at', 'finished_at',
+        'expires_at', 'download_link'
+    )
+    list_filter = ('status', 'kind', 'file_format')
+    list_select_related = ('created_by',)
+    readonly_fields = (
+        'kind', 'file_format', 'params', 'status', 'row_count', 'attempts', 'message', 'created_by',
+        'created_at', 'started_at', 'heartbeat_at', 'finished_at', 'expires_at'
+    )
+    exclude = ('file',)
+
+    def has_add_permission(self, request):
+        # Отчёты заказываются формами экспорта товаров и заказов
+        return False
+
+    def get_urls(self):
+        urls = super().get_urls()
+        custom_urls = [
+            path('<int:job_id>/download/', self.admin_site.admin_view(self.download_view),
+                 name='shop_exportjob_download'),
+        ]
+        return custom_urls + urls
+
+    def download_link(self, obj):
+        if obj.status != ExportJob.STATUS_DONE or not obj.file:
+            return '—'
+        return format_html('<a href="{}">Скачать</a>', reverse('admin:shop_exportjob_download', args=[obj.id]))
+    download_link.short_description = 'Файл'
+
+    def download_view(self, request, job_id):
+        """Файл отдаётся через админку: медиа-файлы в продакшене не публикуются"""
+        job = get_object_or_404(ExportJob, pk=job_id)
+        if not self.has_view_permission(request, job) or job.status != ExportJob.STATUS_DONE or not job.file:
+            messages.error(request, "Файл отчёта недоступен.")
+            return redirect('admin:shop_exportjob_changelist')
+        filename = f"{job.kind}_export_{job.id}.{job.file_format}"
+        return FileResponse(job.file.open('rb'), as_attachment=True, filename=filename)
+
+    def delete_model(self, request, obj):
+        obj.file.delete(save=False)
+        super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        for job in queryset:
+            if job.file:
+                job.file.delete(save=False)
+        logger.info('Удалено отчётов: %s', len(queryset))
+        super().delete_queryset(request, queryset)
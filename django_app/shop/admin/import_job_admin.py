@@ -0,0 +1,97 @@
+import logging
+from django.contrib import admin, messages
+from django.http import FileResponse, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import path, reverse
+from django.utils.html import format_html
+from django.views.decorators.http import require_POST
+
+from ..import_jobs import job_status, request_cancel
+from ..models import ImportJob
+
+logger = logging.getLogger(__name__)
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'id', 'status', 'file_format', 'mode', 'processed_count', 'created_count', 'updated_count',
+        'error_count', 'created_by', 'created_at', 'finished_at', 'progress_link'
+    )
+    list_filter = ('status', 'file_format', 'mode')
+    list_select_related = ('created_by',)
+    readonly_fields = (
+        'file', 'file_format', 'mode', 'deactivate_missing', 'status', 'processed_count', 'created_count',
+        'updated_count', 'deactivated_count', 'error_count', 'error_report', 'message', 'cancel_requested', 'created_by', 'created_at', 'started_at', 'heartbeat_at', 'finished_at'
+    )
+    actions = ['cancel_selected']
+
+    def has_add_permission(self, request):
+        # Задания создаются страницей импорта товаров
+        return False
+
+    def get_urls(self):
+        urls = super().get_urls()
+        custom_urls = [
+            path('<int:job_id>/progress/', self.admin_site.admin_view(self.progress_view), name='shop_importjob_progress'),
+            path('<int:job_id>/status/', self.admin_site.admin_view(self.status_view), name='shop_importjob_status'),
+            path('<int:job_id>/report/', self.admin_site.admin_view(self.report_view), name='shop_importjob_report'),
+            path('<int:job_id>/cancel/', self.admin_site.admin_view(require_POST(self.cancel_view)),
+                 name='shop_importjob_cancel'),
+        ]
+        return custom_urls + urls
+
+    def progress_link(self, obj):
+        return format_html('<a href="{}">Прогресс</a>', reverse('admin:shop_importjob_progress', args=[obj.id]))
+    progress_link.short_description = 'Прогресс'
+
+    def progress_view(self, request, job_id):
+        job = get_object_or_404(ImportJob, pk=job_id)
+        context = {
+            **self.admin_site.each_context(request),
+            'job': job,
+            'status': job_status(job),
+            'opts': self.model._meta,
+            'title': f'Импорт товаров №{job.id}',
+        }
+        return render(request, 'admin/shop/importjob/progress.html', context)
+
+    def status_view(self, request, job_id):
+        """Лёгкий эндпоинт для опроса страницей прогресса"""
+        return JsonResponse(job_status(get_object_or_404(ImportJob, pk=job_id)))
+
+    def report_view(self, request, job_id):
+        job = get_object_or_404(ImportJob, pk=job_id)
+        if not job.error_report:
+            messages.error(request, "Отчёт об ошибках отсутствует.")
+            return redirect('admin:shop_importjob_progress', job_id=job_id)
+        return FileResponse(job.error_report.open('rb'), as_attachment=True, filename=f"import_{job.id}_errors.csv")
+
+    def cancel_view(self, request, job_id):
+        if request_cancel(ImportJob.objects.filter(pk=job_id)):
+            logger.info('Запрошена отмена импорта №%s', job_id)
+            messages.info(request, "Отмена запрошена: импорт остановится после текущей пачки.")
+        return redirect('admin:shop_importjob_progress', job_id=job_id)
+
+    @staticmethod
+    def delete_files(job):
+        """Загруженный файл и отчёт об ошибках удаляются из хранилища вместе с заданием"""
+        if job.file:
+            job.file.delete(save=False)
+        if job.error_report:
+            job.error_report.delete(save=False)
+
+    def delete_model(self, request, obj):
+        self.delete_files(obj)
+        super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        for job in queryset:
+            self.delete_files(job)
+        logger.info('Удалено импортов: %s', len(queryset))
+        super().delete_queryset(request, queryset)
+
+    def cancel_selected(self, request, queryset):
+        updated = request_cancel(queryset)
+        logger.info('Запрошена отмена импортов: %s', updated)
+        self.message_user(request, f"Отмена запрошена для импортов: {updated}.")
+    cancel_selected.short_description = "Отменить выбранные импорты"
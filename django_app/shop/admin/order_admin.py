@@ -1,8 +1,20 @@
 import logging
+import tempfile
 from django.contrib import admin
 from django.urls import path
-from django.http import HttpResponse, HttpResponseRedirect
-from ..models import Order, OrderItem
+from django import forms
+from django.contrib.admin.helpers import ActionForm
+from django.contrib import messages
+from django.db.models import Q
+from django.http import FileResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.shortcuts import redirect, render
+from django.utils import timezone
+from ..exporters import CONTENT_TYPES, ORDER_FIELDS, STREAM_WRITERS, iter_order_rows, order_queryset
+from ..export_jobs import queue_export
+from ..forms import OrderExportForm
+from .paginator import EstimatedCountPaginator
+from ..models import ExportJob, Order, OrderItem
+from ..services import bulk_update_order_status
 from ..tasks import export_orders_to_excel
 
 logger = logging.getLogger(__name__)
@@ -10,33 +22,82 @@ logger = logging.getLogger(__name__)
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
     extra = 1
+    raw_id_fields = ('product',)  # Без выпадающего списка со всеми товарами
+
+class OrderActionForm(ActionForm):
+    status = forms.ChoiceField(
+        choices=[('', '---------')] + Order.STATUS_CHOICES,
+        required=False,
+        label="Новый статус"
+    )
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'created_at', 'status_display', 'total', 'is_active')
-    search_fields = ('user__username',)
+    list_select_related = ('user',)
+    # Поиск использует индексы: номер заказа и Telegram ID — точное совпадение,
+    # юзернейм — по началу (см. get_search_results и миграцию 0017)
+    search_fields = ('^user__username',)
+    search_help_text = "Номер заказа, Telegram ID или начало юзернейма"
     list_filter = ('status', 'is_active')
+    date_hierarchy = 'created_at'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False  # Без второго COUNT(*) по всей таблице при фильтрации
+    raw_id_fields = ('user',)
     inlines = [OrderItemInline]
-    actions = ['soft_delete_selected', 'hard_delete_selected', 'export_to_excel']
+    action_form = OrderActionForm
+    actions = ['change_status_selected', 'soft_delete_selected', 'hard_delete_selected', 'export_to_excel']
     delete_selected = None  # Отключаем стандартное действие
 
     def status_display(self, obj):
         return obj.get_status_display()
     status_display.short_description = "Статус"
+    status_display.admin_order_field = 'status'
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if term.isdigit() and len(term) <= 18:
+            number = int(term)
+            return queryset.filter(Q(id=number) | Q(user__telegram_id=number)), False
+        return super().get_search_results(request, queryset, search_term)
+
+    def change_status_selected(self, request, queryset):
+        new_status = request.POST.get('status')
+        if not new_status:
+            self.message_user(request, "Выберите новый статус в поле рядом с действием.", level='warning')
+            return None
+        result = bulk_update_order_status(queryset, new_status)
+        self.message_user(
+            request,
+            f"Статус изменён у {result.changed} заказов. "
+            f"Уведомлений добавлено в очередь: {result.queued}, всего ожидают отправки: {result.pending}."
+        )
+        return None
+    change_status_selected.short_description = "Изменить статус выбранных заказов"
 
     def export_to_excel(self, request, queryset):
-        file_path = export_orders_to_excel(queryset=queryset)
-        if file_path:
-            with open(file_path, 'rb') as excel_file:
-                response = HttpResponse(
-                    excel_file.read(),
-                    content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-                )
-                response['Content-Disposition'] = 'attachment; filename="orders_export.xlsx"'
-                return response
-        else:
+        try:
+            return self.excel_response(queryset)
+        except Exception as e:
+            logger.error("Ошибка при экспорте заказов в Excel: %s", e, exc_info=True)
             self.message_user(request, "Ошибка при экспорте заказов.", level='error')
             return HttpResponseRedirect(request.META.get('HTTP_REFERER', '/admin/shop/order/'))
+    export_to_excel.short_description = "Экспортировать выбранные заказы в Excel"
+
+    def excel_response(self, queryset):
+        """Книга пишется во временный файл запроса и отдаётся с диска частями"""
+        file = tempfile.TemporaryFile()
+        try:
+            export_orders_to_excel(file, queryset=queryset)
+        except Exception:
+            file.close()
+            raise
+        file.seek(0)
+        filename = f"orders_export_{timezone.localtime():%Y%m%d_%H%M}.xlsx"
+        return FileResponse(
+            file, as_attachment=True, filename=filename,
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        )
 
     def get_urls(self):
         urls = super().get_urls()
@@ -50,18 +111,30 @@ class OrderAdmin(admin.ModelAdmin):
         return custom_urls + urls
 
     def export_excel_view(self, request):
-        file_path = export_orders_to_excel()
-        if file_path:
-            with open(file_path, 'rb') as excel_file:
-                response = HttpResponse(
-                    excel_file.read(),
-                    content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-                )
-                response['Content-Disposition'] = 'attachment; filename="orders_export.xlsx"'
-                return response
-        else:
-            self.message_user(request, "Ошибка при экспорте заказов.", level='error')
-            return HttpResponseRedirect(request.META.get('HTTP_REFERER', '/admin/shop/order/'))
+        form = OrderExportForm(request.POST or None)
+        if request.method == 'POST' and form.is_valid():
+            file_format = form.cleaned_data['file_format']
+            params = form.export_params()
+            if form.cleaned_data['background']:
+                job = queue_export(ExportJob.KIND_ORDERS, file_format, params, request.user)
+                messages.info(request, f"Отчёт №{job.id} формируется в фоне; скачать его можно в разделе «Экспорты».")
+                return redirect('admin:shop_exportjob_changelist')
+            queryset = order_queryset(params)
+            if file_format == 'xlsx':
+                return self.export_to_excel(request, queryset)
+            response = StreamingHttpResponse(
+                STREAM_WRITERS[file_format](iter_order_rows(queryset), list(ORDER_FIELDS)),
+                content_type=CONTENT_TYPES[file_format]
+            )
+            response['Content-Disposition'] = f'attachment; filename="orders_export.{file_format}"'
+            return response
+        context = {
+            **self.admin_site.each_context(request),
+            'form': form,
+            'opts': self.model._meta,
+            'title': 'Экспорт заказов',
+        }
+        return render(request, 'admin/shop/order/export_orders.html', context)
 
     def save_model(self, request, obj, form, change):
         if change:
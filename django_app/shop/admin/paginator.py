@@ -0,0 +1,33 @@
+# django_app/shop/admin/paginator.py
+import json
+import logging
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+logger = logging.getLogger(__name__)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор для больших таблиц: число строк берётся из оценки планировщика
+    PostgreSQL (EXPLAIN) вместо точного COUNT(*), который на миллионах строк
+    читает всю таблицу. Небольшие выборки по-прежнему считаются точно.
+    """
+    exact_count_threshold = 10000  # Ниже этой оценки выполняется обычный COUNT(*)
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if connections[getattr(queryset, 'db', 'default')].vendor != 'postgresql':
+            return super().count
+        try:
+            plan = json.loads(queryset.order_by().explain(format='json'))
+            estimate = int(plan[0]['Plan']['Plan Rows'])
+        except Exception as e:
+            logger.warning("Не удалось оценить число строк: %s", e)
+            return super().count
+        if estimate < self.exact_count_threshold:
+            return super().count
+        return estimate
@@ -0,0 +1,201 @@
+# django_app/shop/broadcast.py
+import asyncio
+import logging
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Broadcast, TelegramUser
+from .sender import TelegramSender
+
+logger = logging.getLogger(__name__)
+
+
+@sync_to_async
+def _get_status(broadcast_id):
+    return Broadcast.objects.filter(pk=broadcast_id).values_list('status', flat=True).first()
+
+
+@sync_to_async
+def _get_last_user_id(broadcast_id):
+    return Broadcast.objects.filter(pk=broadcast_id).values_list('last_user_id', flat=True).first()
+
+
+@sync_to_async
+def _claim(broadcast_id):
+    """
+    Захватывает рассылку одним условным UPDATE и возвращает отметку владельца.
+
+    Рассылка переводится в «Выполняется», только если она в очереди или выполнялась
+    и никем не удерживается: отметки нет (обработчик её снял) или она старше
+    JOB_STALE_TIMEOUT (обработчик упал). Пауза, поставленная до запуска, не
+    перезаписывается, а второй обработчик не запускает ту же рассылку параллельно.
+    None — рассылку выполняет другой процесс или её статус изменён.
+    """
+    now = timezone.now()
+    threshold = now - timedelta(seconds=settings.JOB_STALE_TIMEOUT)
+    claimed = Broadcast.objects.filter(
+        Q(heartbeat_at__isnull=True) | Q(heartbeat_at__lt=threshold),
+        pk=broadcast_id, status__in=[Broadcast.STATUS_QUEUED, Broadcast.STATUS_RUNNING],
+    ).update(status=Broadcast.STATUS_RUNNING, heartbeat_at=now)
+    if not claimed:
+        return None
+    Broadcast.objects.filter(pk=broadcast_id, started_at__isnull=True).update(started_at=now)
+    return now
+
+
+@sync_to_async
+def _renew(broadcast_id, lease):
+    """Продлевает захват; None, если рассылку перехватил другой обработчик"""
+    now = timezone.now()
+    renewed = Broadcast.objects.filter(pk=broadcast_id, heartbeat_at=lease).update(heartbeat_at=now)
+    return now if renewed else None
+
+
+@sync_to_async
+def _release(broadcast_id, lease):
+    """Снимает захват, чтобы продолженную рассылку сразу подхватил следующий запуск"""
+    Broadcast.objects.filter(pk=broadcast_id, heartbeat_at=lease).update(heartbeat_at=None)
+
+
+@sync_to_async
+def _finish(broadcast_id, lease):
+    Broadcast.objects.filter(pk=broadcast_id, status=Broadcast.STATUS_RUNNING, heartbeat_at=lease).update(
+        status=Broadcast.STATUS_DONE, finished_at=timezone.now(), heartbeat_at=None
+    )
+
+
+@sync_to_async
+def _next_recipients(after_id, limit):
+    """Следующая порция получателей (keyset-пагинация по id, без OFFSET)."""
+    return list(
+        TelegramUser.objects.filter(is_active=True, id__gt=after_id)
+        .order_by('id')
+        .values_list('id', 'telegram_id')[:limit]
+    )
+
+
+@sync_to_async
+def _checkpoint(broadcast_id, last_user_id, sent, failed, blocked_ids):
+    """Сохраняет прогресс порции и отключает заблокировавших бота пользователей."""
+    with transaction.atomic():
+        if blocked_ids:
+            TelegramUser.objects.filter(id__in=blocked_ids).update(is_active=False)
+        Broadcast.objects.filter(pk=broadcast_id).update(
+            last_user_id=last_user_id,
+            sent_count=F('sent_count') + sent,
+            failed_count=F('failed_count') + failed,
+            blocked_count=F('blocked_count') + len(blocked_ids),
+        )
+
+
+class BroadcastRunner:
+    """
+    Выполняет рассылку с контрольными точками.
+
+    Получатели читаются порциями по возрастанию id, после каждой порции
+    в Broadcast.last_user_id сохраняется прогресс, поэтому после перезапуска
+    рассылка продолжается с места остановки. В памяти держится только одна порция.
+    Пока рассылка выполняется, обработчик продлевает захват (heartbeat_at), поэтому
+    второй процесс не запускает её параллельно, а после падения обработчика её
+    продолжит следующий запуск.
+    """
+
+    def __init__(self, broadcast, chunk_size=None):
+        self.broadcast = broadcast
+        self.chunk_size = chunk_size or settings.BROADCAST_CHUNK_SIZE
+        self.lease = None
+
+    async def keep_lease(self, stopped):
+        """Продлевает захват рассылки, пока не установлено событие stopped"""
+        while self.lease is not None:
+            try:
+                await asyncio.wait_for(stopped.wait(), settings.JOB_HEARTBEAT_INTERVAL)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                self.lease = await _renew(self.broadcast.id, self.lease)
+            except Exception as e:
+                logger.warning(f"Рассылка №{self.broadcast.id}: не удалось продлить захват: {e}")
+                continue
+            if self.lease is None:
+                logger.warning(f"Рассылка №{self.broadcast.id} перехвачена другим обработчиком")
+
+    async def send_chunk(self, sender, recipients):
+        """
+        Отправляет порцию; получатели с ответом 429 отправляются повторно, поэтому
+        контрольная точка не переходит через тех, кому сообщение ещё не ушло.
+        """
+        results = [None] * len(recipients)
+        pending = list(range(len(recipients)))
+        while pending:
+            sent = await sender.send_many((recipients[i][1], self.broadcast.text) for i in pending)
+            for i, result in zip(pending, sent):
+                results[i] = result
+            pending = [i for i in pending if results[i].throttled]
+            if pending:
+                logger.warning(f"Рассылка №{self.broadcast.id}: повтор для {len(pending)} получателей после 429")
+        return results
+
+    async def run(self):
+        """Выполняет рассылку до конца или до постановки на паузу."""
+        broadcast = self.broadcast
+        self.lease = await _claim(broadcast.id)
+        if self.lease is None:
+            logger.info(f"Рассылка №{broadcast.id} не запущена: выполняется другим обработчиком или статус изменён")
+            return False
+        # После захвата: прогресс мог сохранить предыдущий обработчик
+        last_user_id = await _get_last_user_id(broadcast.id)
+        logger.info(f"Запуск рассылки №{broadcast.id} с пользователя id>{last_user_id}")
+
+        stopped = asyncio.Event()
+        lease_task = asyncio.create_task(self.keep_lease(stopped))
+        finished = False
+        try:
+            finished = await self.send_all(last_user_id)
+        finally:
+            # Продление дожидается завершения, чтобы отметка в базе совпадала с self.lease
+            stopped.set()
+            await lease_task
+            lease, self.lease = self.lease, None
+            if lease is not None and finished:
+                await _finish(broadcast.id, lease)
+            elif lease is not None:
+                await _release(broadcast.id, lease)
+        if finished and lease is not None:
+            logger.info(f"Рассылка №{broadcast.id} завершена")
+            return True
+        return False
+
+    async def send_all(self, last_user_id):
+        """Отправка порциями до конца списка (True), паузы или потери захвата (False)"""
+        broadcast = self.broadcast
+        async with TelegramSender() as sender:
+            while True:
+                if self.lease is None:
+                    return False
+                if await _get_status(broadcast.id) != Broadcast.STATUS_RUNNING:
+                    logger.info(f"Рассылка №{broadcast.id} приостановлена на id={last_user_id}")
+                    return False
+
+                recipients = await _next_recipients(last_user_id, self.chunk_size)
+                if not recipients:
+                    return True
+
+                results = await self.send_chunk(sender, recipients)
+                blocked_ids = [
+                    user_id for (user_id, _), result in zip(recipients, results) if result.blocked
+                ]
+                sent = sum(1 for result in results if result.ok)
+                failed = len(results) - sent - len(blocked_ids)
+                last_user_id = recipients[-1][0]
+                await _checkpoint(broadcast.id, last_user_id, sent, failed, blocked_ids)
+                logger.debug(
+                    f"Рассылка №{broadcast.id}: порция до id={last_user_id}, "
+                    f"отправлено {sent}, ошибок {failed}, заблокировали {len(blocked_ids)}"
+                )
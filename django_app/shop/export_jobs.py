@@ -0,0 +1,77 @@
+# django_app/shop/export_jobs.py
+"""
+Фоновое формирование отчётов (ExportJob).
+
+Админка сохраняет вид отчёта, формат и фильтры; файл строит команда
+run_export_jobs во временном файле и сохраняет в хранилище под уникальным
+именем. Готовый файл хранится EXPORT_RETENTION_HOURS часов, после чего
+cleanup_expired_exports удаляет его, а задание помечается как просроченное.
+"""
+import logging
+import secrets
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+
+from .exporters import write_report
+from .models import ExportJob
+
+logger = logging.getLogger(__name__)
+
+
+def queue_export(kind: str, file_format: str, params: dict, user=None) -> ExportJob:
+    """Ставит отчёт в очередь"""
+    job = ExportJob.objects.create(kind=kind, file_format=file_format, params=params, created_by=user)
+    logger.info("Отчёт №%s (%s, %s) поставлен в очередь", job.id, kind, file_format)
+    return job
+
+
+def run_job(job: ExportJob) -> ExportJob:
+    """Формирует файл отчёта и сохраняет его в хранилище"""
+    logger.info("Формирование отчёта №%s (%s, %s)", job.id, job.kind, job.file_format)
+    result = {}
+    try:
+        with tempfile.TemporaryFile() as file:
+            row_count = write_report(job.kind, job.params, job.file_format, file)
+            file.seek(0)
+            # Случайная часть имени: файл нельзя найти перебором, параллельные отчёты не пересекаются
+            name = f"{job.kind}_{timezone.localtime():%Y%m%d_%H%M%S}_{secrets.token_hex(8)}.{job.file_format}"
+            job.file.save(name, File(file), save=False)
+        result.update(
+            status=ExportJob.STATUS_DONE, row_count=row_count, file=job.file.name,
+            expires_at=timezone.now() + timedelta(hours=settings.EXPORT_RETENTION_HOURS),
+        )
+    except Exception as e:
+        logger.exception("Ошибка формирования отчёта №%s", job.id)
+        result.update(status=ExportJob.STATUS_FAILED, message=str(e))
+    # Только поля результата и только пока задание числится за этим обработчиком:
+    # если recover_stale_jobs вернул его в очередь, отчёт сформирует другой обработчик
+    finished = ExportJob.objects.filter(pk=job.pk, status=ExportJob.STATUS_RUNNING).update(
+        finished_at=timezone.now(), **result
+    )
+    if not finished:
+        if job.file:
+            job.file.delete(save=False)
+        logger.warning("Отчёт №%s: задание уже не выполняется этим обработчиком, результат не сохранён", job.id)
+    job.refresh_from_db()
+    logger.info("Отчёт №%s: %s, строк %s", job.id, job.get_status_display(), job.row_count)
+    return job
+
+
+def cleanup_expired_exports(now=None) -> int:
+    """Удаляет файлы отчётов с истёкшим сроком хранения"""
+    now = now or timezone.now()
+    expired = ExportJob.objects.filter(status=ExportJob.STATUS_DONE, expires_at__lte=now)
+    count = 0
+    for job in expired.iterator():
+        if job.file:
+            job.file.delete(save=False)
+        job.status = ExportJob.STATUS_EXPIRED
+        job.save(update_fields=['file', 'status'])
+        count += 1
+    if count:
+        logger.info("Удалено просроченных отчётов: %s", count)
+    return count
@@ -0,0 +1,224 @@
+# django_app/shop/exporters.py
+"""
+Потоковый экспорт товаров и заказов.
+
+Товары читаются курсором (.iterator) пачками по PRODUCT_EXPORT_CHUNK_SIZE, пути
+категорий берутся из словаря, построенного одним запросом, поэтому число
+запросов не зависит от размера каталога. CSV и JSON отдаются частями через
+StreamingHttpResponse, XLSX пишется openpyxl в режиме write_only во временный файл.
+
+Заказы читаются так же курсором, пользователь подгружается select_related, а
+позиции с товарами — prefetch_related на каждую пачку курсора.
+
+Отчёт описывается видом (products/orders) и параметрами-фильтрами в JSON, поэтому
+его одинаково строят запрос админки и фоновая задача (ExportJob).
+"""
+import csv
+import json
+import logging
+import os
+from io import TextIOWrapper
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from .models import ExportJob, Order, OrderItem, Product
+from .services import category_paths
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "json": "application/json",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+# Поле экспорта -> значение из товара и словаря путей категорий
+PRODUCT_FIELDS: Dict[str, Callable[[Product, Dict[int, str]], object]] = {
+    "id": lambda product, paths: product.id,
+    "sku": lambda product, paths: product.sku or "",
+    "name": lambda product, paths: product.name,
+    "description": lambda product, paths: product.description,
+    "price": lambda product, paths: float(product.price),
+    "category_path": lambda product, paths: paths.get(product.category_id, ""),
+    "photo_filename": lambda product, paths: os.path.basename(product.photo.name) if product.photo else "",
+    "is_active": lambda product, paths: product.is_active,
+    "created_at": lambda product, paths: product.created_at.isoformat(),
+}
+
+
+def product_queryset(params: dict):
+    """Товары отчёта по параметрам ProductExportForm.export_params()"""
+    queryset = Product.objects.all()
+    if params.get("ids"):
+        return queryset.filter(id__in=params["ids"])
+    if params.get("category"):
+        queryset = queryset.filter(category_id=params["category"])
+    if params.get("is_active"):
+        queryset = queryset.filter(is_active=(params["is_active"] == "1"))
+    if params.get("date_from"):
+        queryset = queryset.filter(created_at__date__gte=params["date_from"])
+    if params.get("date_to"):
+        queryset = queryset.filter(created_at__date__lte=params["date_to"])
+    return queryset
+
+
+def iter_product_rows(queryset, fields: List[str]) -> Iterator[dict]:
+    """Строки экспорта без загрузки всей выборки в память"""
+    paths = category_paths() if "category_path" in fields else {}
+    chunk_size = settings.PRODUCT_EXPORT_CHUNK_SIZE
+    for product in queryset.order_by("id").iterator(chunk_size=chunk_size):
+        yield {field: PRODUCT_FIELDS[field](product, paths) for field in fields}
+
+
+# Поле экспорта заказов -> заголовок столбца
+ORDER_FIELDS = {
+    "id": "ID заказа",
+    "created_at": "Дата создания",
+    "user": "Пользователь",
+    "address": "Адрес доставки",
+    "phone": "Телефон",
+    "wishes": "Пожелания",
+    "desired_delivery_time": "Желаемое время доставки",
+    "status": "Статус",
+    "total": "Итого",
+    "items": "Товары",
+}
+
+
+def order_queryset(params: dict):
+    """Заказы отчёта по параметрам OrderExportForm.export_params()"""
+    queryset = Order.objects.all()
+    if params.get("ids"):
+        return queryset.filter(id__in=params["ids"])
+    if params.get("status"):
+        queryset = queryset.filter(status__in=params["status"])
+    if params.get("is_active"):
+        queryset = queryset.filter(is_active=(params["is_active"] == "1"))
+    if params.get("date_from"):
+        queryset = queryset.filter(created_at__date__gte=params["date_from"])
+    if params.get("date_to"):
+        queryset = queryset.filter(created_at__date__lte=params["date_to"])
+    return queryset
+
+
+def iter_order_rows(queryset) -> Iterator[dict]:
+    """Строки экспорта заказов: три запроса на пачку курсора независимо от числа позиций"""
+    items = OrderItem.objects.filter(is_active=True).select_related("product").only(
+        "id", "order_id", "quantity", "product__name"
+    )
+    orders = (
+        queryset.select_related("user")
+        .prefetch_related(Prefetch("items", queryset=items))
+        .order_by("id")
+        .iterator(chunk_size=settings.ORDER_EXPORT_CHUNK_SIZE)
+    )
+    for order in orders:
+        items_list = [f"{item.product.name} x {item.quantity}" for item in order.items.all()]
+        yield {
+            "id": order.id,
+            "created_at": timezone.localtime(order.created_at).strftime("%Y-%m-%d %H:%M"),
+            "user": order.user.username or f"User {order.user.telegram_id}",
+            "address": order.address,
+            "phone": order.phone or "-",
+            "wishes": order.wishes or "-",
+            "desired_delivery_time": order.desired_delivery_time or "-",
+            "status": order.get_status_display(),
+            "total": float(order.total),
+            "items": ", ".join(items_list) if items_list else "Нет товаров",
+        }
+
+
+# --- Форматы ---
+
+class _Echo:
+    """Псевдофайл для csv.writer: возвращает строку вместо записи"""
+
+    def write(self, value):
+        return value
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Тип {type(value).__name__} не сериализуется в JSON")
+
+
+def csv_chunks(rows: Iterable[dict], fields: List[str]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([row.get(field, "") for field in fields])
+
+
+def json_chunks(rows: Iterable[dict], fields: List[str]) -> Iterator[str]:
+    yield "["
+    separator = "\n"
+    for row in rows:
+        yield separator + json.dumps(row, ensure_ascii=False, default=_json_default)
+        separator = ",\n"
+    yield "\n]\n"
+
+
+def write_xlsx(rows: Iterable[dict], fields: List[str], file,
+               headers: Optional[List[str]] = None, title: Optional[str] = None) -> None:
+    """XLSX в файловый объект; в режиме write_only строки не копятся в памяти"""
+    import openpyxl
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(title)
+    sheet.append(headers or fields)
+    for row in rows:
+        sheet.append([row.get(field, "") for field in fields])
+    workbook.save(file)
+
+
+STREAM_WRITERS: Dict[str, Callable[[Iterable[dict], List[str]], Iterator[str]]] = {
+    "csv": csv_chunks,
+    "json": json_chunks,
+}
+
+
+# --- Отчёты ---
+
+def report_rows(kind: str, params: dict) -> Tuple[List[str], List[str], Iterator[dict]]:
+    """Поля, заголовки столбцов и строки отчёта"""
+    if kind == ExportJob.KIND_PRODUCTS:
+        fields = list(params.get("fields") or PRODUCT_FIELDS)
+        return fields, fields, iter_product_rows(product_queryset(params), fields)
+    if kind == ExportJob.KIND_ORDERS:
+        return list(ORDER_FIELDS), list(ORDER_FIELDS.values()), iter_order_rows(order_queryset(params))
+    raise ValueError(f"Неизвестный отчёт: {kind}")
+
+
+def write_report(kind: str, params: dict, file_format: str, file) -> int:
+    """Записывает отчёт в двоичный файловый объект; возвращает число строк"""
+    fields, headers, rows = report_rows(kind, params)
+    count = 0
+
+    def counted():
+        nonlocal count
+        for row in rows:
+            count += 1
+            yield row
+
+    if file_format == "xlsx":
+        write_xlsx(counted(), fields, file, headers=headers, title=dict(ExportJob.KIND_CHOICES)[kind])
+    elif file_format in STREAM_WRITERS:
+        stream = TextIOWrapper(file, encoding="utf-8", newline="")
+        try:
+            for chunk in STREAM_WRITERS[file_format](counted(), fields):
+                stream.write(chunk)
+            stream.flush()
+        finally:
+            stream.detach()
+    else:
+        raise ValueError(f"Неизвестный формат файла: {file_format}")
+    return count
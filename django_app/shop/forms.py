@@ -1,6 +1,6 @@
 # django_app/shop/forms.py
 from django import forms
-from .models import Category
+from .models import Category, Order
 
 class ProductImportForm(forms.Form):
     file = forms.FileField(label="Выберите файл для импорта")
@@ -26,6 +26,7 @@ class ProductExportForm(forms.Form):
         label="Поля для экспорта",
         choices=[
             ('id', 'ID'),
+            ('sku', 'Артикул'),
             ('name', 'Название'),
             ('description', 'Описание'),
             ('price', 'Цена'),
@@ -35,7 +36,7 @@ class ProductExportForm(forms.Form):
             ('created_at', 'Дата создания'),
         ],
         widget=forms.CheckboxSelectMultiple,
-        initial=['id', 'name', 'description', 'price', 'category_path', 'photo_filename', 'is_active']
+        initial=['id', 'sku', 'name', 'description', 'price', 'category_path', 'photo_filename', 'is_active']
     )
     category = forms.ModelChoiceField(
         label="Категория (опционально)",
@@ -61,3 +62,80 @@ class ProductExportForm(forms.Form):
         required=False,
         widget=forms.DateInput(attrs={'type': 'date'})
     )
+    background = forms.BooleanField(
+        label="Сформировать в фоне",
+        help_text="Файл появится в разделе «Экспорты»; подходит для больших выгрузок.",
+        required=False
+    )
+
+    def export_params(self, ids=None):
+        """Параметры отчёта в JSON-совместимом виде (см. exporters.product_queryset)"""
+        data = self.cleaned_data
+        return {
+            'ids': [int(pk) for pk in ids or []],
+            'fields': list(data['fields']),
+            'category': data['category'].id if data['category'] else None,
+            'is_active': data['is_active'],
+            'date_from': data['date_from'].isoformat() if data['date_from'] else None,
+            'date_to': data['date_to'].isoformat() if data['date_to'] else None,
+        }
+
+class OrderExportForm(forms.Form):
+    file_format = forms.ChoiceField(
+        label="Формат файла",
+        choices=[
+            ('xlsx', 'Excel (XLSX)'),
+            ('csv', 'CSV'),
+            ('json', 'JSON'),
+        ]
+    )
+    status = forms.MultipleChoiceField(
+        label="Статусы (опционально)",
+        choices=Order.STATUS_CHOICES,
+        widget=forms.CheckboxSelectMultiple,
+        required=False
+    )
+    is_active = forms.ChoiceField(
+        label="Активность",
+        choices=[
+            ('1', 'Активные'),
+            ('0', 'Удалённые'),
+            ('', 'Все'),
+        ],
+        initial='1',
+        required=False
+    )
+    date_from = forms.DateField(
+        label="Дата создания (с)",
+        required=False,
+        widget=forms.DateInput(attrs={'type': 'date'})
+    )
+    date_to = forms.DateField(
+        label="Дата создания (по)",
+        required=False,
+        widget=forms.DateInput(attrs={'type': 'date'})
+    )
+
+    background = forms.BooleanField(
+        label="Сформировать в фоне",
+        help_text="Файл появится в разделе «Экспорты»; подходит для больших выгрузок.",
+        initial=True,
+        required=False
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from, date_to = cleaned_data.get('date_from'), cleaned_data.get('date_to')
+        if date_from and date_to and date_from > date_to:
+            raise forms.ValidationError("Дата начала позже даты окончания.")
+        return cleaned_data
+
+    def export_params(self):
+        """Параметры отчёта в JSON-совместимом виде (см. exporters.order_queryset)"""
+        data = self.cleaned_data
+        return {
+            'status': list(data['status']),
+            'is_active': data['is_active'],
+            'date_from': data['date_from'].isoformat() if data['date_from'] else None,
+            'date_to': data['date_to'].isoformat() if data['date_to'] else None,
+        }
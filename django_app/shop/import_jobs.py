@@ -0,0 +1,117 @@
+# django_app/shop/import_jobs.py
+"""
+Выполнение фоновых импортов товаров (ImportJob).
+
+Админка только сохраняет файл и создаёт задание; импорт выполняет команда
+run_import_jobs. После каждой пачки в задание записываются счётчики и
+проверяется запрос отмены. Все ошибки строк пишутся в CSV-отчёт, который
+прикрепляется к заданию.
+"""
+import csv
+import logging
+import os
+import tempfile
+from contextlib import closing
+
+from django.core.files import File
+from django.urls import reverse
+from django.utils import timezone
+
+from .importers import READERS, ImportResult, ProductImporter
+from .models import ImportJob
+
+logger = logging.getLogger(__name__)
+
+
+class ImportCancelled(Exception):
+    """Отмена импорта по запросу из админки"""
+
+
+def request_cancel(queryset):
+    """Отмена заданий: из очереди снимаются сразу, выполняющиеся — после текущей пачки."""
+    cancelled = queryset.filter(status=ImportJob.STATUS_QUEUED).update(
+        status=ImportJob.STATUS_CANCELLED, cancel_requested=True, finished_at=timezone.now()
+    )
+    requested = queryset.filter(status=ImportJob.STATUS_RUNNING).update(cancel_requested=True)
+    return cancelled + requested
+
+
+def _save_progress(job_id, result: ImportResult):
+    ImportJob.objects.filter(pk=job_id).update(
+        processed_count=result.processed,
+        created_count=result.created,
+        updated_count=result.updated,
+        error_count=result.error_count,
+    )
+    if ImportJob.objects.filter(pk=job_id, cancel_requested=True).exists():
+        raise ImportCancelled()
+
+
+def run_job(job: ImportJob) -> ImportJob:
+    """Выполняет задание до конца, отмены или ошибки чтения файла."""
+    logger.info("Запуск импорта №%s (%s, %s)", job.id, job.file_format, job.file.name)
+    status, message = ImportJob.STATUS_DONE, ""
+    with tempfile.TemporaryFile(mode="w+", encoding="utf-8-sig", newline="") as report_file:
+        report = csv.writer(report_file)
+        report.writerow(["row", "error"])
+        importer = ProductImporter(report=report, mode=job.mode, deactivate_missing=job.deactivate_missing)
+        try:
+            reader = READERS.get(job.file_format)
+            if reader is None:
+                raise ValueError(f"Неподдерживаемый формат файла: {job.file_format}")
+            # closing: генератор чтения завершается до закрытия файла, даже при отмене
+            with job.file.open("rb") as source, closing(reader(source)) as rows:
+                importer.run(rows, on_batch=lambda result: _save_progress(job.id, result))
+        except ImportCancelled:
+            status, message = ImportJob.STATUS_CANCELLED, "Отменён; уже записанные пачки сохранены."
+        except Exception as e:
+            logger.exception("Ошибка импорта №%s", job.id)
+            status, message = ImportJob.STATUS_FAILED, str(e)
+
+        result = importer.result
+        if result.error_count:
+            report_file.seek(0)
+            name = f"{os.path.splitext(os.path.basename(job.file.name))[0]}_errors.csv"
+            job.error_report.save(name, File(report_file), save=False)
+    # Только поля результата и только пока задание числится за этим обработчиком: save()
+    # целиком сбросил бы cancel_requested и статус, выставленный recover_stale_jobs
+    finished = ImportJob.objects.filter(pk=job.pk, status=ImportJob.STATUS_RUNNING).update(
+        processed_count=result.processed,
+        created_count=result.created,
+        updated_count=result.updated,
+        deactivated_count=result.deactivated,
+        error_count=result.error_count,
+        error_report=job.error_report.name or "",
+        status=status,
+        message=message,
+        finished_at=timezone.now(),
+    )
+    if not finished:
+        if job.error_report:
+            job.error_report.delete(save=False)
+        logger.warning("Импорт №%s: задание уже не выполняется этим обработчиком, результат не сохранён", job.id)
+    job.refresh_from_db()
+    logger.info(
+        "Импорт №%s: %s, обработано %s, создано %s, обновлено %s, деактивировано %s, ошибок %s",
+        job.id, job.get_status_display(), job.processed_count, job.created_count, job.updated_count,
+        job.deactivated_count, job.error_count)
+    return job
+
+
+def job_status(job: ImportJob) -> dict:
+    """Состояние задания для страницы прогресса"""
+    return {
+        'id': job.id,
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'finished': job.is_finished,
+        'processed': job.processed_count,
+        'created': job.created_count,
+        'updated': job.updated_count,
+        'deactivated': job.deactivated_count,
+        'errors': job.error_count,
+        'message': job.message,
+        'cancel_requested': job.cancel_requested,
+        # Медиа-файлы в продакшене не публикуются: отчёт отдаётся через админку
+        'error_report': reverse('admin:shop_importjob_report', args=[job.id]) if job.error_report else None,
+    }
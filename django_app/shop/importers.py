@@ -0,0 +1,420 @@
+# django_app/shop/importers.py
+"""
+Потоковый импорт товаров.
+
+Файл читается построчно (CSV — csv.DictReader поверх потока, XLSX — openpyxl
+в режиме read_only, JSON — ijson), товары
+создаются bulk_create пачками по PRODUCT_IMPORT_BATCH_SIZE, каждая пачка — в своей
+транзакции. В памяти одновременно находится только текущая пачка, поэтому
+память не зависит от размера файла.
+
+В режиме upsert строки сопоставляются с товарами по артикулу (sku): для пачки
+существующие товары загружаются одним запросом IN, новые создаются bulk_create,
+а у изменившихся bulk_update записывает только изменившиеся поля. Неизменённые
+товары не трогаются, поэтому повторный импорт того же прайса почти не пишет в БД.
+
+Категории загружаются один раз в словарь «путь -> id». Недостающие пути
+создаются при записи пачки по одному INSERT на уровень вложенности без пересчёта
+MPTT на каждую вставку; затронутые деревья перестраиваются partial_rebuild в той же
+транзакции, поэтому после коммита каждой пачки дерево корректно.
+"""
+import csv
+import logging
+import os
+from dataclasses import dataclass, field
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from io import TextIOWrapper
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Max
+
+from .models import Category, Product
+from .services import category_paths
+
+logger = logging.getLogger(__name__)
+
+MAX_REPORTED_ERRORS = 1000  # Сколько сообщений об ошибках сохранять (остальные только считаются)
+MODE_CREATE = "create"
+MODE_UPSERT = "upsert"
+# Поля, которые импорт сравнивает и обновляет; необязательные — только если колонка есть в строке
+REQUIRED_FIELDS = ("name", "price", "category_id")
+OPTIONAL_FIELDS = {"description": "description", "is_active": "is_active", "photo_filename": "photo"}
+
+
+class RowError(ValueError):
+    """Ошибка в строке импорта"""
+
+
+# --- Чтение файлов ---
+
+def _binary(file):
+    # UploadedFile оборачивает настоящий файловый объект в .file
+    return getattr(file, "file", file)
+
+
+def iter_csv_rows(file) -> Iterator[dict]:
+    stream = TextIOWrapper(_binary(file), encoding="utf-8-sig", newline="")
+    try:
+        yield from csv.DictReader(stream)
+    finally:
+        stream.detach()
+
+
+def iter_xlsx_rows(file) -> Iterator[dict]:
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(_binary(file), read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = [str(value).strip() if value is not None else "" for value in next(rows, ())]
+        for values in rows:
+            if any(value is not None for value in values):
+                yield dict(zip(headers, values))
+    finally:
+        workbook.close()
+
+
+def iter_json_rows(file) -> Iterator[dict]:
+    import ijson
+
+    yield from ijson.items(_binary(file), "item")
+
+
+READERS: Dict[str, Callable[[object], Iterator[dict]]] = {
+    "csv": iter_csv_rows,
+    "json": iter_json_rows,
+    "xlsx": iter_xlsx_rows,
+}
+
+
+# --- Импорт ---
+
+def parse_bool(value, default: bool = True) -> bool:
+    if value is None or value == "":
+        return default
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "да", "+")
+    return bool(value)
+
+
+def parse_price(value) -> Decimal:
+    if value is None or value == "":
+        raise RowError("Поле 'price' обязательно.")
+    try:
+        price = Decimal(str(value).strip().replace(",", "."))
+    except InvalidOperation:
+        raise RowError(f"Некорректная цена '{value}'.")
+    if not price.is_finite():
+        raise RowError(f"Некорректная цена '{value}'.")
+    if price < 0:
+        raise RowError("Цена не может быть отрицательной.")
+    price_field = Product._meta.get_field("price")
+    if price.adjusted() >= price_field.max_digits - price_field.decimal_places:
+        raise RowError(f"Цена '{value}' слишком большая.")
+    # Лишние знаки после запятой округляются, как при записи в столбец numeric
+    return price.quantize(Decimal(1).scaleb(-price_field.decimal_places), rounding=ROUND_HALF_UP)
+
+
+@dataclass
+class ImportResult:
+    processed: int = 0
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deactivated: int = 0
+    error_count: int = 0
+    errors: List[str] = field(default_factory=list)
+    report: Optional[Any] = field(default=None, repr=False)  # csv.writer для полного отчёта об ошибках
+
+    def add_error(self, row_number: int, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"Запись {row_number}: {message}")
+        if self.report is not None:
+            self.report.writerow([row_number, message])
+
+
+class ImportRow(NamedTuple):
+    number: int
+    product: Product
+    fields: Tuple[str, ...]  # Поля модели, заданные в строке файла
+    category_path: str
+
+
+class ProductImporter:
+    """Импорт товаров из потока строк пачками фиксированного размера"""
+
+    def __init__(self, batch_size: Optional[int] = None, report=None,
+                 mode: str = MODE_CREATE, deactivate_missing: bool = False):
+        if mode not in (MODE_CREATE, MODE_UPSERT):
+            raise ValueError(f"Неизвестный режим импорта: {mode}")
+        self.batch_size = batch_size or settings.PRODUCT_IMPORT_BATCH_SIZE
+        self.mode = mode
+        self.deactivate_missing = deactivate_missing and mode == MODE_UPSERT
+        self.seen_skus: Set[str] = set()
+        self.category_ids: Dict[str, int] = {}
+        self.category_names: Set[str] = set()
+        self.category_trees: Dict[int, int] = {}  # id категории -> tree_id
+        self.categories_loaded = False
+        self.pending_categories: Set[str] = set()
+        self.categories_created = 0
+        self.photo_cache: Dict[str, bool] = {}
+        self.result = ImportResult(report=report)
+
+    def load_categories(self) -> None:
+        """Все существующие категории одним запросом: путь -> id"""
+        rows = list(Category.objects.values_list("id", "name", "parent_id", "tree_id"))
+        nodes = {category_id: (name, parent_id) for category_id, name, parent_id, _ in rows}
+        self.category_ids = {path: category_id for category_id, path in category_paths(nodes).items()}
+        self.category_names = {name for name, _ in nodes.values()}
+        self.category_trees = {category_id: tree_id for category_id, _, _, tree_id in rows}
+        self.categories_loaded = True
+
+    def check_category_path(self, category_path: str) -> str:
+        """
+        Нормализованный путь категории. Недостающие категории запоминаются для
+        создания при записи пачки; RowError, если имя уже занято в другом разделе
+        (название категории уникально).
+        """
+        if not self.categories_loaded:
+            self.load_categories()
+        parts = [part.strip() for part in category_path.split("/") if part.strip()]
+        if not parts:
+            raise RowError(f"Некорректный путь категории '{category_path}'.")
+        max_length = Category._meta.get_field("name").max_length
+        for part in parts:
+            if len(part) > max_length:
+                raise RowError(f"Название категории '{part[:50]}…' длиннее {max_length} символов.")
+        missing = [
+            depth for depth in range(1, len(parts) + 1)
+            if "/".join(parts[:depth]) not in self.category_ids
+            and "/".join(parts[:depth]) not in self.pending_categories
+        ]
+        for depth in missing:
+            if parts[depth - 1] in self.category_names:
+                raise RowError(f"Категория '{parts[depth - 1]}' уже существует в другом разделе.")
+        for depth in missing:
+            self.pending_categories.add("/".join(parts[:depth]))
+            self.category_names.add(parts[depth - 1])
+        return "/".join(parts)
+
+    def create_pending_categories(self) -> None:
+        """
+        Создаёт накопленные категории: родители раньше детей, один INSERT на уровень.
+        Вызывается внутри транзакции пачки: затронутые деревья перестраиваются до коммита.
+        """
+        by_depth: Dict[int, List[str]] = {}
+        for path in self.pending_categories:
+            by_depth.setdefault(path.count("/"), []).append(path)
+        touched_trees: Set[int] = set()
+        for depth in sorted(by_depth):
+            paths = by_depth[depth]
+            categories = []
+            if depth:
+                # lft/rght заполняются временными значениями до partial_rebuild ниже
+                for path in paths:
+                    parent_id = self.category_ids[path.rsplit("/", 1)[0]]
+                    tree_id = self.category_trees[parent_id]
+                    touched_trees.add(tree_id)
+                    categories.append(Category(
+                        name=path.rsplit("/", 1)[-1], parent_id=parent_id, is_active=True,
+                        lft=0, rght=0, tree_id=tree_id, level=depth,
+                    ))
+            else:
+                # Новый корень — отдельное дерево из одного узла, уже корректное
+                next_tree_id = (Category.objects.aggregate(Max("tree_id"))["tree_id__max"] or 0) + 1
+                categories = [
+                    Category(name=path, is_active=True, lft=1, rght=2, tree_id=next_tree_id + index, level=0)
+                    for index, path in enumerate(paths)
+                ]
+            Category.objects.bulk_create(categories, batch_size=self.batch_size)
+            for path, category in zip(paths, categories):
+                self.category_ids[path] = category.id
+                self.category_trees[category.id] = category.tree_id
+        for tree_id in touched_trees:
+            Category.objects.partial_rebuild(tree_id)
+        self.categories_created += len(self.pending_categories)
+        self.pending_categories.clear()
+
+    def photo_path(self, filename: str) -> str:
+        photo_path = os.path.join("product_photos", filename)
+        max_length = Product._meta.get_field("photo").max_length
+        if len(photo_path) > max_length:
+            raise RowError(f"Путь фотографии длиннее {max_length} символов.")
+        if photo_path not in self.photo_cache:
+            self.photo_cache[photo_path] = default_storage.exists(photo_path)
+        if not self.photo_cache[photo_path]:
+            raise RowError(f"Файл фотографии '{photo_path}' не найден.")
+        return photo_path
+
+    def build_product(self, row: dict) -> Tuple[Product, Tuple[str, ...], str]:
+        """
+        Товар из строки файла, поля, заданные в строке, и путь категории
+        (category_id заполняется при записи пачки); RowError, если строка некорректна.
+        """
+        sku = str(row.get("sku") or "").strip() or None
+        if self.mode == MODE_UPSERT:
+            if not sku:
+                raise RowError("Поле 'sku' обязательно в режиме обновления.")
+            # Артикул считается присутствующим в файле, даже если в строке есть ошибка
+            self.seen_skus.add(sku)
+        name = str(row.get("name") or "").strip()
+        if not name:
+            raise RowError("Поле 'name' обязательно.")
+        price = parse_price(row.get("price"))
+        category_path = str(row.get("category_path") or "").strip()
+        if not category_path:
+            raise RowError("Поле 'category_path' обязательно.")
+
+        product = Product(
+            sku=sku,
+            name=name,
+            description=row.get("description") or "",
+            price=price,
+            is_active=parse_bool(row.get("is_active")),
+        )
+        if row.get("photo_filename"):
+            product.photo = self.photo_path(str(row["photo_filename"]).strip())
+        # Ограничения столбцов (длина, число цифр) проверяются до записи: иначе
+        # PostgreSQL отклонит всю пачку с DataError и импорт остановится
+        try:
+            product.clean_fields(exclude=["category", "photo", "photo_file_id"])
+        except ValidationError as e:
+            raise RowError(" ".join(
+                f"{name}: {' '.join(messages)}" for name, messages in e.message_dict.items()
+            ))
+        # Последней проверкой: недостающие категории запоминаются только для корректной строки
+        category_path = self.check_category_path(category_path)
+        fields = REQUIRED_FIELDS + tuple(
+            field_name for column, field_name in OPTIONAL_FIELDS.items()
+            if row.get(column) not in (None, "")
+            # Товар, снова появившийся в файле, включается обратно
+            or (field_name == "is_active" and self.deactivate_missing)
+        )
+        return product, fields, category_path
+
+    @staticmethod
+    def _value(product: Product, field_name: str):
+        if field_name == "photo":
+            return product.photo.name or ""
+        return getattr(product, field_name)
+
+    def flush(self, batch: List[ImportRow]) -> None:
+        with transaction.atomic():
+            if self.pending_categories:
+                self.create_pending_categories()
+            for row in batch:
+                row.product.category_id = self.category_ids[row.category_path]
+            if self.mode == MODE_UPSERT:
+                self.flush_upsert(batch)
+            else:
+                self.flush_create(batch)
+
+    def flush_create(self, batch: List[ImportRow]) -> None:
+        skus = [row.product.sku for row in batch if row.product.sku]
+        taken = set(Product.objects.filter(sku__in=skus).values_list("sku", flat=True)) if skus else set()
+        to_create = []
+        for row in batch:
+            sku = row.product.sku
+            if sku and sku in taken:
+                self.result.add_error(row.number, f"Товар с артикулом '{sku}' уже существует.")
+                continue
+            if sku:
+                taken.add(sku)
+            to_create.append(row.product)
+        Product.objects.bulk_create(to_create, batch_size=self.batch_size)
+        self.result.created += len(to_create)
+
+    def flush_upsert(self, batch: List[ImportRow]) -> None:
+        """Создание новых и обновление изменившихся товаров пачки по артикулу"""
+        # Повтор артикула в пачке: применяется последняя строка
+        incoming = {row.product.sku: row for row in batch}
+        existing = Product.objects.in_bulk(list(incoming), field_name="sku")
+        to_create: List[Product] = []
+        to_update: Dict[Tuple[str, ...], List[Product]] = {}
+        for sku, (_, product, fields, _) in incoming.items():
+            current = existing.get(sku)
+            if current is None:
+                to_create.append(product)
+                continue
+            changed = [name for name in fields if self._value(current, name) != self._value(product, name)]
+            if not changed:
+                self.result.unchanged += 1
+                continue
+            for name in changed:
+                setattr(current, name, getattr(product, name))
+            if "photo" in changed:
+                # bulk_update не вызывает Product.save(): file_id старого фото сбрасывается здесь
+                current.photo_file_id = ""
+                changed.append("photo_file_id")
+            to_update.setdefault(tuple(sorted(changed)), []).append(current)
+
+        if to_create:
+            Product.objects.bulk_create(to_create, batch_size=self.batch_size)
+        # Одна группа — один набор изменившихся полей: UPDATE пишет только их
+        for fields, products in to_update.items():
+            Product.objects.bulk_update(products, fields, batch_size=self.batch_size)
+        self.result.created += len(to_create)
+        self.result.updated += sum(len(products) for products in to_update.values())
+
+    def deactivate_missing_products(self) -> int:
+        """Скрывает активные товары с артикулом, которых не было в файле"""
+        missing = [
+            product_id
+            for product_id, sku in Product.objects.filter(is_active=True, sku__isnull=False)
+            .values_list("id", "sku").iterator(chunk_size=self.batch_size)
+            if sku not in self.seen_skus
+        ]
+        for start in range(0, len(missing), self.batch_size):
+            Product.objects.filter(id__in=missing[start:start + self.batch_size]).update(is_active=False)
+        self.result.deactivated = len(missing)
+        return len(missing)
+
+    def _run(self, rows: Iterable[dict], on_batch: Optional[Callable[[ImportResult], None]]) -> None:
+        batch: List[ImportRow] = []
+        for row_number, row in enumerate(rows, start=1):
+            self.result.processed += 1
+            try:
+                if not isinstance(row, dict):
+                    raise RowError("Ожидается объект с полями товара.")
+                batch.append(ImportRow(row_number, *self.build_product(row)))
+            except RowError as e:
+                self.result.add_error(row_number, str(e))
+            except Exception as e:
+                self.result.add_error(row_number, f"Ошибка: {e}")
+            if len(batch) >= self.batch_size:
+                self.flush(batch)
+                batch = []
+                if on_batch:
+                    on_batch(self.result)
+            elif on_batch and self.result.processed % self.batch_size == 0:
+                on_batch(self.result)
+        if batch:
+            self.flush(batch)
+            if on_batch:
+                on_batch(self.result)
+
+    def run(self, rows: Iterable[dict], on_batch: Optional[Callable[[ImportResult], None]] = None) -> ImportResult:
+        """
+        Импорт строк; on_batch вызывается после каждой записанной пачки
+        и после каждых batch_size строк, даже если все они с ошибками.
+
+        Уже записанные пачки сохраняются, даже если чтение файла прервётся ошибкой;
+        отсутствующие товары деактивируются только после полного прочтения файла.
+        """
+        self._run(rows, on_batch)
+        if self.categories_created:
+            logger.info("Создано категорий при импорте: %s", self.categories_created)
+        if self.deactivate_missing:
+            self.deactivate_missing_products()
+        logger.info(
+            "Импорт товаров (%s): обработано %s, создано %s, обновлено %s, без изменений %s, "
+            "деактивировано %s, ошибок %s",
+            self.mode, self.result.processed, self.result.created, self.result.updated,
+            self.result.unchanged, self.result.deactivated, self.result.error_count)
+        return self.result
+
@@ -0,0 +1,131 @@
+# django_app/shop/jobs.py
+"""
+Общий цикл обработчиков фоновых заданий (ImportJob, ExportJob).
+
+Задание забирается select_for_update(skip_locked=True), поэтому параллельные
+обработчики получают разные задания. Пока задание выполняется, отдельный поток
+раз в JOB_HEARTBEAT_INTERVAL секунд обновляет heartbeat_at. Задание в статусе
+«выполняется» без отметки дольше JOB_STALE_TIMEOUT секунд осталось от упавшего
+обработчика: оно возвращается в очередь или помечается ошибкой. У заданий с
+полем attempts число запусков ограничено JOB_MAX_ATTEMPTS, чтобы задание,
+которое каждый раз роняет обработчик (например, по памяти), не повторялось бесконечно.
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+from typing import Callable, Iterable, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+MAINTENANCE_INTERVAL = 60  # Как часто проверять брошенные задания и выполнять обслуживание, сек.
+
+
+def claim_next(model):
+    """Следующее задание из очереди или None"""
+    with transaction.atomic():
+        job = (
+            model.objects.select_for_update(skip_locked=True)
+            .filter(status=model.STATUS_QUEUED)
+            .order_by('id')
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = model.STATUS_RUNNING
+        job.started_at = job.heartbeat_at = timezone.now()
+        update_fields = ['status', 'started_at', 'heartbeat_at']
+        if hasattr(job, 'attempts'):
+            job.attempts += 1
+            update_fields.append('attempts')
+        job.save(update_fields=update_fields)
+    return job
+
+
+def recover_stale_jobs(model, requeue: bool = False) -> int:
+    """
+    Задания упавших обработчиков: возвращаются в очередь (requeue) или помечаются ошибкой.
+
+    Повторять можно только идемпотентные задания: импорт, прерванный на середине,
+    уже записал часть пачек, поэтому он помечается ошибкой. Задание, запускавшееся
+    JOB_MAX_ATTEMPTS раз, тоже помечается ошибкой.
+    """
+    threshold = timezone.now() - timedelta(seconds=settings.JOB_STALE_TIMEOUT)
+    stale = model.objects.filter(status=model.STATUS_RUNNING).filter(
+        Q(heartbeat_at__lt=threshold) | Q(heartbeat_at__isnull=True, started_at__lt=threshold)
+    )
+    requeued = 0
+    if requeue:
+        requeued = stale.filter(attempts__lt=settings.JOB_MAX_ATTEMPTS).update(
+            status=model.STATUS_QUEUED, started_at=None, heartbeat_at=None
+        )
+        message = f"Обработчик прерывался во время выполнения {settings.JOB_MAX_ATTEMPTS} раз(а)."
+    else:
+        message = "Обработчик прервался во время выполнения."
+    # Возвращённые в очередь уже не в статусе «выполняется» и сюда не попадают
+    failed = stale.update(status=model.STATUS_FAILED, message=message, finished_at=timezone.now())
+    if requeued or failed:
+        logger.warning(
+            "%s: заданий упавших обработчиков возвращено в очередь %s, помечено ошибкой %s",
+            model._meta.verbose_name_plural, requeued, failed)
+    return requeued + failed
+
+
+class Heartbeat(threading.Thread):
+    """Поток, отмечающий выполняющееся задание, пока работает run_job"""
+
+    def __init__(self, model, job_id):
+        super().__init__(name=f"{model._meta.model_name}-{job_id}-heartbeat", daemon=True)
+        self.queryset = model.objects.filter(pk=job_id)
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(settings.JOB_HEARTBEAT_INTERVAL):
+                try:
+                    self.queryset.update(heartbeat_at=timezone.now())
+                except Exception as e:
+                    logger.warning("Не удалось отметить задание %s: %s", self.name, e)
+        finally:
+            # У потока своё соединение с БД
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def run_worker(model, run_job: Callable, *, loop: bool, interval: float, requeue_stale: bool = False,
+               on_done: Optional[Callable] = None, maintenance: Iterable[Callable[[], object]] = ()) -> None:
+    """
+    Выполняет задания model из очереди; без loop — завершается, когда очередь пуста.
+
+    Раз в MAINTENANCE_INTERVAL секунд обрабатываются брошенные задания и
+    вызываются функции maintenance (например, удаление просроченных файлов).
+    """
+    last_maintenance = 0.0
+    while True:
+        if time.monotonic() - last_maintenance >= MAINTENANCE_INTERVAL:
+            recover_stale_jobs(model, requeue=requeue_stale)
+            for task in maintenance:
+                task()
+            last_maintenance = time.monotonic()
+        job = claim_next(model)
+        if job is not None:
+            heartbeat = Heartbeat(model, job.pk)
+            heartbeat.start()
+            try:
+                job = run_job(job)
+            finally:
+                heartbeat.stop()
+            if on_done:
+                on_done(job)
+            continue
+        if not loop:
+            break
+        time.sleep(interval)
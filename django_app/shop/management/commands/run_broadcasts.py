@@ -0,0 +1,40 @@
+# django_app/shop/management/commands/run_broadcasts.py
+import asyncio
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from django_app.shop.broadcast import BroadcastRunner
+from django_app.shop.models import Broadcast
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Выполняет рассылки в статусе 'В очереди' и продолжает прерванные."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--id', type=int, help="Выполнить только указанную рассылку")
+        parser.add_argument('--loop', action='store_true', help="Ожидать новые рассылки")
+        parser.add_argument('--interval', type=float, default=5.0, help="Пауза между проверками, сек.")
+
+    def get_pending(self, broadcast_id=None):
+        qs = Broadcast.objects.filter(status__in=[Broadcast.STATUS_RUNNING, Broadcast.STATUS_QUEUED])
+        if broadcast_id:
+            qs = qs.filter(pk=broadcast_id)
+        # Прерванные рассылки продолжаются раньше новых
+        return list(qs.order_by('-status', 'id'))
+
+    def handle(self, *args, **options):
+        while True:
+            for broadcast in self.get_pending(options['id']):
+                finished = asyncio.run(BroadcastRunner(broadcast).run())
+                broadcast.refresh_from_db()
+                self.stdout.write(
+                    f"{broadcast}: отправлено {broadcast.sent_count}, ошибок {broadcast.failed_count}, "
+                    f"заблокировали {broadcast.blocked_count}" + ("" if finished else " (пауза)")
+                )
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,27 @@
+# django_app/shop/management/commands/run_export_jobs.py
+import logging
+
+from django.core.management.base import BaseCommand
+
+from django_app.shop.export_jobs import cleanup_expired_exports, run_job
+from django_app.shop.jobs import run_worker
+from django_app.shop.models import ExportJob
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Формирует отчёты из очереди ExportJob и удаляет просроченные файлы."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Ожидать новые задания")
+        parser.add_argument('--interval', type=float, default=3.0, help="Пауза при пустой очереди, сек.")
+
+    def handle(self, *args, **options):
+        logger.info("Запуск обработчика заданий экспорта")
+        # Отчёт только читает данные, поэтому брошенное задание можно сформировать заново
+        run_worker(
+            ExportJob, run_job, loop=options['loop'], interval=options['interval'], requeue_stale=True,
+            on_done=lambda job: self.stdout.write(f"{job}: строк {job.row_count}"),
+            maintenance=[cleanup_expired_exports],
+        )
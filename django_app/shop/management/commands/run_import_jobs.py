@@ -0,0 +1,28 @@
+# django_app/shop/management/commands/run_import_jobs.py
+import logging
+
+from django.core.management.base import BaseCommand
+
+from django_app.shop.import_jobs import run_job
+from django_app.shop.jobs import run_worker
+from django_app.shop.models import ImportJob
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Выполняет задания импорта товаров из очереди ImportJob."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Ожидать новые задания")
+        parser.add_argument('--interval', type=float, default=3.0, help="Пауза при пустой очереди, сек.")
+
+    def handle(self, *args, **options):
+        logger.info("Запуск обработчика заданий импорта")
+        run_worker(
+            ImportJob, run_job, loop=options['loop'], interval=options['interval'],
+            on_done=lambda job: self.stdout.write(
+                f"{job}: обработано {job.processed_count}, создано {job.created_count}, "
+                f"обновлено {job.updated_count}, ошибок {job.error_count}"
+            ),
+        )
@@ -0,0 +1,31 @@
+# django_app/shop/management/commands/send_notifications.py
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from django_app.shop.tasks import NOTIFICATION_BATCH_SIZE, dispatch_pending_notifications
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Отправляет пользователям уведомления из очереди OrderNotification."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Обработать очередь один раз и завершиться")
+        parser.add_argument('--batch-size', type=int, default=NOTIFICATION_BATCH_SIZE, help="Размер пачки")
+        parser.add_argument('--interval', type=float, default=2.0, help="Пауза при пустой очереди, сек.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        logger.info("Запуск обработчика очереди уведомлений")
+        while True:
+            sent, retried, failed = dispatch_pending_notifications(batch_size)
+            processed = sent + retried + failed
+            if processed:
+                self.stdout.write(f"Отправлено: {sent}, повтор: {retried}, ошибок: {failed}")
+            if options['once'] and processed < batch_size:
+                break
+            if not processed:
+                time.sleep(options['interval'])
@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-19 06:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0007_ordernotification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Broadcast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.TextField(verbose_name='Текст сообщения (HTML)')),
+                ('status', models.CharField(choices=[('draft', 'Черновик'), ('queued', 'В очереди'), ('running', 'Выполняется'), ('paused', 'Приостановлена'), ('done', 'Завершена')], default='draft', max_length=10, verbose_name='Статус')),
+                ('last_user_id', models.BigIntegerField(default=0, verbose_name='Последний обработанный пользователь')),
+                ('sent_count', models.PositiveIntegerField(default=0, verbose_name='Отправлено')),
+                ('failed_count', models.PositiveIntegerField(default=0, verbose_name='Ошибок')),
+                ('blocked_count', models.PositiveIntegerField(default=0, verbose_name='Заблокировали бота')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Начало')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Окончание')),
+            ],
+            options={
+                'verbose_name': 'Рассылка',
+                'verbose_name_plural': 'Рассылки',
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2 on 2026-10-19 06:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0008_broadcast'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BotFSMState',
+            fields=[
+                ('key', models.CharField(max_length=255, primary_key=True, serialize=False, verbose_name='Ключ')),
+                ('state', models.CharField(blank=True, max_length=255, null=True, verbose_name='Состояние')),
+                ('data', models.JSONField(blank=True, default=dict, verbose_name='Данные')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='Истекает')),
+            ],
+            options={
+                'verbose_name': 'Состояние FSM',
+                'verbose_name_plural': 'Состояния FSM',
+            },
+        ),
+    ]
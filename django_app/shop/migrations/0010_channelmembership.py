@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-19 06:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0009_botfsmstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChannelMembership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chat_id', models.BigIntegerField(verbose_name='ID чата')),
+                ('user_id', models.BigIntegerField(verbose_name='ID пользователя в Telegram')),
+                ('status', models.CharField(max_length=20, verbose_name='Статус в чате')),
+                ('is_member', models.BooleanField(default=False, verbose_name='Подписан')),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True, verbose_name='Обновлено')),
+            ],
+            options={
+                'verbose_name': 'Подписка на канал',
+                'verbose_name_plural': 'Подписки на каналы',
+                'constraints': [models.UniqueConstraint(fields=('chat_id', 'user_id'), name='shop_chanmember_chat_user_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 06:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0010_channelmembership'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='faq',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Дата изменения'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Полнотекстовые и триграммные индексы для поиска (django_app/shop/search.py).
+# Выполняется только на PostgreSQL; на других СУБД поиск идёт по индексу в памяти.
+
+from django.db import migrations
+
+SEARCH_TABLES = (
+    # (модель, заголовок, текст)
+    ("FAQ", "question", "answer"),
+    ("Product", "name", "description"),
+)
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    quote = schema_editor.quote_name
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for model_name, title, body in SEARCH_TABLES:
+        table = apps.get_model("shop", model_name)._meta.db_table
+        schema_editor.execute(
+            f"ALTER TABLE {quote(table)} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+            f"setweight(to_tsvector('russian', coalesce({quote(title)}, '')), 'A') || "
+            f"setweight(to_tsvector('russian', coalesce({quote(body)}, '')), 'B')) STORED"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX {quote(table + '_search_vector_idx')} ON {quote(table)} USING gin (search_vector)"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX {quote(table + '_' + title + '_trgm_idx')} ON {quote(table)} "
+            f"USING gin ({quote(title)} gin_trgm_ops)"
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    quote = schema_editor.quote_name
+    for model_name, title, body in SEARCH_TABLES:
+        table = apps.get_model("shop", model_name)._meta.db_table
+        schema_editor.execute(f"DROP INDEX IF EXISTS {quote(table + '_' + title + '_trgm_idx')}")
+        schema_editor.execute(f"DROP INDEX IF EXISTS {quote(table + '_search_vector_idx')}")
+        schema_editor.execute(f"ALTER TABLE {quote(table)} DROP COLUMN IF EXISTS search_vector")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0011_faq_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 06:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0012_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='photo_file_id',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='file_id фото'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-19 06:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0013_product_photo_file_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(upload_to='imports/', verbose_name='Файл')),
+                ('file_format', models.CharField(max_length=10, verbose_name='Формат файла')),
+                ('status', models.CharField(choices=[('queued', 'В очереди'), ('running', 'Выполняется'), ('done', 'Завершён'), ('failed', 'Ошибка'), ('cancelled', 'Отменён')], db_index=True, default='queued', max_length=10, verbose_name='Статус')),
+                ('processed_count', models.PositiveIntegerField(default=0, verbose_name='Обработано строк')),
+                ('created_count', models.PositiveIntegerField(default=0, verbose_name='Создано товаров')),
+                ('error_count', models.PositiveIntegerField(default=0, verbose_name='Ошибок')),
+                ('error_report', models.FileField(blank=True, upload_to='import_reports/', verbose_name='Отчёт об ошибках')),
+                ('message', models.TextField(blank=True, verbose_name='Сообщение')),
+                ('cancel_requested', models.BooleanField(default=False, verbose_name='Запрошена отмена')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Начало')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Окончание')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+            ],
+            options={
+                'verbose_name': 'Импорт товаров',
+                'verbose_name_plural': 'Импорты товаров',
+                'ordering': ['-id'],
+            },
+        ),
+    ]
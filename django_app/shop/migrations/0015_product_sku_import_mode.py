@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2026-10-19 06:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0014_importjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='deactivate_missing',
+            field=models.BooleanField(default=False, help_text='Скрыть товары с артикулом, которых нет в файле (только при обновлении по артикулу)', verbose_name='Деактивировать отсутствующие'),
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='deactivated_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Деактивировано товаров'),
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='mode',
+            field=models.CharField(choices=[('create', 'Только добавление'), ('upsert', 'Обновление по артикулу')], default='create', max_length=10, verbose_name='Режим'),
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='updated_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Обновлено товаров'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='sku',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True, verbose_name='Артикул'),
+        ),
+    ]
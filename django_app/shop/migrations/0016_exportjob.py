@@ -0,0 +1,39 @@
+# Generated by Django 5.2 on 2026-10-19 06:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0015_product_sku_import_mode'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('products', 'Товары'), ('orders', 'Заказы')], max_length=20, verbose_name='Отчёт')),
+                ('file_format', models.CharField(choices=[('csv', 'CSV'), ('json', 'JSON'), ('xlsx', 'Excel (XLSX)')], max_length=10, verbose_name='Формат файла')),
+                ('params', models.JSONField(blank=True, default=dict, verbose_name='Параметры')),
+                ('status', models.CharField(choices=[('queued', 'В очереди'), ('running', 'Формируется'), ('done', 'Готов'), ('failed', 'Ошибка'), ('expired', 'Удалён по сроку хранения')], db_index=True, default='queued', max_length=10, verbose_name='Статус')),
+                ('file', models.FileField(blank=True, upload_to='exports/', verbose_name='Файл')),
+                ('row_count', models.PositiveIntegerField(default=0, verbose_name='Строк')),
+                ('message', models.TextField(blank=True, verbose_name='Сообщение')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Начало')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Окончание')),
+                ('expires_at', models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Хранится до')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+            ],
+            options={
+                'verbose_name': 'Экспорт',
+                'verbose_name_plural': 'Экспорты',
+                'ordering': ['-id'],
+            },
+        ),
+    ]
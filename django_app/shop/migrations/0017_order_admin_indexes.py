@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-19 06:51
+
+from django.db import migrations, models
+
+USERNAME_INDEX = "shop_telegramuser_username_upper_idx"
+
+
+def create_username_index(apps, schema_editor):
+    # Поиск заказов по началу юзернейма (istartswith -> UPPER(username) LIKE 'X%');
+    # UPPER() возвращает text, поэтому класс операторов — text_pattern_ops (только PostgreSQL)
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    quote = schema_editor.quote_name
+    table = apps.get_model("shop", "TelegramUser")._meta.db_table
+    schema_editor.execute(
+        f"CREATE INDEX {quote(USERNAME_INDEX)} ON {quote(table)} (UPPER({quote('username')}) text_pattern_ops)"
+    )
+
+
+def drop_username_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {schema_editor.quote_name(USERNAME_INDEX)}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0016_exportjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', '-id'], name='shop_order_status_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['is_active', '-id'], name='shop_order_active_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['created_at'], name='shop_order_created_at_idx'),
+        ),
+        migrations.RunPython(create_username_index, drop_username_index),
+    ]
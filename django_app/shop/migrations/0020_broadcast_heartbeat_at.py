@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 07:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0019_job_heartbeat_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='broadcast',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Последняя отметка обработчика'),
+        ),
+    ]
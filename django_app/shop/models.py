@@ -1,5 +1,6 @@
 import logging
 from django.db import models
+from django.conf import settings
 from mptt.models import MPTTModel, TreeForeignKey
 
 logger = logging.getLogger(__name__)
@@ -60,6 +61,8 @@ class Product(models.Model):
         verbose_name="Категория"
     )
     name = models.CharField(max_length=255, verbose_name="Название товара")
+    # Внешний ключ товара в файлах поставщика: по нему импорт обновляет существующие товары
+    sku = models.CharField(max_length=64, unique=True, blank=True, null=True, verbose_name="Артикул")
     description = models.TextField(verbose_name="Описание товара", blank=True)
     price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Цена")
     photo = models.ImageField(
@@ -69,12 +72,22 @@ class Product(models.Model):
         default=None,
         verbose_name="Фото товара"
     )
+    # file_id фото в Telegram после первой отправки: повторно файл не загружается
+    photo_file_id = models.CharField(max_length=255, blank=True, editable=False, verbose_name="file_id фото")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
     is_active = models.BooleanField(default=True, verbose_name="Активен")
 
     def __str__(self):
         return f"{self.name} ({self.category.name})"
 
+    def save(self, *args, **kwargs):
+        # При замене фото сохранённый file_id больше не соответствует файлу
+        if self.pk and self.photo_file_id:
+            old_photo = Product.objects.filter(pk=self.pk).values_list("photo", flat=True).first()
+            if (old_photo or "") != (self.photo.name or ""):
+                self.photo_file_id = ""
+        super().save(*args, **kwargs)
+
     def soft_delete(self):
         self.is_active = False
         self.save()
@@ -87,6 +100,7 @@ class FAQ(models.Model):
     question = models.CharField(max_length=255, verbose_name="Вопрос")
     answer = models.TextField(verbose_name="Ответ")
     is_active = models.BooleanField(default=True, verbose_name="Активен")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Дата изменения")
 
     def __str__(self):
         return self.question
@@ -200,6 +214,13 @@ class Order(models.Model):
     class Meta:
         verbose_name = "Заказ"
         verbose_name_plural = "Заказы"
+        # Индексы под список заказов в админке: фильтры по статусу/активности
+        # с сортировкой по -id и иерархия дат по created_at
+        indexes = [
+            models.Index(fields=['status', '-id'], name='shop_order_status_id_idx'),
+            models.Index(fields=['is_active', '-id'], name='shop_order_active_id_idx'),
+            models.Index(fields=['created_at'], name='shop_order_created_at_idx'),
+        ]
 
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items', verbose_name="Заказ")
@@ -217,3 +238,220 @@ class OrderItem(models.Model):
     class Meta:
         verbose_name = "Элемент заказа"
         verbose_name_plural = "Элементы заказа"
+
+class OrderNotification(models.Model):
+    """Уведомление пользователя, ожидающее асинхронной отправки в Telegram."""
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'В очереди'),
+        (STATUS_SENDING, 'Отправляется'),
+        (STATUS_SENT, 'Отправлено'),
+        (STATUS_FAILED, 'Ошибка'),
+    ]
+
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='notifications', verbose_name="Заказ")
+    chat_id = models.BigIntegerField(verbose_name="ID чата")
+    text = models.TextField(verbose_name="Текст")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name="Статус")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Попыток")
+    last_error = models.CharField(max_length=255, blank=True, default="", verbose_name="Последняя ошибка")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+    sent_at = models.DateTimeField(blank=True, null=True, verbose_name="Дата отправки")
+    # Когда обработчик забрал уведомление; по нему возвращаются зависшие в статусе «Отправляется»
+    claimed_at = models.DateTimeField(blank=True, null=True, verbose_name="Взято в отправку")
+
+    def __str__(self):
+        return f"Уведомление по заказу №{self.order_id} ({self.get_status_display()})"
+
+    class Meta:
+        verbose_name = "Уведомление о заказе"
+        verbose_name_plural = "Уведомления о заказах"
+        indexes = [
+            models.Index(fields=['status', 'id'], name='shop_ordnotif_status_id_idx'),
+        ]
+
+class Broadcast(models.Model):
+    """Рассылка сообщения всем активным пользователям Telegram."""
+    STATUS_DRAFT = 'draft'
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_PAUSED = 'paused'
+    STATUS_DONE = 'done'
+
+    STATUS_CHOICES = [
+        (STATUS_DRAFT, 'Черновик'),
+        (STATUS_QUEUED, 'В очереди'),
+        (STATUS_RUNNING, 'Выполняется'),
+        (STATUS_PAUSED, 'Приостановлена'),
+        (STATUS_DONE, 'Завершена'),
+    ]
+
+    text = models.TextField(verbose_name="Текст сообщения (HTML)")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_DRAFT, verbose_name="Статус")
+    last_user_id = models.BigIntegerField(default=0, verbose_name="Последний обработанный пользователь")
+    sent_count = models.PositiveIntegerField(default=0, verbose_name="Отправлено")
+    failed_count = models.PositiveIntegerField(default=0, verbose_name="Ошибок")
+    blocked_count = models.PositiveIntegerField(default=0, verbose_name="Заблокировали бота")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+    started_at = models.DateTimeField(blank=True, null=True, verbose_name="Начало")
+    heartbeat_at = models.DateTimeField(blank=True, null=True, verbose_name="Последняя отметка обработчика")
+    finished_at = models.DateTimeField(blank=True, null=True, verbose_name="Окончание")
+
+    def __str__(self):
+        return f"Рассылка №{self.id} ({self.get_status_display()})"
+
+    class Meta:
+        verbose_name = "Рассылка"
+        verbose_name_plural = "Рассылки"
+
+class BotFSMState(models.Model):
+    """Состояние FSM бота (хранилище FSM_STORAGE=db)."""
+    key = models.CharField(max_length=255, primary_key=True, verbose_name="Ключ")
+    state = models.CharField(max_length=255, blank=True, null=True, verbose_name="Состояние")
+    data = models.JSONField(default=dict, blank=True, verbose_name="Данные")
+    expires_at = models.DateTimeField(db_index=True, verbose_name="Истекает")
+
+    def __str__(self):
+        return self.key
+
+    class Meta:
+        verbose_name = "Состояние FSM"
+        verbose_name_plural = "Состояния FSM"
+
+class ChannelMembership(models.Model):
+    """Подписка пользователя на обязательный канал/группу (по событиям chat_member)."""
+    chat_id = models.BigIntegerField(verbose_name="ID чата")
+    user_id = models.BigIntegerField(verbose_name="ID пользователя в Telegram")
+    status = models.CharField(max_length=20, verbose_name="Статус в чате")
+    is_member = models.BooleanField(default=False, verbose_name="Подписан")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Обновлено")
+
+    def __str__(self):
+        return f"{self.user_id} в {self.chat_id}: {self.status}"
+
+    class Meta:
+        verbose_name = "Подписка на канал"
+        verbose_name_plural = "Подписки на каналы"
+        constraints = [
+            models.UniqueConstraint(fields=['chat_id', 'user_id'], name='shop_chanmember_chat_user_uniq'),
+        ]
+
+class ImportJob(models.Model):
+    """Фоновый импорт товаров из загруженного файла (выполняет команда run_import_jobs)."""
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CANCELLED = 'cancelled'
+
+    MODE_CREATE = 'create'
+    MODE_UPSERT = 'upsert'
+
+    MODE_CHOICES = [
+        (MODE_CREATE, 'Только добавление'),
+        (MODE_UPSERT, 'Обновление по артикулу'),
+    ]
+
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'В очереди'),
+        (STATUS_RUNNING, 'Выполняется'),
+        (STATUS_DONE, 'Завершён'),
+        (STATUS_FAILED, 'Ошибка'),
+        (STATUS_CANCELLED, 'Отменён'),
+    ]
+    FINISHED_STATUSES = (STATUS_DONE, STATUS_FAILED, STATUS_CANCELLED)
+
+    file = models.FileField(upload_to='imports/', verbose_name="Файл")
+    file_format = models.CharField(max_length=10, verbose_name="Формат файла")
+    mode = models.CharField(max_length=10, choices=MODE_CHOICES, default=MODE_CREATE, verbose_name="Режим")
+    deactivate_missing = models.BooleanField(
+        default=False, verbose_name="Деактивировать отсутствующие",
+        help_text="Скрыть товары с артикулом, которых нет в файле (только при обновлении по артикулу)"
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED, db_index=True, verbose_name="Статус")
+    processed_count = models.PositiveIntegerField(default=0, verbose_name="Обработано строк")
+    created_count = models.PositiveIntegerField(default=0, verbose_name="Создано товаров")
+    updated_count = models.PositiveIntegerField(default=0, verbose_name="Обновлено товаров")
+    deactivated_count = models.PositiveIntegerField(default=0, verbose_name="Деактивировано товаров")
+    error_count = models.PositiveIntegerField(default=0, verbose_name="Ошибок")
+    error_report = models.FileField(upload_to='import_reports/', blank=True, verbose_name="Отчёт об ошибках")
+    message = models.TextField(blank=True, verbose_name="Сообщение")
+    cancel_requested = models.BooleanField(default=False, verbose_name="Запрошена отмена")
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Автор"
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+    started_at = models.DateTimeField(blank=True, null=True, verbose_name="Начало")
+    heartbeat_at = models.DateTimeField(blank=True, null=True, verbose_name="Последняя отметка обработчика")
+    finished_at = models.DateTimeField(blank=True, null=True, verbose_name="Окончание")
+
+    def __str__(self):
+        return f"Импорт №{self.id} ({self.get_status_display()})"
+
+    @property
+    def is_finished(self):
+        return self.status in self.FINISHED_STATUSES
+
+    class Meta:
+        verbose_name = "Импорт товаров"
+        verbose_name_plural = "Импорты товаров"
+        ordering = ['-id']
+
+class ExportJob(models.Model):
+    """Фоновое формирование отчёта (выполняет команда run_export_jobs)."""
+    KIND_PRODUCTS = 'products'
+    KIND_ORDERS = 'orders'
+
+    KIND_CHOICES = [
+        (KIND_PRODUCTS, 'Товары'),
+        (KIND_ORDERS, 'Заказы'),
+    ]
+
+    FORMAT_CHOICES = [
+        ('csv', 'CSV'),
+        ('json', 'JSON'),
+        ('xlsx', 'Excel (XLSX)'),
+    ]
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_EXPIRED = 'expired'
+
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'В очереди'),
+        (STATUS_RUNNING, 'Формируется'),
+        (STATUS_DONE, 'Готов'),
+        (STATUS_FAILED, 'Ошибка'),
+        (STATUS_EXPIRED, 'Удалён по сроку хранения'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name="Отчёт")
+    file_format = models.CharField(max_length=10, choices=FORMAT_CHOICES, verbose_name="Формат файла")
+    params = models.JSONField(default=dict, blank=True, verbose_name="Параметры")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED, db_index=True, verbose_name="Статус")
+    file = models.FileField(upload_to='exports/', blank=True, verbose_name="Файл")
+    row_count = models.PositiveIntegerField(default=0, verbose_name="Строк")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Попыток")
+    message = models.TextField(blank=True, verbose_name="Сообщение")
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Автор"
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+    started_at = models.DateTimeField(blank=True, null=True, verbose_name="Начало")
+    heartbeat_at = models.DateTimeField(blank=True, null=True, verbose_name="Последняя отметка обработчика")
+    finished_at = models.DateTimeField(blank=True, null=True, verbose_name="Окончание")
+    expires_at = models.DateTimeField(blank=True, null=True, db_index=True, verbose_name="Хранится до")
+
+    def __str__(self):
+        return f"{self.get_kind_display()} №{self.id} ({self.get_status_display()})"
+
+    class Meta:
+        verbose_name = "Экспорт"
+        verbose_name_plural = "Экспорты"
+        ordering = ['-id']
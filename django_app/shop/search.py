@@ -0,0 +1,354 @@
+# django_app/shop/search.py
+"""
+Поиск по FAQ и товарам.
+
+На PostgreSQL поиск выполняет база: у таблиц FAQ и товаров есть генерируемые
+столбцы search_vector (конфигурация russian, заголовок с весом A, текст — B)
+с GIN-индексами и триграммные индексы pg_trgm по заголовку для поиска по
+подстроке и с опечатками (миграция 0012). Результаты упорядочены по ts_rank,
+общее количество, если оно нужно вызывающему, возвращает тот же запрос
+(count(*) OVER ()): окно обходит все совпадения, поэтому без with_total оно не считается.
+
+На других СУБД (SQLite в тестах и при локальной разработке) используется
+инвертированный индекс в памяти процесса: слова нормализуются (нижний регистр,
+ё -> е) и приводятся к основе стеммером Snowball для русского языка,
+ранжирование — BM25. Индекс перестраивается по сигналам post_save/post_delete
+и при изменении отпечатка таблицы (количество, max(id), max(updated_at)),
+который проверяется не чаще раза в SEARCH_INDEX_CHECK_INTERVAL секунд.
+"""
+import bisect
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_save
+
+from .models import FAQ, Product
+
+logger = logging.getLogger(__name__)
+
+# Параметры BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Вес слова из заголовка (вопроса, названия) относительно слова из текста
+TITLE_WEIGHT = 3
+BODY_WEIGHT = 1
+# Поиск по префиксу основы: минимальная длина, число подставляемых основ и их вес
+PREFIX_MIN_LENGTH = 3
+PREFIX_EXPANSION = 20
+PREFIX_WEIGHT = 0.5
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# --- Стеммер Snowball (русский) ---
+
+_VOWELS = set("аеиоуыэюя")
+_PERFECTIVE_GERUND_1 = ("вшись", "вши", "в")
+_PERFECTIVE_GERUND_2 = ("ившись", "ывшись", "ивши", "ывши", "ив", "ыв")
+_REFLEXIVE = ("ся", "сь")
+_ADJECTIVE = (
+    "ими", "ыми", "его", "ого", "ему", "ому", "ее", "ие", "ые", "ое", "ей", "ий", "ый", "ой", "ем", "им",
+    "ым", "ом", "их", "ых", "ую", "юю", "ая", "яя", "ою", "ею",
+)
+_PARTICIPLE_1 = ("ем", "нн", "вш", "ющ", "щ")
+_PARTICIPLE_2 = ("ивш", "ывш", "ующ")
+_VERB_1 = ("ете", "йте", "ешь", "нно", "ла", "на", "ли", "ем", "ло", "но", "ет", "ют", "ны", "ть", "й", "л", "н")
+_VERB_2 = (
+    "ейте", "уйте", "ила", "ыла", "ена", "ите", "или", "ыли", "ило", "ыло", "ено", "ует", "уют", "ены", "ить",
+    "ыть", "ишь", "ей", "уй", "ил", "ыл", "им", "ым", "ен", "ят", "ит", "ыт", "ую", "ю",
+)
+_NOUN = (
+    "иями", "ями", "ами", "ией", "иям", "ием", "иях", "ев", "ов", "ие", "ье", "еи", "ии", "ей", "ой", "ий",
+    "ям", "ем", "ам", "ом", "ах", "ях", "ию", "ью", "ия", "ья", "а", "е", "и", "й", "о", "у", "ы", "ь", "ю", "я",
+)
+_SUPERLATIVE = ("ейше", "ейш")
+_DERIVATIONAL = ("ость", "ост")
+
+
+def _regions(word: str) -> Tuple[int, int]:
+    """Начала областей RV и R2 (по правилам Snowball)"""
+    rv = len(word)
+    for i, char in enumerate(word):
+        if char in _VOWELS:
+            rv = i + 1
+            break
+    r1 = r2 = len(word)
+    for i in range(1, len(word)):
+        if word[i - 1] in _VOWELS and word[i] not in _VOWELS:
+            r1 = i + 1
+            break
+    for i in range(r1 + 1, len(word)):
+        if word[i - 1] in _VOWELS and word[i] not in _VOWELS:
+            r2 = i + 1
+            break
+    return rv, r2
+
+
+def _strip(word: str, start: int, endings: tuple, endings_after_a: tuple = ()) -> Optional[str]:
+    """
+    Удаление самого длинного окончания внутри word[start:].
+
+    Окончания из endings_after_a удаляются, только если перед ними стоит «а» или «я».
+    """
+    best = None
+    for ending, after_a in [(e, False) for e in endings] + [(e, True) for e in endings_after_a]:
+        if word.endswith(ending) and len(word) - len(ending) >= start and (best is None or len(ending) > len(best[0])):
+            best = ending, after_a
+    if best is None:
+        return None
+    cut = len(word) - len(best[0])
+    if best[1] and (cut - 1 < start or word[cut - 1] not in "ая"):
+        return None
+    return word[:cut]
+
+
+def stem(word: str) -> str:
+    """Основа русского слова; слова без кириллицы возвращаются без изменений"""
+    if len(word) < 3 or not re.search("[а-я]", word):
+        return word
+    rv, r2 = _regions(word)
+
+    # Шаг 1
+    stripped = _strip(word, rv, _PERFECTIVE_GERUND_2, _PERFECTIVE_GERUND_1)
+    if stripped is not None:
+        word = stripped
+    else:
+        word = _strip(word, rv, _REFLEXIVE) or word
+        adjective = _strip(word, rv, _ADJECTIVE)
+        if adjective is not None:
+            word = _strip(adjective, rv, _PARTICIPLE_2, _PARTICIPLE_1) or adjective
+        else:
+            stripped = _strip(word, rv, _VERB_2, _VERB_1)
+            if stripped is None:
+                stripped = _strip(word, rv, _NOUN)
+            if stripped is not None:
+                word = stripped
+
+    # Шаг 2
+    if word.endswith("и") and len(word) - 1 >= rv:
+        word = word[:-1]
+
+    # Шаг 3
+    word = _strip(word, r2, _DERIVATIONAL) or word
+
+    # Шаг 4
+    if word.endswith("нн") and len(word) - 2 >= rv:
+        return word[:-1]
+    superlative = _strip(word, rv, _SUPERLATIVE)
+    if superlative is not None:
+        word = superlative
+        if word.endswith("нн") and len(word) - 2 >= rv:
+            word = word[:-1]
+        return word
+    if word.endswith("ь") and len(word) - 1 >= rv:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Нормализованные основы слов текста"""
+    return [stem(word) for word in _WORD_RE.findall(text.lower().replace("ё", "е"))]
+
+
+class SearchHit(NamedTuple):
+    """Найденная запись: id, заголовок и релевантность"""
+    id: int
+    title: str
+    rank: float
+
+
+# --- Индекс в памяти ---
+
+class TextIndex:
+    """Неизменяемый инвертированный индекс по набору записей"""
+
+    def __init__(self, rows: List[Tuple[int, str, str]]):
+        # rows — (id, заголовок, текст) в порядке общего списка
+        self.docs: List[Tuple[int, str]] = []
+        self.lengths: List[int] = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for doc, (record_id, title, body) in enumerate(rows):
+            freqs = Counter()
+            for term in tokenize(title):
+                freqs[term] += TITLE_WEIGHT
+            for term in tokenize(body or ""):
+                freqs[term] += BODY_WEIGHT
+            self.docs.append((record_id, title))
+            self.lengths.append(sum(freqs.values()))
+            for term, tf in freqs.items():
+                self.postings[term].append((doc, tf))
+        self.postings = dict(self.postings)
+        self.vocabulary = sorted(self.postings)
+        self.avg_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def _expand(self, term: str) -> List[Tuple[str, float]]:
+        """Основы словаря для слова запроса с весами: точное совпадение и продолжения префикса"""
+        expanded = [(term, 1.0)] if term in self.postings else []
+        if len(term) < PREFIX_MIN_LENGTH:
+            return expanded
+        start = bisect.bisect_right(self.vocabulary, term)
+        for candidate in self.vocabulary[start:start + PREFIX_EXPANSION]:
+            if not candidate.startswith(term):
+                break
+            expanded.append((candidate, PREFIX_WEIGHT))
+        return expanded
+
+    def _idf(self, term: str) -> float:
+        df = len(self.postings[term])
+        return math.log(1 + (len(self.docs) - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str) -> List[SearchHit]:
+        """Все найденные записи по убыванию релевантности"""
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            # Вклад слова запроса в документ — лучший из вкладов его основ
+            term_scores: Dict[int, float] = {}
+            for candidate, weight in self._expand(term):
+                idf = self._idf(candidate) * weight
+                for doc, tf in self.postings[candidate]:
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[doc] / self.avg_length)
+                    score = idf * tf * (BM25_K1 + 1) / (tf + norm)
+                    if score > term_scores.get(doc, 0.0):
+                        term_scores[doc] = score
+            for doc, score in term_scores.items():
+                scores[doc] += score
+        ranked = sorted(scores, key=lambda doc: (-scores[doc], doc))
+        return [SearchHit(*self.docs[doc], scores[doc]) for doc in ranked]
+
+
+class InMemorySearchIndex:
+    """Индекс в памяти по модели с перестройкой при изменении таблицы"""
+
+    def __init__(self, model, title_field: str, body_field: str, filters: Optional[dict] = None):
+        self.model = model
+        self.title_field = title_field
+        self.body_field = body_field
+        self.filters = filters or {}
+        self._index: Optional[TextIndex] = None
+        self._fingerprint = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        uid = f"shop_search_index_{model._meta.label_lower}"
+        post_save.connect(self.invalidate, sender=model, weak=False, dispatch_uid=f"{uid}_save")
+        post_delete.connect(self.invalidate, sender=model, weak=False, dispatch_uid=f"{uid}_delete")
+
+    def queryset(self):
+        return self.model.objects.filter(**self.filters)
+
+    def invalidate(self, **kwargs) -> None:
+        """Обработчик сигналов post_save/post_delete"""
+        self._checked_at = 0.0
+        self._fingerprint = None
+
+    def fingerprint(self):
+        aggregates = {"count": Count("id"), "last": Max("id")}
+        if any(field.name == "updated_at" for field in self.model._meta.fields):
+            aggregates["updated"] = Max("updated_at")
+        return tuple(sorted(self.queryset().aggregate(**aggregates).items()))
+
+    def get(self) -> TextIndex:
+        """Актуальный индекс"""
+        fresh = time.monotonic() - self._checked_at < settings.SEARCH_INDEX_CHECK_INTERVAL
+        if self._index is not None and fresh:
+            return self._index
+        with self._lock:
+            if self._index is not None and time.monotonic() - self._checked_at < settings.SEARCH_INDEX_CHECK_INTERVAL:
+                return self._index
+            fingerprint = self.fingerprint()
+            if self._index is None or fingerprint != self._fingerprint:
+                started = time.perf_counter()
+                rows = self.queryset().order_by("id").values_list("id", self.title_field, self.body_field)
+                self._index = TextIndex(list(rows))
+                self._fingerprint = fingerprint
+                logger.info(
+                    "Поисковый индекс %s перестроен: %s записей, %s основ за %.1f мс",
+                    self.model._meta.label, len(self._index), len(self._index.vocabulary),
+                    (time.perf_counter() - started) * 1000)
+            self._checked_at = time.monotonic()
+            return self._index
+
+    def search(self, query: str, limit: int, offset: int = 0) -> Tuple[List[SearchHit], int]:
+        hits = self.get().search(query)
+        return hits[offset:offset + limit], len(hits)
+
+
+faq_index = InMemorySearchIndex(FAQ, "question", "answer", filters={"is_active": True})
+product_index = InMemorySearchIndex(Product, "name", "description", filters={"is_active": True})
+
+
+# --- PostgreSQL ---
+
+_PG_SEARCH_SQL = """
+    SELECT page.id, page.title, page.rank, page.total
+    FROM (
+        SELECT t.id, t.{title} AS title,
+               ts_rank(t.search_vector, q.query) + similarity(t.{title}, %(text)s) AS rank,
+               {total} AS total
+        FROM {table} t, websearch_to_tsquery('russian', %(text)s) AS q(query)
+        WHERE {where}(t.search_vector @@ q.query OR t.{title} ILIKE %(like)s OR t.{title} %% %(text)s)
+        ORDER BY rank DESC, t.id
+        LIMIT %(limit)s OFFSET %(offset)s
+    ) page
+    ORDER BY page.rank DESC, page.id
+"""
+
+
+def _like_pattern(text: str) -> str:
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _postgres_search(model, title_field: str, query: str, limit: int, offset: int,
+                     where: str = "", with_total: bool = True) -> Tuple[List[SearchHit], Optional[int]]:
+    """Поиск одним запросом: страница результатов по ts_rank и общее количество (None без with_total)"""
+    table = connection.ops.quote_name(model._meta.db_table)
+    sql = _PG_SEARCH_SQL.format(
+        table=table, title=connection.ops.quote_name(title_field), where=where,
+        total="count(*) OVER ()" if with_total else "NULL")
+    params = {"text": query, "like": _like_pattern(query), "limit": limit, "offset": offset}
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    if not with_total:
+        return [SearchHit(row[0], row[1], row[2]) for row in rows], None
+    total = rows[0][3] if rows else 0
+    if not rows and offset:
+        # Страница за пределами результатов: количество узнаём отдельным запросом
+        params.update(limit=1, offset=0)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            first = cursor.fetchone()
+        total = first[3] if first else 0
+    return [SearchHit(row[0], row[1], row[2]) for row in rows], total
+
+
+def use_postgres() -> bool:
+    backend = settings.SEARCH_BACKEND
+    return backend == "postgres" or (backend == "auto" and connection.vendor == "postgresql")
+
+
+def search_faq(query: str, limit: int, offset: int = 0,
+               with_total: bool = True) -> Tuple[List[SearchHit], Optional[int]]:
+    """Поиск активных FAQ: (страница результатов, общее количество или None без with_total)"""
+    if use_postgres():
+        return _postgres_search(
+            FAQ, "question", query, limit, offset, where="t.is_active AND ", with_total=with_total)
+    hits, total = faq_index.search(query, limit, offset)
+    return hits, total if with_total else None
+
+
+def search_products(query: str, limit: int, offset: int = 0) -> Tuple[List[SearchHit], int]:
+    """Поиск активных товаров: (страница результатов, общее количество)"""
+    if use_postgres():
+        return _postgres_search(Product, "name", query, limit, offset, where="t.is_active AND ")
+    return product_index.search(query, limit, offset)
@@ -0,0 +1,140 @@
+# django_app/shop/sender.py
+import asyncio
+import logging
+from typing import NamedTuple
+
+import aiohttp
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SendResult(NamedTuple):
+    """Результат отправки одного сообщения."""
+    chat_id: int
+    ok: bool
+    error_code: int | None = None
+    description: str = ""
+
+    @property
+    def blocked(self):
+        """Пользователь заблокировал бота или удалил аккаунт."""
+        return self.error_code == 403
+
+    @property
+    def throttled(self):
+        """Не отправлено из-за ограничения скорости (429): сообщение нужно повторить."""
+        return self.error_code == 429
+
+
+class TelegramSender:
+    """
+    Отправка сообщений в Telegram через одну ClientSession.
+
+    Скорость ограничивается равномерными интервалами (не больше `rate` сообщений
+    в секунду), ответ 429 учитывает retry_after и ставит на паузу всех отправителей.
+
+    Использование:
+        async with TelegramSender() as sender:
+            result = await sender.send_message(chat_id, text)
+    """
+
+    MAX_RETRIES = 3  # Повторы при сетевых ошибках
+    MAX_THROTTLED = 20  # Ответы 429 подряд, после которых сообщение возвращается как throttled
+
+    def __init__(self, token=None, rate=None, concurrency=None):
+        self.token = token or settings.BOT_TOKEN
+        self.rate = rate or settings.TELEGRAM_MESSAGES_PER_SECOND
+        self.concurrency = concurrency or settings.TELEGRAM_SEND_CONCURRENCY
+        self._url = f"https://api.telegram.org/bot{self.token}/sendMessage"
+        self._interval = 1.0 / self.rate
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._session = None
+
+    async def __aenter__(self):
+        self._session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=30),
+            connector=aiohttp.TCPConnector(limit=self.concurrency),
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._session.close()
+        self._session = None
+
+    async def _wait_slot(self):
+        """Ждёт свободный слот с учётом ограничения скорости."""
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            if self._next_slot > now:
+                await asyncio.sleep(self._next_slot - now)
+                now = self._next_slot
+            self._next_slot = now + self._interval
+
+    def _pause(self, seconds):
+        """Откладывает все следующие отправки (ответ 429)."""
+        loop = asyncio.get_running_loop()
+        self._next_slot = max(self._next_slot, loop.time() + seconds)
+
+    async def send_message(self, chat_id, text, parse_mode="HTML", **extra):
+        """
+        Отправляет сообщение, повторяя попытку при 429, сетевых ошибках и ответах не в формате Bot API.
+
+        Ответ 429 — управление скоростью, а не ошибка доставки: ожидание retry_after
+        не расходует MAX_RETRIES. Если лимит не снимается MAX_THROTTLED ответов подряд,
+        возвращается результат с error_code 429 (throttled), и вызывающий повторяет позже.
+        """
+        payload = {"chat_id": chat_id, "text": text, "parse_mode": parse_mode, **extra}
+        error_code, description = 0, ""
+        attempts = throttled = 0
+        async with self._semaphore:
+            while attempts < self.MAX_RETRIES:
+                await self._wait_slot()
+                try:
+                    async with self._session.post(self._url, json=payload) as response:
+                        if response.status == 200:
+                            return SendResult(chat_id, True)
+                        try:
+                            data = await response.json(content_type=None)
+                        except (ValueError, aiohttp.ContentTypeError):
+                            data = None
+                        if not isinstance(data, dict):
+                            # Ответ не от Bot API (например, HTML-страница 502 прокси): повтор как при сетевой ошибке
+                            error_code = response.status
+                            description = (await response.text(errors="replace"))[:200]
+                            attempts += 1
+                            continue
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error_code, description = 0, str(e)
+                    attempts += 1
+                    continue
+
+                error_code = data.get("error_code", response.status)
+                description = data.get("description", "")
+                if error_code == 429:
+                    throttled += 1
+                    if throttled >= self.MAX_THROTTLED:
+                        return SendResult(chat_id, False, 429, description)
+                    retry_after = data.get("parameters", {}).get("retry_after", 1)
+                    logger.warning(f"Превышен лимит Telegram, пауза {retry_after} с")
+                    self._pause(retry_after)
+                    continue
+                return SendResult(chat_id, False, error_code, description)
+        return SendResult(chat_id, False, error_code, description)
+
+    async def send_many(self, messages):
+        """
+        Отправляет пачку сообщений конкурентно.
+
+        Args:
+            messages: Итерируемое из пар (chat_id, text).
+
+        Returns:
+            list[SendResult]: Результаты в порядке входных сообщений.
+        """
+        return await asyncio.gather(
+            *(self.send_message(chat_id, text) for chat_id, text in messages)
+        )
@@ -0,0 +1,148 @@
+# django_app/shop/services.py
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from django.db import connection, transaction
+
+from .models import Category, Order, OrderNotification, TelegramUser
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StatusChangeResult:
+    """Итог массовой смены статуса заказов."""
+    changed: int
+    queued: int
+    pending: int
+
+
+def category_paths(nodes: Optional[Dict[int, Tuple[str, Optional[int]]]] = None) -> Dict[int, str]:
+    """
+    Пути категорий: id -> 'Родитель/Категория'.
+
+    Args:
+        nodes (dict | None): Уже загруженные категории {id: (name, parent_id)};
+            если не переданы, все категории читаются одним запросом.
+
+    Returns:
+        dict: Путь каждой категории.
+    """
+    if nodes is None:
+        nodes = {
+            category_id: (name, parent_id)
+            for category_id, name, parent_id in Category.objects.values_list("id", "name", "parent_id")
+        }
+    paths: Dict[int, str] = {}
+
+    def path_of(category_id: int) -> str:
+        if category_id not in paths:
+            name, parent_id = nodes[category_id]
+            paths[category_id] = f"{path_of(parent_id)}/{name}" if parent_id in nodes else name
+        return paths[category_id]
+
+    for category_id in nodes:
+        path_of(category_id)
+    return paths
+
+
+def build_status_message(order_id, old_status, new_status):
+    """
+    Формирует текст уведомления о смене статуса заказа.
+
+    Args:
+        order_id (int): ID заказа.
+        old_status (str): Предыдущий статус.
+        new_status (str): Новый статус.
+
+    Returns:
+        str: Текст сообщения для пользователя.
+    """
+    status_names = dict(Order.STATUS_CHOICES)
+    return (
+        f"🔄 Статус вашего заказа №{order_id} изменён:\n"
+        f"Было: {status_names.get(old_status, old_status)}\n"
+        f"Стало: {status_names.get(new_status, new_status)}"
+    )
+
+
+def _update_status_returning(queryset, new_status):
+    """
+    Меняет статус одним UPDATE ... RETURNING (PostgreSQL).
+
+    Возвращает список кортежей (order_id, telegram_id, old_status).
+    """
+    ids_sql, ids_params = queryset.values('pk').query.sql_with_params()
+    qn = connection.ops.quote_name
+    order_table = qn(Order._meta.db_table)
+    user_table = qn(TelegramUser._meta.db_table)
+    sql = (
+        f"WITH target AS ("
+        f" SELECT o.id, o.status FROM {order_table} o"
+        f" WHERE o.id IN ({ids_sql}) FOR UPDATE"
+        f") "
+        f"UPDATE {order_table} AS o SET status = %s "
+        f"FROM target, {user_table} AS u "
+        f"WHERE o.id = target.id AND u.id = o.user_id "
+        f"RETURNING o.id, u.telegram_id, target.status"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, (*ids_params, new_status))
+        return cursor.fetchall()
+
+
+def _update_status_fallback(queryset, new_status):
+    """Смена статуса для СУБД без RETURNING в UPDATE ... FROM (например, SQLite)."""
+    rows = list(
+        queryset.select_for_update()
+        .values_list('id', 'user__telegram_id', 'status')
+    )
+    if rows:
+        Order.objects.filter(id__in=[row[0] for row in rows]).update(status=new_status)
+    return rows
+
+
+def bulk_update_order_status(queryset, new_status):
+    """
+    Массово меняет статус заказов и ставит уведомления пользователям в очередь.
+
+    Вместо вызова Order.save() для каждого заказа (лишний SELECT и синхронный
+    запрос к Telegram) статус меняется одним запросом, а уведомления
+    создаются одним bulk_create и отправляются командой send_notifications.
+
+    Args:
+        queryset: QuerySet заказов.
+        new_status (str): Новый статус из Order.STATUS_CHOICES.
+
+    Returns:
+        StatusChangeResult: Количество изменённых заказов, созданных уведомлений
+        и общее число уведомлений в очереди.
+    """
+    if new_status not in dict(Order.STATUS_CHOICES):
+        raise ValueError(f"Неизвестный статус заказа: {new_status}")
+
+    queryset = queryset.exclude(status=new_status).order_by()
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            rows = _update_status_returning(queryset, new_status)
+        else:
+            rows = _update_status_fallback(queryset, new_status)
+
+        notifications = [
+            OrderNotification(
+                order_id=order_id,
+                chat_id=telegram_id,
+                text=build_status_message(order_id, old_status, new_status),
+            )
+            for order_id, telegram_id, old_status in rows
+            if telegram_id
+        ]
+        OrderNotification.objects.bulk_create(notifications, batch_size=1000)
+
+    pending = OrderNotification.objects.filter(status=OrderNotification.STATUS_PENDING).count()
+    logger.info(
+        f"Статус '{new_status}' установлен для {len(rows)} заказов, "
+        f"в очередь добавлено {len(notifications)} уведомлений (всего в очереди: {pending})"
+    )
+    return StatusChangeResult(changed=len(rows), queued=len(notifications), pending=pending)
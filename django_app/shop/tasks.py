@@ -1,8 +1,11 @@
 import logging
-import openpyxl
-from django.core.files.storage import default_storage
+from datetime import timedelta
 from django.db import transaction
-from .models import Order, OrderItem
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import Order, OrderNotification
+from .exporters import ORDER_FIELDS, iter_order_rows, write_xlsx
+from .sender import TelegramSender
 import aiohttp
 import asyncio
 from django.conf import settings
@@ -17,6 +20,11 @@ logger = logging.getLogger(__name__)
 # Получаем токен бота из настроек
 BOT_TOKEN = settings.BOT_TOKEN
 
+# Параметры рассылки уведомлений из очереди
+NOTIFICATION_BATCH_SIZE = 500
+NOTIFICATION_MAX_ATTEMPTS = 3
+NOTIFICATION_CLAIM_TIMEOUT = 300  # Через сколько секунд уведомление в статусе «Отправляется» считается зависшим
+
 async def send_telegram_message(chat_id, text):
     """
     Асинхронная функция для отправки сообщения в Telegram.
@@ -59,82 +67,25 @@ async def send_telegram_message(chat_id, text):
             logger.error(f"Исключение при отправке сообщения пользователю {chat_id}: {e}")
             return False
 
-def export_orders_to_excel(queryset=None):
+def export_orders_to_excel(file, queryset=None):
     """
     Экспорт заказов в Excel-файл.
 
     Args:
+        file: Файловый объект, в который записывается книга (например, временный файл запроса).
         queryset: QuerySet заказов для экспорта. Если None, экспортируются все активные заказы.
 
-    Создаёт Excel-файл с информацией о заказах, включая ID заказа, пользователя,
-    адрес доставки, телефон, пожелания, желаемое время доставки, статус и список товаров.
-
-    Возвращает путь к сохранённому Excel-файлу.
+    Заказы читаются курсором пачками, позиции и товары подгружаются одним запросом
+    на пачку, книга пишется в режиме write_only — память не зависит от числа заказов.
+    Каждый вызов пишет в свой файл, поэтому одновременные экспорты не мешают друг другу.
     """
     logger.info('Начало экспорта заказов в Excel.')
-
-    try:
-        # Создание новой рабочей книги и настройка листа
-        workbook = openpyxl.Workbook()
-        sheet = workbook.active
-        sheet.title = "Заказы"
-        logger.debug('Создана новая рабочая книга Excel.')
-
-        # Установка заголовков столбцов
-        headers = [
-            "ID заказа",
-            "Пользователь",
-            "Адрес доставки",
-            "Телефон",
-            "Пожелания",
-            "Желаемое время доставки",
-            "Статус",
-            "Товары"
-        ]
-        sheet.append(headers)
-        logger.debug('Установлены заголовки столбцов в Excel.')
-
-        # Инициализация номера строки для заполнения данных
-        row_number = 2
-
-        # Получение заказов для экспорта
-        if queryset is None:
-            orders = Order.objects.filter(is_active=True)
-        else:
-            orders = queryset
-        logger.info(f'Получено {orders.count()} заказов для экспорта.')
-
-        for order in orders:
-            # Получение товаров, связанных с заказом
-            order_items = OrderItem.objects.filter(order=order, is_active=True)
-            logger.debug(f'Получено {order_items.count()} товаров для заказа №{order.id}.')
-
-            items_list = [f"{item.product.name} x {item.quantity}" for item in order_items]
-
-            # Заполнение строки данными заказа
-            sheet.cell(row=row_number, column=1, value=order.id)
-            sheet.cell(row=row_number, column=2, value=order.user.username or f"User {order.user.telegram_id}")
-            sheet.cell(row=row_number, column=3, value=order.address)
-            sheet.cell(row=row_number, column=4, value=order.phone or "-")
-            sheet.cell(row=row_number, column=5, value=order.wishes or "-")
-            sheet.cell(row=row_number, column=6, value=order.desired_delivery_time or "-")
-            sheet.cell(row=row_number, column=7, value=order.get_status_display())
-            sheet.cell(row=row_number, column=8, value=", ".join(items_list) if items_list else "Нет товаров")
-
-            logger.debug(f'Заполнена строка для заказа №{order.id}.')
-            row_number += 1
-
-        # Определение имени файла и сохранение рабочей книги
-        excel_filename = "orders_export.xlsx"
-        workbook_path = default_storage.path(excel_filename)
-        workbook.save(workbook_path)
-        logger.info(f'Экспорт заказов завершён. Файл сохранён по пути: {workbook_path}')
-
-        return workbook_path
-
-    except Exception as e:
-        logger.error(f"Ошибка при экспорте заказов в Excel: {e}", exc_info=True)
-        return None
+    orders = Order.objects.filter(is_active=True) if queryset is None else queryset
+    write_xlsx(
+        iter_order_rows(orders), list(ORDER_FIELDS), file,
+        headers=list(ORDER_FIELDS.values()), title="Заказы",
+    )
+    logger.info('Экспорт заказов завершён.')
 
 def notify_user_of_status_change(order_id, old_status, new_status):
     try:
@@ -147,12 +98,8 @@ def notify_user_of_status_change(order_id, old_status, new_status):
             logger.warning(f"У пользователя нет telegram_id: {user}")
             return
             
-        status_names = dict(Order.STATUS_CHOICES)
-        message = (
-            f"🔄 Статус вашего заказа №{order_id} изменён:\n"
-            f"Было: {status_names.get(old_status, old_status)}\n"
-            f"Стало: {status_names.get(new_status, new_status)}"
-        )
+        from .services import build_status_message
+        message = build_status_message(order_id, old_status, new_status)
         
         # Используем синхронную версию отправки
         send_telegram_message_sync(user.telegram_id, message)
@@ -174,3 +121,110 @@ def send_telegram_message_sync(chat_id, text):
         return response.status_code == 200
     except Exception as e:
         logger.error(f"Ошибка отправки: {e}")
+
+
+def requeue_stale_notifications(timeout=NOTIFICATION_CLAIM_TIMEOUT):
+    """
+    Возвращает в очередь уведомления, зависшие в статусе «Отправляется»
+    (обработчик упал или был перезапущен между отправкой и записью результата).
+    Исчерпавшие попытки помечаются как неудачные.
+    """
+    stale = OrderNotification.objects.filter(
+        Q(claimed_at__lt=timezone.now() - timedelta(seconds=timeout)) | Q(claimed_at__isnull=True),
+        status=OrderNotification.STATUS_SENDING,
+    )
+    failed = stale.filter(attempts__gte=NOTIFICATION_MAX_ATTEMPTS).update(
+        status=OrderNotification.STATUS_FAILED, last_error="Нет результата отправки (обработчик прерван)"
+    )
+    requeued = stale.update(status=OrderNotification.STATUS_PENDING, claimed_at=None)
+    if requeued or failed:
+        logger.warning("Зависшие уведомления: возвращено в очередь %s, с ошибкой %s", requeued, failed)
+    return requeued
+
+
+def claim_pending_notifications(limit=NOTIFICATION_BATCH_SIZE):
+    """
+    Забирает из очереди пачку уведомлений и помечает их как отправляемые.
+
+    Строки блокируются с SKIP LOCKED, поэтому несколько обработчиков
+    очереди не получат одни и те же уведомления. Перед этим в очередь
+    возвращаются зависшие уведомления; повторы ограничены attempts.
+    """
+    requeue_stale_notifications()
+    with transaction.atomic():
+        batch = list(
+            OrderNotification.objects.select_for_update(skip_locked=True)
+            .filter(status=OrderNotification.STATUS_PENDING)
+            .order_by('id')
+            .only('id', 'chat_id', 'text', 'attempts')[:limit]
+        )
+        if batch:
+            OrderNotification.objects.filter(id__in=[n.id for n in batch]).update(
+                status=OrderNotification.STATUS_SENDING,
+                attempts=F('attempts') + 1,
+                claimed_at=timezone.now(),
+            )
+    return batch
+
+
+async def send_notifications_batch(notifications):
+    """
+    Асинхронно отправляет пачку уведомлений через общий TelegramSender.
+
+    Returns:
+        list[tuple[int, int | None, str]]: Результат для каждого уведомления.
+    """
+    async with TelegramSender() as sender:
+        results = await sender.send_many((n.chat_id, n.text) for n in notifications)
+    return [
+        (n.id, None if result.ok else result.error_code, result.description)
+        for n, result in zip(notifications, results)
+    ]
+
+
+def _mark_notifications(results, attempts):
+    """Сохраняет результаты отправки: отправленные, повторяемые и окончательно неудачные."""
+    sent_ids, retry_ids, failed = [], [], {}
+    for notification_id, error_code, description in results:
+        if error_code is None:
+            sent_ids.append(notification_id)
+        elif error_code in (400, 403, 404) or attempts[notification_id] + 1 >= NOTIFICATION_MAX_ATTEMPTS:
+            failed.setdefault(description[:255], []).append(notification_id)
+        else:
+            retry_ids.append(notification_id)
+
+    if sent_ids:
+        OrderNotification.objects.filter(id__in=sent_ids).update(
+            status=OrderNotification.STATUS_SENT, sent_at=timezone.now(), last_error=""
+        )
+    if retry_ids:
+        OrderNotification.objects.filter(id__in=retry_ids).update(status=OrderNotification.STATUS_PENDING)
+    # Одинаковые ошибки (например, 403 от заблокировавших бота) сохраняются одним UPDATE
+    for description, ids in failed.items():
+        logger.warning(f"Не доставлено {len(ids)} уведомлений: {description}")
+        OrderNotification.objects.filter(id__in=ids).update(
+            status=OrderNotification.STATUS_FAILED, last_error=description
+        )
+    return len(sent_ids), len(retry_ids), sum(len(ids) for ids in failed.values())
+
+
+def dispatch_pending_notifications(limit=NOTIFICATION_BATCH_SIZE):
+    """
+    Отправляет одну пачку уведомлений из очереди.
+
+    Returns:
+        tuple[int, int, int]: Количество отправленных, возвращённых в очередь и неудачных.
+    """
+    if not BOT_TOKEN:
+        logger.error("BOT_TOKEN не указан в настройках. Уведомления не могут быть отправлены.")
+        return 0, 0, 0
+
+    batch = claim_pending_notifications(limit)
+    if not batch:
+        return 0, 0, 0
+
+    results = asyncio.run(send_notifications_batch(batch))
+    attempts = {n.id: n.attempts for n in batch}
+    sent, retried, failed = _mark_notifications(results, attempts)
+    logger.info(f"Уведомления: отправлено {sent}, повторно в очереди {retried}, с ошибкой {failed}")
+    return sent, retried, failed
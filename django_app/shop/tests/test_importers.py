@@ -0,0 +1,171 @@
+# django_app/shop/tests/test_importers.py
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from django_app.shop.importers import MODE_CREATE, MODE_UPSERT, ProductImporter
+from django_app.shop.models import Category, Product
+
+pytestmark = pytest.mark.django_db
+
+
+def row(sku, name="Товар", price="10", category_path="Еда", **extra):
+    return {"sku": sku, "name": name, "price": price, "category_path": category_path, **extra}
+
+
+def run_import(rows, **kwargs):
+    return ProductImporter(**kwargs).run(rows)
+
+
+def tree_shape():
+    """Структура дерева без tree_id: rebuild() нумерует деревья по-своему"""
+    return sorted(
+        (category.name, category.parent.name if category.parent else None,
+         category.lft, category.rght, category.level)
+        for category in Category.objects.select_related("parent")
+    )
+
+
+@pytest.fixture
+def food():
+    return Category.objects.create(name="Еда")
+
+
+def test_create_mode_reports_existing_sku(food):
+    Product.objects.create(sku="A1", name="Старый", price=1, category=food)
+
+    result = run_import([row("A1"), row("B1", name="Новый")], mode=MODE_CREATE)
+
+    assert result.created == 1
+    assert result.error_count == 1
+    assert "артикулом 'A1' уже существует" in result.errors[0]
+    assert Product.objects.get(sku="A1").name == "Старый"
+
+
+def test_upsert_creates_new_and_updates_existing(food):
+    Product.objects.create(sku="A1", name="Старый", price=1, category=food)
+
+    result = run_import([row("A1", name="Обновлённый"), row("B1", name="Новый")], mode=MODE_UPSERT)
+
+    assert (result.created, result.updated, result.error_count) == (1, 1, 0)
+    assert Product.objects.get(sku="A1").name == "Обновлённый"
+    assert Product.objects.get(sku="B1").name == "Новый"
+
+
+def test_upsert_requires_sku(food):
+    result = run_import([row("")], mode=MODE_UPSERT)
+
+    assert result.error_count == 1
+    assert not Product.objects.exists()
+
+
+def test_upsert_writes_only_changed_fields(food):
+    Product.objects.create(sku="A1", name="Товар", description="Не из файла", price=10, category=food)
+
+    with CaptureQueriesContext(connection) as queries:
+        result = run_import([row("A1", price="12.50")], mode=MODE_UPSERT)
+
+    updates = [query["sql"] for query in queries if query["sql"].startswith("UPDATE")]
+    assert result.updated == 1
+    assert len(updates) == 1
+    assert '"price"' in updates[0]
+    assert '"name"' not in updates[0] and '"description"' not in updates[0]
+    product = Product.objects.get(sku="A1")
+    assert product.price == Decimal("12.50")
+    # Колонки description нет в строке — поле не трогается
+    assert product.description == "Не из файла"
+
+
+def test_upsert_skips_unchanged_rows(food):
+    Product.objects.create(sku="A1", name="Товар", price=10, category=food)
+
+    with CaptureQueriesContext(connection) as queries:
+        result = run_import([row("A1")], mode=MODE_UPSERT)
+
+    assert (result.updated, result.unchanged) == (0, 1)
+    assert not [query for query in queries if query["sql"].startswith(("UPDATE", "INSERT"))]
+
+
+def test_deactivate_missing_hides_absent_and_reenables_reappearing(food):
+    Product.objects.create(sku="A1", name="Товар", price=10, category=food, is_active=False)
+    Product.objects.create(sku="B1", name="Пропал", price=10, category=food)
+    Product.objects.create(sku=None, name="Без артикула", price=10, category=food)
+
+    result = run_import([row("A1")], mode=MODE_UPSERT, deactivate_missing=True)
+
+    assert result.updated == 1
+    assert result.deactivated == 1
+    assert Product.objects.get(sku="A1").is_active
+    assert not Product.objects.get(sku="B1").is_active
+    # Товары без артикула импортом не сопоставляются и не скрываются
+    assert Product.objects.get(name="Без артикула").is_active
+
+
+def test_deactivate_missing_keeps_skus_of_invalid_rows(food):
+    Product.objects.create(sku="A1", name="Товар", price=10, category=food)
+
+    result = run_import([row("A1", price="не число")], mode=MODE_UPSERT, deactivate_missing=True)
+
+    assert result.error_count == 1
+    assert result.deactivated == 0
+    assert Product.objects.get(sku="A1").is_active
+
+
+def test_multi_batch_import_keeps_tree_valid(food):
+    Category.objects.create(name="Фрукты", parent=food)
+    Category.objects.create(name="Напитки")
+    rows = [
+        row("1", category_path="Еда/Овощи/Корнеплоды"),
+        row("2", category_path="Техника/Телефоны"),
+        row("3", category_path="Напитки/Соки"),
+        row("4", category_path="Одежда"),
+        row("5", category_path="Еда/Выпечка"),
+        row("6", category_path="Техника/Ноутбуки/Игровые"),
+    ]
+
+    result = ProductImporter(batch_size=2).run(rows)
+
+    assert result.created == 6
+    final = tree_shape()
+    Category.objects.rebuild()
+    assert final == tree_shape()
+    roots = Category.objects.filter(parent=None)
+    assert len({root.tree_id for root in roots}) == roots.count()
+    assert Product.objects.get(sku="6").category.get_ancestors().count() == 2
+
+
+def test_tree_valid_after_each_batch(food):
+    """Дерево корректно после коммита каждой пачки, а не только в конце импорта"""
+    rows = [row(str(number), category_path=path) for number, path in enumerate(
+        ["Еда/Овощи", "Техника", "Техника/Телефоны", "Еда/Овощи/Корнеплоды"])]
+    valid = []
+
+    def check(_):
+        shape = tree_shape()
+        Category.objects.rebuild()
+        valid.append(shape == tree_shape())
+
+    ProductImporter(batch_size=2).run(rows, on_batch=check)
+
+    assert valid == [True, True]
+
+
+def test_category_name_taken_in_other_branch(food):
+    Category.objects.create(name="Соки", parent=food)
+
+    result = run_import([row("1", category_path="Напитки/Соки")])
+
+    assert result.error_count == 1
+    assert "'Соки' уже существует в другом разделе" in result.errors[0]
+    # Отклонённая строка не создаёт и родительских категорий
+    assert not Category.objects.filter(name="Напитки").exists()
+    assert not Product.objects.exists()
+
+
+def test_rejected_row_does_not_create_categories(food):
+    result = run_import([row("1", category_path="Новая/Ветка", photo_filename="нет-такого.jpg")])
+
+    assert result.error_count == 1
+    assert not Category.objects.filter(name__in=["Новая", "Ветка"]).exists()